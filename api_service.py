@@ -0,0 +1,216 @@
+# api_service.py — headless HTTP API (plain ASGI, no framework) over the pipeline
+#
+#   uvicorn api_service:app --port 8080
+#
+#   GET /tickets?artist=Coldplay
+#   GET /youtube/annual?channels=@beyonce,@BeyonceVEVO&year=2023[&include_comments=1&max_videos=400]
+#   GET /youtube/lifetime?channel=@beyonce
+#   GET /spotify?artist=Beyoncé
+#   GET /conversions?artist=Beyoncé&channels=@beyonce&year=2023[&full=1]
+#   GET /health   GET /metrics
+#
+# Results are kept in a shared in-process TTL cache; identical concurrent queries
+# are coalesced onto one upstream fetch; at most API_MAX_UPSTREAM fetches run at once.
+import asyncio, json, os, time
+from urllib.parse import parse_qs
+
+import data_pipeline as dp
+from cache import TTLCache
+
+MAX_UPSTREAM = int(os.getenv("API_MAX_UPSTREAM", "4") or 4)
+
+# seconds each kind of result stays fresh
+TTL = {
+    "tickets": 24 * 3600,          # year-end post, effectively static
+    "yt_annual": 6 * 3600,
+    "yt_lifetime": 3600,
+    "spotify": 6 * 3600,           # monthly listeners update at most daily
+}
+
+# results worth caching: the pipeline answers a failed upstream call with zeros, which must not
+# be served for a whole TTL (same predicates as the pipeline's own memoize(cache_if=...))
+CACHE_IF = {
+    "tickets": bool,
+    "yt_annual": lambda r: r.get("video_count", 0) > 0,
+    "yt_lifetime": lambda r: "_raw" in r,
+    "spotify": lambda r: bool(r.get("followers")) and bool(r.get("monthly_listeners")),
+}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def split_channels(raw) -> tuple:
+    """Normalized channel key: unique, stripped, order-independent (totals are sums)."""
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return tuple(sorted({s.strip() for s in raw or [] if s and s.strip()}))
+
+# ---------- Shared cache + coalescing + concurrency limit ----------
+class PipelineService:
+    def __init__(self, max_upstream: int = MAX_UPSTREAM, cache: TTLCache | None = None):
+        self.cache = cache or TTLCache(ttl=3600, maxsize=8192, name="api")
+        self.max_upstream = max_upstream
+        self._sem = None                  # created lazily inside the running loop
+        self._inflight = {}               # key → asyncio.Future
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "upstream": 0, "errors": 0}
+
+    async def fetch(self, kind: str, key: tuple, fn, *args, **kw):
+        self.stats["requests"] += 1
+        ck = (kind,) + key
+        hit = self.cache.get(ck)
+        if hit is not None:
+            self.stats["cache_hits"] += 1
+            return hit
+        fut = self._inflight.get(ck)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[ck] = fut
+        try:
+            if self._sem is None:
+                self._sem = asyncio.Semaphore(self.max_upstream)
+            async with self._sem:
+                self.stats["upstream"] += 1
+                val = await asyncio.to_thread(fn, *args, **kw)
+            if CACHE_IF.get(kind, bool)(val):
+                self.cache.set(ck, val, ttl=TTL.get(kind))
+            fut.set_result(val)
+            return val
+        except BaseException as e:
+            self.stats["errors"] += 1
+            fut.set_exception(e)
+            fut.exception()               # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(ck, None)
+
+    # ---------- endpoints ----------
+    async def tickets(self, artist: str) -> dict:
+        n = await self.fetch("tickets", (artist.strip().lower(),), dp.get_2023_tickets_sold_for_artist, artist)
+        return {"artist": artist, "tickets": n}
+
+    async def yt_annual(self, channels, year: int, include_comments: bool = True, max_videos: int = 400) -> dict:
+        chans = split_channels(channels)
+        res = await self.fetch("yt_annual", (chans, int(year), bool(include_comments), int(max_videos)),
+                               dp.yt_annual_stats_multi, list(chans), int(year),
+                               include_comments=include_comments, max_videos=max_videos)
+        return {"channels": list(chans), "year": int(year), **res}
+
+    async def yt_lifetime(self, channel: str) -> dict:
+        res = await self.fetch("yt_lifetime", (channel.strip(),), dp.get_youtube_channel_stats, channel.strip())
+        return {"channel": channel.strip(), **{k: v for k, v in res.items() if not k.startswith("_")}}
+
+    async def spotify(self, artist: str) -> dict:
+        def _both(a):
+            ml = dp.spotify_monthly_listeners_scrape(a, return_raw=True)
+            return {"followers": dp.spotify_artist_followers(a),
+                    "monthly_listeners": ml.get("value", 0), "monthly_listeners_raw": ml.get("raw")}
+        res = await self.fetch("spotify", (artist.strip().lower(),), _both, artist)
+        return {"artist": artist, **res}
+
+    async def conversions(self, artist: str, channels, year: int, full: bool = True) -> dict:
+        chans = split_channels(channels)
+        jobs = [self.tickets(artist),
+                asyncio.gather(*(self.yt_lifetime(c) for c in chans)),   # lifetime stats are per channel
+                self.spotify(artist)]
+        if full:
+            jobs.append(self.yt_annual(chans, year))
+        out = await asyncio.gather(*jobs)
+        tix = out[0]["tickets"]
+        life = {k: sum(int(x.get(k, 0) or 0) for x in out[1]) for k in ("viewCount", "subscriberCount", "videoCount")}
+        sp = out[2]
+        body = {
+            "artist": artist, "channels": list(chans), "year": int(year), "tickets": tix,
+            "yt_lifetime": life, "spotify": sp,
+            "light": dp.compute_conversions_percent(life, tix),
+            "spotify_conversions": dp.compute_spotify_conversions_monthly(
+                tix, sp["followers"], sp["monthly_listeners"], clip_to_100=True),
+        }
+        if full:
+            yt_year = out[3]
+            body["yt_annual"] = {k: yt_year[k] for k in ("views", "likes", "comments", "video_count")}
+            body["full"] = dp.compute_full_conversions_percent(yt_year, tix)
+        return body
+
+    def metrics(self) -> dict:
+        return {**self.stats, "inflight": len(self._inflight), "cache": self.cache.stats()}
+
+service = PipelineService()
+
+# ---------- ASGI plumbing ----------
+def _q(params: dict, name: str, default=None, required: bool = False):
+    v = params.get(name, [default])[0]
+    if required and (v is None or str(v).strip() == ""):
+        raise HTTPError(400, f"missing query parameter: {name}")
+    return v
+
+def _int(params, name, default):
+    try:
+        return int(_q(params, name, default))
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an integer")
+
+def _bool(params, name, default):
+    return str(_q(params, name, default)).lower() in ("1", "true", "yes", "on")
+
+async def _route(svc: PipelineService, path: str, params: dict) -> dict:
+    if path == "/health":
+        return {"ok": True}
+    if path == "/metrics":
+        return svc.metrics()
+    if path == "/tickets":
+        return await svc.tickets(_q(params, "artist", required=True))
+    if path == "/youtube/annual":
+        return await svc.yt_annual(_q(params, "channels", required=True), _int(params, "year", 2023),
+                                   _bool(params, "include_comments", "1"), _int(params, "max_videos", 400))
+    if path == "/youtube/lifetime":
+        return await svc.yt_lifetime(_q(params, "channel", required=True))
+    if path == "/spotify":
+        return await svc.spotify(_q(params, "artist", required=True))
+    if path == "/conversions":
+        return await svc.conversions(_q(params, "artist", required=True), _q(params, "channels", required=True),
+                                     _int(params, "year", 2023), _bool(params, "full", "1"))
+    raise HTTPError(404, f"no route for {path}")
+
+async def _send_json(send, status: int, body: dict, elapsed: float):
+    data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"content-length", str(len(data)).encode()),
+        (b"server-timing", f"app;dur={elapsed * 1000:.1f}".encode()),
+    ]})
+    await send({"type": "http.response.body", "body": data})
+
+def make_app(svc: PipelineService | None = None):
+    svc = svc or service
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                msg = await receive()
+                if msg["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif msg["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        t0 = time.perf_counter()
+        try:
+            if scope["method"] != "GET":
+                raise HTTPError(405, "only GET is supported")
+            params = parse_qs(scope.get("query_string", b"").decode("utf-8"))
+            body, status = await _route(svc, scope["path"].rstrip("/") or "/", params), 200
+        except HTTPError as e:
+            body, status = {"error": str(e)}, e.status
+        except Exception as e:
+            body, status = {"error": f"upstream failure: {e}"}, 502
+        await _send_json(send, status, body, time.perf_counter() - t0)
+
+    return app
+
+app = make_app()
@@ -1,12 +1,23 @@
 # app.py — presentation-first; robust to missing optional helpers
 
 import os
-import importlib
 import streamlit as st
 from dotenv import load_dotenv
 
+import data_pipeline as dp   # cheap: no network/bs4/.env work until first use
+import perf, singleflight
+
 load_dotenv()
-dp = importlib.import_module("data_pipeline")
+
+@st.cache_resource
+def _start_warmer():
+    # one background roster warmer per server process (opt-in: WARM_CACHE=1)
+    import warm_cache
+    lo, hi = (int(x) for x in os.getenv("WARM_HOURS", "1-6").split("-"))
+    return warm_cache.start_background(budget=int(os.getenv("WARM_BUDGET", "5000")), hours=(lo, hi))
+
+if os.getenv("WARM_CACHE") == "1":
+    _start_warmer()
 
 # -------------- UI helpers --------------
 st.set_page_config(page_title="Artist Value Conversion — From Social to Commercial", layout="wide")
@@ -62,9 +73,167 @@ def safe_full_conversions(yt_year: dict, tickets_2023: int):
         "comments_to_sales_pct": pct(tix, comments),
     }
 
+def render_perf(trace):
+    """Stage timings, HTTP calls/bytes per endpoint, quota and cache hits for the last run."""
+    import json
+    import pandas as pd
+    summ = trace.summary()
+    st.caption(f"Total {summ['elapsed_s']:.2f}s · YouTube quota units: {summ['quota'].get('youtube', 0):,}")
+    if summ["stages"]:
+        st.markdown("**Stages**")
+        st.dataframe(pd.DataFrame(summ["stages"]), use_container_width=True, hide_index=True)
+    if summ["http"]:
+        st.markdown("**HTTP per endpoint**")
+        http_rows = [{"endpoint": k, **v} for k, v in summ["http"].items()]
+        st.dataframe(pd.DataFrame(http_rows), use_container_width=True, hide_index=True)
+    if summ["cache"]:
+        st.markdown("**Cache**")
+        st.dataframe(pd.DataFrame([{"cache": k, **v} for k, v in summ["cache"].items()]),
+                     use_container_width=True, hide_index=True)
+    sf = singleflight.metrics()
+    if sf["_total"]["calls"]:
+        st.markdown(f"**Shared in-flight fetches** (process-wide, all sessions) — "
+                    f"{sf['_total']['coalesced']:,} of {sf['_total']['calls']:,} calls coalesced")
+        st.dataframe(pd.DataFrame([{"function": k, **v} for k, v in sf.items() if k != "_total"]),
+                     use_container_width=True, hide_index=True)
+    c1, c2 = st.columns(2)
+    c1.download_button("Download trace (JSON)", trace.to_json(), file_name="trace.json", mime="application/json")
+    c2.download_button("Download trace (OTLP)", json.dumps(trace.to_otlp()), file_name="trace_otlp.json",
+                       mime="application/json")
+
+def render_leaderboard(artist: str, default_year: int):
+    """Top-k artists per metric/year from the ranking engine, plus where `artist` stands."""
+    import pandas as pd
+    import rankings
+    lb = rankings.board()
+    years = lb.years() or [default_year]
+    c1, c2, c3 = st.columns([3, 1, 1])
+    metric = c1.selectbox("Metric", list(rankings.METRICS), format_func=lambda m: rankings.METRICS[m][0],
+                          index=list(rankings.METRICS).index("likes_to_sales_pct"))
+    yr = c2.selectbox("Year", years, index=years.index(default_year) if default_year in years else len(years) - 1)
+    k = c3.number_input("Top", min_value=5, max_value=200, value=20, step=5)
+    n = lb.size(metric, yr)
+    r = lb.rank(metric, yr, artist)
+    if r is not None:
+        st.caption(f"{artist}: #{r:,} of {n:,} · {lb.percentile(metric, yr, artist):.1f}th percentile")
+    elif n:
+        st.caption(f"{n:,} artists ranked; {artist} has no value for this metric yet (run it above).")
+    rows = lb.top(metric, yr, int(k))
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("No ranked artists for this metric/year yet — results are added as artists are run.")
+
+def render_windows(channels: str, year: int):
+    """Aggregate any window around `year` from one cached per-video enumeration (no API calls on change)."""
+    import datetime as _dt
+    import pandas as pd
+    import windows
+    cap = 1200
+    idx = windows.build_index(channels, f"{year - 1}-01-01", f"{year + 1}-12-31", max_videos=cap)
+    if not len(idx):
+        st.info("No videos found for these channels in the indexed span.")
+        return
+    st.caption(f"{len(idx):,} videos indexed, {year - 1}–{year + 1}; windows are computed locally.")
+    if idx.truncated:
+        since = _dt.datetime.fromtimestamp(idx.complete_from, _dt.timezone.utc).date()
+        st.warning(f"Only the newest {cap:,} videos per channel are indexed: windows starting before {since} "
+                   "undercount (marked in the `truncated` column).")
+    kind = st.radio("Window", ["Quarters", "Around a date (tour start)", "Rolling months", "Custom range"],
+                    horizontal=True)
+    if kind == "Quarters":
+        wins = [windows.quarter(year, q) for q in (1, 2, 3, 4)]
+    elif kind == "Around a date (tour start)":
+        c1, c2, c3 = st.columns(3)
+        center = c1.date_input("Date", value=_dt.date(year, 6, 1))
+        before = c2.number_input("Days before", 0, 365, 90)
+        after = c3.number_input("Days after", 0, 365, 90)
+        wins = [windows.around(center, int(before), int(after))]
+    elif kind == "Rolling months":
+        c1, c2 = st.columns(2)
+        end = c1.date_input("Ending", value=_dt.date(year, 12, 31))
+        months = c2.number_input("Months", 1, 24, 12)
+        wins = [windows.rolling_months(end, int(months))]
+    else:
+        c1, c2 = st.columns(2)
+        wins = [windows.between(c1.date_input("From", value=_dt.date(year, 1, 1)),
+                                c2.date_input("To", value=_dt.date(year, 12, 31)))]
+    st.dataframe(pd.DataFrame(idx.query_many(wins)), use_container_width=True, hide_index=True)
+
+def render_history(artist: str, channels: str):
+    """Stored snapshots for this artist (local SQLite reads only)."""
+    import datetime as _dt
+    import pandas as pd
+    import store
+    s = store.default()
+    if s is None:
+        st.info("History store disabled (PIPELINE_DB is empty).")
+        return
+
+    def when(ts):
+        return _dt.datetime.fromtimestamp(ts, _dt.timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+    shown = False
+    for ch in dp._split_channels(channels):
+        cid = ch if ch.startswith("UC") else s.external_id("youtube", ch)
+        hist = s.channel_history(cid) if cid else []
+        if hist:
+            shown = True
+            st.markdown(f"**{ch}** — lifetime channel snapshots")
+            st.dataframe(pd.DataFrame([{**h, "fetched_at": when(h["fetched_at"])} for h in hist]),
+                         use_container_width=True, hide_index=True)
+    sid = s.external_id("spotify", artist)
+    sp = s.spotify_history(sid) if sid else []
+    if sp:
+        shown = True
+        st.markdown("**Spotify** snapshots")
+        st.dataframe(pd.DataFrame([{**h, "fetched_at": when(h["fetched_at"])} for h in sp]),
+                     use_container_width=True, hide_index=True)
+    conv = s.conversions_history(artist)
+    if conv:
+        shown = True
+        st.markdown("**Conversions** per run")
+        df = pd.DataFrame(conv)
+        df["computed_at"] = df["computed_at"].map(when)
+        st.dataframe(df.pivot_table(index=["year", "computed_at"], columns="metric", values="value").reset_index(),
+                     use_container_width=True, hide_index=True)
+    if not shown:
+        st.info("Nothing stored for this artist yet.")
+
+def render_changes():
+    """Roster change feed from stored snapshots (ticket list versions + channel/Spotify deltas)."""
+    import datetime as _dt
+    import time as _time
+    import pandas as pd
+    import changes, store
+    if store.default() is None:
+        st.info("History store disabled (PIPELINE_DB is empty).")
+        return
+    spans = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}
+    c1, c2 = st.columns([2, 1])
+    span = c1.selectbox("Changed since", list(spans), index=1)
+    roster_only = c2.toggle("Roster only", value=True, help="Only artists in the ticket list.")
+    since = int(_time.time()) - spans[span] * 86400
+    td = changes.tickets_diff(2023, since=since)
+    if td["from"] is not None and td["from"]["id"] != td["to"]["id"]:
+        st.caption(f"Ticket list: {len(td['added']):,} added, {len(td['removed']):,} removed, "
+                   f"{len(td['changed']):,} changed since the version of "
+                   f"{_dt.datetime.fromtimestamp(td['from']['taken_at']).strftime('%Y-%m-%d')}.")
+    # roster: today's ticket list plus whoever just dropped off it
+    roster = (list(store.default().ticket_totals(2023)) + [r["artist"] for r in td["removed"]]
+              if roster_only else None)
+    events = changes.feed(since, artists=roster, limit=200)
+    if events:
+        st.dataframe(pd.DataFrame(events)[["artist", "kind", "metric", "change", "before", "after", "delta", "pct"]],
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info("No stored changes in this period — snapshots accumulate as data is fetched.")
+
 # -------------- Sidebar inputs --------------
 with st.sidebar:
     st.header("Inputs")
+    if os.getenv("PIPELINE_REPLAY"):
+        st.caption(f"▶️ Offline replay: `{os.getenv('PIPELINE_REPLAY')}`")
     artist = st.text_input("Artist name", value="Beyoncé")
      # in sidebar
     yt_channel_input = st.text_input("YouTube (ID / @handle / name) — comma-separated for multiple",
@@ -74,128 +243,250 @@ with st.sidebar:
     full_mode = st.toggle("Full Mode (2023 content)", value=True)
     year = st.number_input("Year (Full Mode)", min_value=2006, max_value=2030, value=2023, step=1, disabled=not full_mode)
     show_raw_labels = st.toggle("Debug: show raw YouTube labels", value=False, help="Show a few sample '1.3M views' labels parsed from watch pages.")
+    budget_s = st.slider("Answer within (seconds)", 1.0, 60.0, 5.0, 0.5, disabled=not full_mode,
+                         help="Slower exact fetches are answered from a random sample of weeks first "
+                              "(with a 95% interval) and completed in the background.")
+    # a search page (100 units) + a videos.list batch per 50 videos and channel: cap at the daily quota
+    import sources, warm_cache
+    yt_quota = sources.YOUTUBE.daily_quota
+    cap_videos = min(50_000, warm_cache.max_videos_within(yt_channel_input.strip() or artist, yt_quota))
+    max_videos = int(st.number_input("Max videos per channel", min_value=50, max_value=cap_videos,
+                                     value=min(400, cap_videos), step=50, disabled=not full_mode,
+                                     help="Above 2,000 videos the channel is summed in a stream (constant memory); "
+                                          "catalog and per-type views then re-fetch. Capped so the fetch fits "
+                                          f"in the {yt_quota:,}-unit daily YouTube quota."))
+    if full_mode:
+        need = warm_cache.max_units(yt_channel_input.strip() or artist, max_videos)
+        msg = f"Exact fetch: up to {need:,} of {yt_quota:,} daily YouTube quota units."
+        (st.warning if need > yt_quota // 2 else st.caption)(msg)
     go = st.button("Show Data")
+    show_board = st.toggle("Leaderboard (all artists)", value=False,
+                           help="Rank every stored artist result by a conversion metric.")
+    show_changes = st.toggle("Change feed (roster)", value=False,
+                             help="What changed in tickets, channel and Spotify numbers, from stored snapshots.")
+    # blank channel box → search by artist name (same key the roster warmer fills)
+    yt_channel_input = yt_channel_input.strip() or artist
      # in sidebar
    
 
 
 # -------------- Main --------------
 if go:
-    try:
-        # Tickets (TouringData cache)
-        tickets_2023 = dp.get_2023_tickets_sold_for_artist(artist)
-
-        if full_mode:
-            st.caption("Mode: Full (2023-only YouTube stats)")
+    with perf.collect("dashboard") as trace:
+        try:
+            # Tickets (TouringData cache)
+            tickets_2023 = dp.get_2023_tickets_sold_for_artist(artist)
+            yt_year = None
+            conv_full = {}
+            exact = True
+
+            if full_mode:
+                st.caption("Mode: Full (2023-only YouTube stats)")
             
            
-            # in full mode block, replace yt_year call:
-            yt_year = dp.yt_annual_stats_multi(
-                yt_channel_input,
-                int(year),
-                include_comments=True,
-                verify_with_html=show_raw_labels,
-                max_videos=400
+                # cached / full / sampled, whichever answers within the latency budget
+                import planner
+                plan = planner.annual_totals(yt_channel_input, int(year), budget_s=budget_s,
+                                             max_videos=max_videos, verify_with_html=show_raw_labels)
+                yt_year = plan["totals"]
+                exact = plan["strategy"] != "sampled"
+                if not exact:
+                    st.caption(f"YouTube {year} totals are estimates from a random sample of weeks "
+                               f"({plan['accuracy']}, 95% interval); the exact fetch (~{plan['expected_full_s']:.0f}s) "
+                               "continues in the background — press Show Data again for exact numbers.")
+
+
+                # Accurate annual totals via official API (your updated pipeline)
+                # yt_year = dp.yt_annual_stats(
+                #     yt_channel_input,
+                #     int(year),
+                #     include_comments=True,
+                #     verify_with_html=show_raw_labels,  # optional sample of raw labels
+                #     max_videos=400
+                # )
+
+                st.session_state["window_ctx"] = (yt_channel_input, int(year))
+
+                # Lifetime (for auxiliary conversions shown below)
+                yt_life = dp.get_youtube_channel_stats(yt_channel_input)
+
+                # Conversions (prefer pipeline; otherwise safe fallback)
+                conv_full  = safe_full_conversions(yt_year, tickets_2023)
+                conv_light = dp.compute_conversions_percent(yt_life, tickets_2023)
+
+                # ----- Stats -----
+                st.subheader("📊 Stats")
+                row("Tickets Sold (2023)", fmt_num(tickets_2023))
+                approx = "" if exact else " ≈"
+                for label, m in ((f"Views ({year})", "views"), (f"Likes ({year})", "likes"),
+                                 (f"Comments ({year})", "comments"), (f"Videos in {year}", "video_count")):
+                    ci = "" if exact else f" ± {fmt_num(plan['ci'][m])}"
+                    row(label + approx, fmt_num(yt_year.get(m, 0)) + ci)
+                if yt_year.get("likes_hidden_videos"):
+                    st.caption(f"Likes include ≈{fmt_num(yt_year['likes_estimated'])} "
+                               f"(± {fmt_num(yt_year['likes_estimate_se'])}) estimated for "
+                               f"{yt_year['likes_hidden_videos']:,} videos with hidden like counts.")
+
+                # Optional raw samples table
+                if show_raw_labels and yt_year.get("_sample_raw"):
+                    import pandas as pd
+                    st.markdown("<div style='margin-top:8px; opacity:0.8;'>Raw sample labels from watch pages (verification only)</div>", unsafe_allow_html=True)
+                    st.dataframe(pd.DataFrame(yt_year["_sample_raw"]), use_container_width=True, hide_index=True)
+
+                # Channels listed together can share videos (same channel twice, VEVO re-uploads): the totals
+                # above count each once; the plain per-channel sum is shown for comparison
+                if exact and len(dp._split_channels(yt_channel_input)) > 1:
+                    try:
+                        import catalog
+                        cat = catalog.build(yt_channel_input, int(year), max_videos=max_videos)
+                        ov = cat["overlap"]
+                        summed = yt_year.get("summed")
+                        if summed or ov["duplicate_ids"] or ov["reupload_copies"]:
+                            st.caption(
+                                f"Cross-channel overlap: {ov['unique']:,} unique of {ov['listed']:,} listed videos, "
+                                f"{ov['reupload_copies']:,} re-uploads in {len(ov['reupload_groups']):,} groups "
+                                f"(counted once in the totals above)."
+                                + (f" Summing the channels separately: {fmt_num(summed['views'])} views, "
+                                   f"{fmt_num(summed['likes'])} likes, {summed['video_count']:,} videos." if summed else ""))
+                    except Exception:
+                        pass
+
+                # Breakdown by video type from the per-video table cached by the fetch above (no extra calls;
+                # a sampled answer has no per-video rows until the exact fetch lands)
+                if exact:
+                    try:
+                        import pandas as pd
+                        import videos
+                        kinds = videos.table(yt_channel_input, int(year), max_videos=max_videos).by_type()
+                        tot = {m: sum(k[m] for k in kinds.values()) or 1 for m in ("views", "likes")}
+                        if sum(k["video_count"] for k in kinds.values()):
+                            st.markdown("**By video type**")
+                            st.dataframe(pd.DataFrame([
+                                {"type": t, "videos": k["video_count"],
+                                 "share of views": fmt_pct(k["views"] / tot["views"] * 100),
+                                 "share of likes": fmt_pct(k["likes"] / tot["likes"] * 100)}
+                                for t, k in kinds.items()]), use_container_width=True, hide_index=True)
+                    except Exception:
+                        pass
+
+                # ----- Conversion Rates -----
+                st.subheader("📈 Conversion Rates")
+                row("Views → Likes", fmt_pct(conv_full.get("views_to_likes_pct")))
+                row("Likes → Sales", fmt_pct(conv_full.get("likes_to_sales_pct")))
+                row("Comments → Sales", fmt_pct(conv_full.get("comments_to_sales_pct")))
+                row("Views → Sales (lifetime views)", fmt_pct(conv_light.get("views_to_sales_pct")))
+                row("Subs → Sales (lifetime subs)", fmt_pct(conv_light.get("subs_to_sales_pct")))
+                row("Sales per 1M Views (lifetime)", f"{conv_light['sales_per_1m_views']:.2f}" if conv_light.get("sales_per_1m_views") is not None else "-")
+                row("Sales per 10k Subs (lifetime)", f"{conv_light['sales_per_10k_subs']:.2f}" if conv_light.get("sales_per_10k_subs") is not None else "-")
+
+            else:
+                st.caption("Mode: Light (lifetime YouTube stats)")
+                yt_life = dp.get_youtube_channel_stats(yt_channel_input)
+                conv_light = dp.compute_conversions_percent(yt_life, tickets_2023)
+
+                st.subheader("📊 Stats")
+                row("Tickets Sold (2023)", fmt_num(tickets_2023))
+                row("YouTube Views (lifetime)", fmt_num(yt_life.get("viewCount", 0)))
+                row("Subscribers (lifetime)", fmt_num(yt_life.get("subscriberCount", 0)))
+                row("Videos (lifetime)", fmt_num(yt_life.get("videoCount", 0)))
+
+                st.subheader("📈 Conversion Rates")
+                row("Views → Sales", fmt_pct(conv_light.get("views_to_sales_pct")))
+                row("Subs → Sales", fmt_pct(conv_light.get("subs_to_sales_pct")))
+                row("Sales per 1M Views", f"{conv_light['sales_per_1m_views']:.2f}" if conv_light.get("sales_per_1m_views") is not None else "-")
+                row("Sales per 10k Subs", f"{conv_light['sales_per_10k_subs']:.2f}" if conv_light.get("sales_per_10k_subs") is not None else "-")
+
+            # ----- Spotify block (monthly listeners as streams) -----
+            with st.expander("🎧 Spotify (followers + monthly listeners as streams)", expanded=True):
+                sp_followers = dp.spotify_artist_followers(artist)
+                ml_info = dp.spotify_monthly_listeners_scrape(artist, return_raw=True)
+                monthly_listeners = ml_info.get("value", 0)
+                monthly_listeners_raw = ml_info.get("raw") or "-"
+
+                sp_conv = dp.compute_spotify_conversions_monthly(
+                    tickets_total=tickets_2023,
+                    followers=sp_followers,
+                    monthly_streams=monthly_listeners,
+                    clip_to_100=True
+                )
+
+                st.subheader("Stats")
+                row("Followers (Spotify)", fmt_num(sp_followers))
+                row("Monthly Listeners (raw)", monthly_listeners_raw)
+                row("Monthly Listeners (parsed)", fmt_num(monthly_listeners))
+
+                st.subheader("Conversion Rates")
+                row("Streams → Followers", fmt_pct(sp_conv.get("streams_to_followers_pct")))
+                row("Followers → Sales",   fmt_pct(sp_conv.get("followers_to_sales_pct")))
+                row("Streams → Sales",     fmt_pct(sp_conv.get("streams_to_sales_pct")))
+
+            # Feed the leaderboard (stored result + in-place index update)
+            try:
+                import planner, rankings, results
+                rankings.record(results.from_pipeline(
+                    artist, int(year) if full_mode else 2023, yt_channel_input, tickets_2023,
+                    yt_year=yt_year if exact else None, yt_life=yt_life, sp_followers=sp_followers,
+                    monthly_listeners=monthly_listeners, yt_scale=planner._MULTI_SCALE))
+            except Exception:
+                pass
+
+            # Persist the computed conversions and tie the typed inputs to the artist
+            try:
+                import store
+                st_db = store.default()
+                if st_db is not None:
+                    st_db.write_conversions(artist, int(year) if full_mode else 2023,
+                                            {**conv_light, **(conv_full if exact else {}), **sp_conv})
+                    st_db.link_artist(artist, "youtube", dp._split_channels(yt_channel_input))
+                    st_db.link_artist(artist, "spotify", [artist])
+            except Exception:
+                pass
+
+            # Footnote
+            st.caption(
+                "Tickets from TouringData’s 2023 year-end post (cached). "
+                "Full Mode uses YouTube Data API per-video statistics for the selected year; "
+                "Light Mode uses lifetime channel aggregates. "
+                "Spotify followers from Web API; monthly listeners scraped from public artist page."
             )
 
+            # Friendly env hints
+            if not os.getenv("YOUTUBE_API_KEY"):
+                st.info("YouTube key not loaded from .env — YouTube numbers will be zero until you add a valid key.")
+            if not (os.getenv("SPOTIFY_CLIENT_ID") and os.getenv("SPOTIFY_CLIENT_SECRET")):
+                st.info("Spotify client credentials not found in .env — followers may show as zero.")
 
-            # Accurate annual totals via official API (your updated pipeline)
-            # yt_year = dp.yt_annual_stats(
-            #     yt_channel_input,
-            #     int(year),
-            #     include_comments=True,
-            #     verify_with_html=show_raw_labels,  # optional sample of raw labels
-            #     max_videos=400
-            # )
-
-            # Lifetime (for auxiliary conversions shown below)
-            yt_life = dp.get_youtube_channel_stats(yt_channel_input)
-
-            # Conversions (prefer pipeline; otherwise safe fallback)
-            conv_full  = safe_full_conversions(yt_year, tickets_2023)
-            conv_light = dp.compute_conversions_percent(yt_life, tickets_2023)
-
-            # ----- Stats -----
-            st.subheader("📊 Stats")
-            row("Tickets Sold (2023)", fmt_num(tickets_2023))
-            row(f"Views ({year})", fmt_num(yt_year.get("views", 0)))
-            row(f"Likes ({year})", fmt_num(yt_year.get("likes", 0)))
-            row(f"Comments ({year})", fmt_num(yt_year.get("comments", 0)))
-            row(f"Videos in {year}", fmt_num(yt_year.get("video_count", 0)))
-
-            # Optional raw samples table
-            if show_raw_labels and yt_year.get("_sample_raw"):
-                import pandas as pd
-                st.markdown("<div style='margin-top:8px; opacity:0.8;'>Raw sample labels from watch pages (verification only)</div>", unsafe_allow_html=True)
-                st.dataframe(pd.DataFrame(yt_year["_sample_raw"]), use_container_width=True, hide_index=True)
-
-            # ----- Conversion Rates -----
-            st.subheader("📈 Conversion Rates")
-            row("Views → Likes", fmt_pct(conv_full.get("views_to_likes_pct")))
-            row("Likes → Sales", fmt_pct(conv_full.get("likes_to_sales_pct")))
-            row("Comments → Sales", fmt_pct(conv_full.get("comments_to_sales_pct")))
-            row("Views → Sales (lifetime views)", fmt_pct(conv_light.get("views_to_sales_pct")))
-            row("Subs → Sales (lifetime subs)", fmt_pct(conv_light.get("subs_to_sales_pct")))
-            row("Sales per 1M Views (lifetime)", f"{conv_light['sales_per_1m_views']:.2f}" if conv_light.get("sales_per_1m_views") is not None else "-")
-            row("Sales per 10k Subs (lifetime)", f"{conv_light['sales_per_10k_subs']:.2f}" if conv_light.get("sales_per_10k_subs") is not None else "-")
-
-        else:
-            st.caption("Mode: Light (lifetime YouTube stats)")
-            yt_life = dp.get_youtube_channel_stats(yt_channel_input)
-            conv_light = dp.compute_conversions_percent(yt_life, tickets_2023)
-
-            st.subheader("📊 Stats")
-            row("Tickets Sold (2023)", fmt_num(tickets_2023))
-            row("YouTube Views (lifetime)", fmt_num(yt_life.get("viewCount", 0)))
-            row("Subscribers (lifetime)", fmt_num(yt_life.get("subscriberCount", 0)))
-            row("Videos (lifetime)", fmt_num(yt_life.get("videoCount", 0)))
-
-            st.subheader("📈 Conversion Rates")
-            row("Views → Sales", fmt_pct(conv_light.get("views_to_sales_pct")))
-            row("Subs → Sales", fmt_pct(conv_light.get("subs_to_sales_pct")))
-            row("Sales per 1M Views", f"{conv_light['sales_per_1m_views']:.2f}" if conv_light.get("sales_per_1m_views") is not None else "-")
-            row("Sales per 10k Subs", f"{conv_light['sales_per_10k_subs']:.2f}" if conv_light.get("sales_per_10k_subs") is not None else "-")
-
-        # ----- Spotify block (monthly listeners as streams) -----
-        with st.expander("🎧 Spotify (followers + monthly listeners as streams)", expanded=True):
-            sp_followers = dp.spotify_artist_followers(artist)
-            ml_info = dp.spotify_monthly_listeners_scrape(artist, return_raw=True)
-            monthly_listeners = ml_info.get("value", 0)
-            monthly_listeners_raw = ml_info.get("raw") or "-"
-
-            sp_conv = dp.compute_spotify_conversions_monthly(
-                tickets_total=tickets_2023,
-                followers=sp_followers,
-                monthly_streams=monthly_listeners,
-                clip_to_100=True
-            )
+        except Exception as e:
+            st.error(f"Error: {e}")
 
-            st.subheader("Stats")
-            row("Followers (Spotify)", fmt_num(sp_followers))
-            row("Monthly Listeners (raw)", monthly_listeners_raw)
-            row("Monthly Listeners (parsed)", fmt_num(monthly_listeners))
-
-            st.subheader("Conversion Rates")
-            row("Streams → Followers", fmt_pct(sp_conv.get("streams_to_followers_pct")))
-            row("Followers → Sales",   fmt_pct(sp_conv.get("followers_to_sales_pct")))
-            row("Streams → Sales",     fmt_pct(sp_conv.get("streams_to_sales_pct")))
-
-        # Footnote
-        st.caption(
-            "Tickets from TouringData’s 2023 year-end post (cached). "
-            "Full Mode uses YouTube Data API per-video statistics for the selected year; "
-            "Light Mode uses lifetime channel aggregates. "
-            "Spotify followers from Web API; monthly listeners scraped from public artist page."
-        )
-
-        # Friendly env hints
-        if not os.getenv("YOUTUBE_API_KEY"):
-            st.info("YouTube key not loaded from .env — YouTube numbers will be zero until you add a valid key.")
-        if not (os.getenv("SPOTIFY_CLIENT_ID") and os.getenv("SPOTIFY_CLIENT_SECRET")):
-            st.info("Spotify client credentials not found in .env — followers may show as zero.")
-
-    except Exception as e:
-        st.error(f"Error: {e}")
+    # ----- History (every earlier fetch, from the local store) -----
+    with st.expander("📚 History", expanded=False):
+        try:
+            render_history(artist, yt_channel_input)
+        except Exception as e:
+            st.caption(f"History unavailable: {e}")
+
+    # ----- Performance (where did the time go?) -----
+    with st.expander("⏱ Performance", expanded=False):
+        render_perf(trace)
+
+# ----- Custom time windows (reuses the last Full Mode run's channels) -----
+if full_mode and st.session_state.get("window_ctx"):
+    with st.expander("🗓 Custom time window", expanded=False):
+        if st.toggle("Index videos for windowed totals", value=False,
+                     help="Enumerates the channels' videos for the surrounding years once; "
+                          "changing the window afterwards costs no API calls."):
+            render_windows(*st.session_state["window_ctx"])
+
+# ----- Change feed (stored snapshots only) -----
+if show_changes:
+    with st.expander("🔔 Change feed", expanded=True):
+        render_changes()
+
+# ----- Leaderboard (cross-artist) -----
+if show_board:
+    with st.expander("🏆 Leaderboard", expanded=True):
+        render_leaderboard(artist, int(year))
 
 
 # # app.py — aligned two-column layout, new title
@@ -0,0 +1,112 @@
+# benchmarks/bench_api.py — drive the ASGI service in-process against replayed upstreams
+#
+#   python -m benchmarks.bench_api [--clients 20] [--latency 0.02]
+#
+# Fires N identical concurrent /conversions queries at a fresh service and checks that
+# coalescing keeps upstream HTTP traffic equal to a single run's. Each scenario runs in its
+# own process, so neither starts with the other's cached results or Spotify token.
+import argparse, asyncio, json, os, statistics, sys, tempfile, time
+from urllib.parse import urlencode
+
+os.environ["PIPELINE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "pipeline_cache.pkl")
+os.environ["PIPELINE_DB"] = os.path.join(tempfile.mkdtemp(), "pipeline.db")
+os.environ.setdefault("YOUTUBE_API_KEY", "bench-key")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "bench-id")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "bench-secret")
+
+from benchmarks import fixtures as F
+from replay import ReplayAdapter, install
+
+async def call(app, path: str, **params) -> tuple[int, dict]:
+    """Minimal in-process ASGI client."""
+    scope = {"type": "http", "method": "GET", "path": path,
+             "query_string": urlencode(params).encode(), "headers": []}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(msg):
+        sent.append(msg)
+
+    await app(scope, receive, send)
+    status = sent[0]["status"]
+    return status, json.loads(sent[1]["body"])
+
+async def scenario(clients: int) -> dict:
+    import api_service
+    api_service.dp.RESULT_CACHE.clear()
+    svc = api_service.PipelineService(max_upstream=4)
+    app = api_service.make_app(svc)
+    q = dict(artist=F.ARTIST, channels=",".join(F.CHANNELS), year=F.YEAR)
+
+    async def one():
+        t0 = time.perf_counter()
+        status, body = await call(app, "/conversions", **q)
+        return status, time.perf_counter() - t0, body
+
+    t0 = time.perf_counter()
+    res = await asyncio.gather(*(one() for _ in range(clients)))
+    wall = time.perf_counter() - t0
+    lat = sorted(r[1] for r in res)
+    bodies = {json.dumps(r[2], sort_keys=True) for r in res}
+
+    # warm follow-up is served from cache
+    t1 = time.perf_counter()
+    await call(app, "/conversions", **q)
+    warm = time.perf_counter() - t1
+
+    bad = await call(app, "/tickets")
+    return {
+        "clients": clients,
+        "statuses": sorted({r[0] for r in res}),
+        "identical_bodies": len(bodies) == 1,
+        "wall_s": round(wall, 4),
+        "p50_ms": round(statistics.median(lat) * 1000, 1),
+        "max_ms": round(lat[-1] * 1000, 1),
+        "warm_ms": round(warm * 1000, 2),
+        "missing_param_status": bad[0],
+        "service": svc.metrics(),
+    }
+
+def run_scenario(clients: int, latency: float) -> dict:
+    """One scenario against a fresh pipeline: caches, Spotify token, singleflight all start empty."""
+    import pathlib, ticket_scraper as ts
+    fx = F.build()
+    with tempfile.TemporaryDirectory() as tmp:
+        ts.CACHE_JSON = pathlib.Path(tmp) / "tickets.json"
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            out = asyncio.run(scenario(clients))
+    out["upstream_calls"] = sum(ad.calls.values())
+    return out
+
+def _in_subprocess(clients: int, latency: float) -> dict:
+    import subprocess
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_api", "--scenario", str(clients),
+                           "--latency", str(latency)], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "scenario failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.02, help="simulated seconds per upstream call")
+    ap.add_argument("--scenario", type=int, help=argparse.SUPPRESS)     # internal: one scenario, JSON line out
+    args = ap.parse_args(argv)
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.latency)))
+        return 0
+    # each scenario in its own process, so nothing one leaves cached can flatter the other
+    single = _in_subprocess(1, args.latency)
+    out = _in_subprocess(args.clients, args.latency)
+    out["upstream_calls_single_client"] = single.pop("upstream_calls")
+    out["upstream_calls_all_clients"] = out.pop("upstream_calls")
+    print(json.dumps(out, indent=2))
+    ok = out["upstream_calls_all_clients"] == out["upstream_calls_single_client"] and out["statuses"] == [200]
+    print("OK: concurrent identical queries shared one upstream fetch" if ok else "FAIL: upstream amplification")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,560 @@
+# benchmarks/bench_pipeline.py — offline end-to-end benchmarks against replayed upstream responses
+#
+#   python -m benchmarks.bench_pipeline                  # run + compare to baseline.json
+#   python -m benchmarks.bench_pipeline --save           # run + overwrite baseline.json
+#   python -m benchmarks.bench_pipeline --latency recorded   # replay with recorded per-call timing
+#   python -m benchmarks.bench_pipeline --record out.json.gz  # capture live responses (needs keys)
+#
+# Exit code 1 when a metric regresses past the tolerance.
+import argparse, json, os, pathlib, statistics, sys, tempfile, time, tracemalloc
+
+HERE = pathlib.Path(__file__).resolve().parent
+BASELINE = HERE / "baseline.json"
+
+# Fake credentials so the pipeline takes its API paths; all traffic is replayed.
+# The shared result cache goes to a scratch file and is cleared before every measured call.
+os.environ["PIPELINE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "pipeline_cache.pkl")
+os.environ["PIPELINE_DB"] = os.path.join(tempfile.mkdtemp(), "pipeline.db")
+os.environ.setdefault("YOUTUBE_API_KEY", "bench-key")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "bench-id")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "bench-secret")
+
+from benchmarks import fixtures as F
+from replay import Fixtures, ReplayAdapter, RecordingAdapter, canonical_key, install
+
+# metric name → (direction, relative tolerance). "lower"/"higher" is better; "exact" = must not grow.
+METRICS = {
+    "yt_annual_multi_s":          ("lower", 0.50),
+    "yt_annual_multi_peak_kb":    ("lower", 0.50),
+    "yt_annual_multi_http_calls": ("exact", 0.0),
+    "yt_annual_multi_8_sessions_http_calls": ("exact", 0.0),
+    "yt_lifetime_s":              ("lower", 0.50),
+    "yt_lifetime_warm_s":         ("lower", 0.50),
+    "spotify_s":                  ("lower", 0.50),
+    "spotify_http_calls":         ("exact", 0.0),
+    "spotify_roster_bulk_http_calls": ("exact", 0.0),
+    "spotify_roster_bulk_s":      ("lower", 0.50),
+    "spotify_ml_bulk_s":          ("lower", 0.50),
+    "spotify_ml_kb_per_artist":   ("lower", 0.50),
+    "abbrev_scalar_labels_per_s": ("higher", 0.50),
+    "abbrev_bulk_labels_per_s":   ("higher", 0.50),
+    "abbrev_locale_mismatches":   ("exact", 0.0),
+    "window_index_http_calls":    ("exact", 0.0),
+    "video_table_http_calls_after_annual": ("exact", 0.0),
+    "catalog_http_calls":         ("exact", 0.0),
+    "yt_annual_multi_duplicate_videos": ("exact", 0.0),
+    "planner_sampled_http_calls": ("exact", 0.0),
+    "like_estimate_http_calls":   ("exact", 0.0),
+    "planner_cached_http_calls":  ("exact", 0.0),
+    "source_cached_http_calls":   ("exact", 0.0),
+    "window_queries_per_s":       ("higher", 0.50),
+    "rank_updates_per_s":         ("higher", 0.50),
+    "rank_queries_per_s":         ("higher", 0.50),
+    "rankings_duplicate_entries": ("exact", 0.0),
+    "rankings_scale_mismatches":  ("exact", 0.0),
+    "ticket_parse_artists_per_s": ("higher", 0.50),
+    "ticket_parse_kb_per_s":      ("higher", 0.50),
+    "ticket_lookup_per_s":        ("higher", 0.50),
+    "ticket_cache_kb":            ("lower", 0.50),
+    "store_video_rows_per_s":     ("higher", 0.50),
+    "stream_peak_kb":             ("lower", 0.50),
+    "replay_mode_misses":         ("exact", 0.0),
+    "store_queries_per_s":        ("higher", 0.50),
+    "changes_feed_per_s":         ("higher", 0.50),
+    "ticket_backfill_s":          ("lower", 0.50),
+    "ticket_backfill_http_calls": ("exact", 0.0),
+}
+
+def _median_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def _fresh_pipeline(tmpdir: pathlib.Path):
+    """Import the pipeline with its ticket cache pointed at a scratch file."""
+    import ticket_scraper as ts
+    import data_pipeline as dp
+    ts.CACHE_JSON = tmpdir / "touringdata_2023_tickets.json"
+    dp._TD_2023 = None
+    return ts, dp
+
+# replay-mode session (own process, no network): the dashboard's helpers, all served from the archive
+_REPLAY_SESSION = """
+import json, os, sys
+sys.path.insert(0, %r)
+import data_pipeline as dp, replay, store, ticket_scraper as ts
+channels, artist, year = sys.argv[1], sys.argv[2], int(sys.argv[3])
+annual = dp.yt_annual_stats_multi(channels, year, include_comments=True, verify_with_html=True, max_videos=400)
+dp.get_youtube_channel_stats(channels.split(",")[0].strip())
+dp.spotify_artist_followers(artist)
+dp.spotify_monthly_listeners_scrape(artist)
+tickets = ts.load_cached_ticket_totals()
+ad = replay.active()
+print(json.dumps({"annual": {k: v for k, v in annual.items() if not k.startswith("_")}, "tickets": len(tickets),
+                  "misses": len(ad.misses), "calls": sum(ad.calls.values()), "store_off": store.default() is None,
+                  "local_files": sorted(os.listdir("."))}))
+""" % str(HERE.parent)
+
+def run(fx: Fixtures, repeat: int = 5, latency=None) -> dict:
+    out = {}
+    channels = ", ".join(F.CHANNELS)
+    with tempfile.TemporaryDirectory() as tmp:
+        ts, dp = _fresh_pipeline(pathlib.Path(tmp))
+        import http_client, perf
+        http_client.set_rate_limit("open.spotify.com", None)    # timings measure our code, not politeness
+
+        # --- end-to-end yt_annual_stats_multi (resolve → search paging → videos.list → samples)
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            def call():
+                dp.RESULT_CACHE.clear()
+                return dp.yt_annual_stats_multi(channels, F.YEAR, include_comments=True,
+                                                verify_with_html=True, max_videos=400)
+            res = call()
+            calls_one_run = dict(ad.calls)
+            out["yt_annual_multi_s"] = _median_time(call, repeat)
+            tracemalloc.start()
+            call()
+            out["yt_annual_multi_peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+            out["yt_annual_multi_http_calls"] = sum(calls_one_run.values())
+            out["_yt_annual_multi_calls_by_endpoint"] = calls_one_run
+            out["_yt_annual_multi_result"] = {k: v for k, v in res.items() if not k.startswith("_")}
+            if ad.misses:
+                out["_misses"] = sorted(set(ad.misses))[:10]
+
+        # --- 8 concurrent "dashboard sessions" issuing the same query (single-flight)
+        import singleflight
+        from concurrent.futures import ThreadPoolExecutor
+        with install(ReplayAdapter(fx, latency=latency or 0.005)) as ad:
+            before = singleflight.group("yt_annual_stats_multi").stats()["coalesced"]
+            dp.RESULT_CACHE.clear()
+            with ThreadPoolExecutor(8) as pool:
+                list(pool.map(lambda _: dp.yt_annual_stats_multi(channels, F.YEAR, include_comments=True,
+                                                                 verify_with_html=True, max_videos=400),
+                              range(8)))
+            out["yt_annual_multi_8_sessions_http_calls"] = sum(ad.calls.values())
+            out["_yt_annual_multi_8_sessions_coalesced"] = (
+                singleflight.group("yt_annual_stats_multi").stats()["coalesced"] - before)
+
+        # --- lifetime channel stats
+        with install(ReplayAdapter(fx, latency=latency)):
+            def life():
+                dp.RESULT_CACHE.clear()
+                return dp.get_youtube_channel_stats("@beyonce")
+            out["yt_lifetime_s"] = _median_time(life, repeat)
+            dp.get_youtube_channel_stats("@beyonce")
+            out["yt_lifetime_warm_s"] = _median_time(lambda: dp.get_youtube_channel_stats("@beyonce"), repeat)
+
+        # --- Spotify followers + monthly listeners
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            def sp():
+                dp.RESULT_CACHE.clear()
+                dp.spotify_artist_followers(F.ARTIST)
+                dp.spotify_monthly_listeners_scrape(F.ARTIST, return_raw=True)
+            sp()
+            out["spotify_http_calls"] = sum(ad.calls.values())
+            out["spotify_s"] = _median_time(sp, repeat)
+
+        # --- roster followers: bulk /v1/artists?ids= vs one /v1/artists/{id} per artist
+        roster = F.artist_names(60)
+        F.add_spotify_roster(fx, roster)
+        with install(ReplayAdapter(fx, latency=latency or 0.005, routes=F.ROUTES)) as ad:
+            dp.RESULT_CACHE.clear()
+            dp._SP_TOKEN.update(value=None, expires=0.0)
+            t0 = time.perf_counter()
+            bulk = dp.spotify_artists_bulk(roster)
+            out["spotify_roster_bulk_s"] = time.perf_counter() - t0
+            out["spotify_roster_bulk_http_calls"] = sum(ad.calls.values())
+            out["_spotify_roster_resolved"] = f"{sum(v is not None for v in bulk.values())}/{len(roster)}"
+        with install(ReplayAdapter(fx, latency=latency or 0.005)) as ad:
+            dp.RESULT_CACHE.clear()
+            t0 = time.perf_counter()
+            for a in roster:
+                dp.spotify_artist_followers(a)
+            out["_spotify_roster_per_artist_s"] = round(time.perf_counter() - t0, 4)
+            out["_spotify_roster_per_artist_http_calls"] = sum(ad.calls.values())
+
+        # --- monthly listeners for the roster: worker pool, per-host limit, early-stop streaming
+        http_client.set_rate_limit("open.spotify.com", 100)
+        with install(ReplayAdapter(fx, latency=latency or 0.02)) as ad:
+            dp.RESULT_CACHE.clear()
+            with perf.collect("ml_bulk") as tr:
+                t0 = time.perf_counter()
+                ml = dp.spotify_monthly_listeners_bulk(roster, max_workers=8)
+                out["spotify_ml_bulk_s"] = time.perf_counter() - t0
+            page_kb = ad.bytes["open.spotify.com/artist/{id}"] / 1024 / max(1, len(roster))
+            out["spotify_ml_kb_per_artist"] = tr.http["open.spotify.com/artist/{id}"]["bytes"] / 1024 / max(1, len(roster))
+            out["_spotify_ml_page_kb"] = round(page_kb, 1)
+            out["_spotify_ml_found"] = f"{sum(1 for v in ml.values() if v['value'])}/{len(roster)}"
+            out["_spotify_ml_p50_ms"] = round(statistics.median(v["seconds"] for v in ml.values()) * 1000, 1)
+            before = sum(ad.calls.values())
+            again = dp.spotify_monthly_listeners_bulk(roster)
+            out["_spotify_ml_warm_http_calls"] = sum(ad.calls.values()) - before
+            out["_spotify_ml_warm_cached"] = sum(v["cached"] for v in again.values())
+        http_client.set_rate_limit("open.spotify.com", None)
+
+        # --- count-label parsing: scalar loop vs vectorized bulk parser (must agree exactly)
+        labels = F.count_labels(100_000)
+        t = _median_time(lambda: [dp.parse_abbrev_count(x) for x in labels], 3)
+        out["abbrev_scalar_labels_per_s"] = len(labels) / t
+        tb = _median_time(lambda: dp.parse_abbrev_counts(labels), 3)
+        out["abbrev_bulk_labels_per_s"] = len(labels) / tb
+        out["_abbrev_speedup"] = round(t / tb, 1)
+        out["_abbrev_bulk_matches_scalar"] = bool(
+            (dp.parse_abbrev_counts(labels) == [dp.parse_abbrev_count(x) for x in labels]).all())
+        bad = [(loc, label, got, want) for loc, cases in ABBREV_LOCALE_CASES.items()
+               for (label, want), got in zip(cases.items(), dp.parse_abbrev_counts(list(cases), locale=loc).tolist())
+               if got != want]
+        out["abbrev_locale_mismatches"] = len(bad)
+        if bad:
+            out["_abbrev_locale_mismatches"] = bad
+
+        # --- windowed aggregation: one enumeration, then many windows from the prefix-sum index
+        import windows
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            dp.RESULT_CACHE.clear()
+            idx = windows.build_index(channels, f"{F.YEAR}-01-01", f"{F.YEAR}-12-31", max_videos=400)
+            out["window_index_http_calls"] = sum(ad.calls.values())
+            before = sum(ad.calls.values())
+            wins = ([windows.quarter(F.YEAR, q) for q in (1, 2, 3, 4)]
+                    + [windows.around(f"{F.YEAR}-{m:02d}-15", 90, 90) for m in range(1, 13)]
+                    + [windows.rolling_months(f"{F.YEAR}-{m:02d}-28", 3) for m in range(1, 13)])
+            t = _median_time(lambda: idx.query_many(wins * 100), repeat)
+            out["window_queries_per_s"] = len(wins) * 100 / t
+            idx2 = windows.build_index(channels, f"{F.YEAR}-01-01", f"{F.YEAR}-12-31", max_videos=400)
+            out["_window_rebuild_http_calls"] = sum(ad.calls.values()) - before
+            full = idx2.query(windows.calendar_year(F.YEAR))
+            listed = out["_yt_annual_multi_result"].get("summed", out["_yt_annual_multi_result"])  # before re-upload de-dup
+            out["_window_year_matches_annual"] = (full["video_count"] == listed["video_count"]
+                                                  and full["views"] * 1000 == listed["views"])
+
+        # --- per-video table: free once yt_annual_stats_multi ran; type breakdown is local
+        import videos
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            dp.RESULT_CACHE.clear()
+            annual = dp.yt_annual_stats_multi(channels, F.YEAR, include_comments=True, max_videos=400)
+            before = sum(ad.calls.values())
+            vt = videos.table(channels, F.YEAR)
+            out["video_table_http_calls_after_annual"] = sum(ad.calls.values()) - before
+            kinds = vt.by_type()
+            out["_video_types"] = {k: v["video_count"] for k, v in kinds.items()}
+            out["_video_types_sum_matches_annual"] = (sum(v["views"] for v in kinds.values()) * 1000
+                                                      == annual.get("summed", annual)["views"])
+            out["_video_by_type_us"] = round(_median_time(vt.by_type, repeat) * 1e6, 1)
+
+        # --- query planner: 2 s budget against recorded-size latencies → sampled weeks + CI,
+        # then the background exact fetch makes the next ask a cache hit
+        import planner
+        with install(ReplayAdapter(fx, latency=latency, routes=F.ROUTES)) as ad:
+            dp.RESULT_CACHE.clear()
+            planner.LATENCY_S.update(search=0.35, videos=0.25)       # pin the model: same plan every run
+            t0 = time.perf_counter()
+            ans = planner.annual_totals(channels, F.YEAR, budget_s=2.0, background=False, seed=11)
+            out["_planner_sampled_s"] = round(time.perf_counter() - t0, 4)
+            out["planner_sampled_http_calls"] = sum(ad.calls.values())
+            exact = planner.refine(channels, F.YEAR).result()
+            before = sum(ad.calls.values())
+            again = planner.annual_totals(channels, F.YEAR, budget_s=2.0)
+            out["planner_cached_http_calls"] = sum(ad.calls.values()) - before
+            est, ci = ans["totals"]["views"], ans["ci"]["views"]
+            out["_planner_views"] = {"strategy": ans["strategy"], "accuracy": ans["accuracy"],
+                                     "error_pct": round((est - exact["views"]) / exact["views"] * 100, 1),
+                                     "ci_covers_exact": abs(est - exact["views"]) <= ci,
+                                     "then": again["strategy"]}
+
+        # --- hidden likes: model fill (no requests) vs. what scraping every hidden video's page gives
+        import likes
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            rows = videos.rows(channels, f"{F.YEAR}-01-01", f"{F.YEAR}-12-31")
+            hidden = [r["id"] for r in rows if not r["likes"]]
+            before = sum(ad.calls.values())
+            t0 = time.perf_counter()
+            est = likes.fill_hidden(rows, hidden, calibrate_n=0)
+            out["_like_estimate_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            out["like_estimate_http_calls"] = sum(ad.calls.values()) - before
+            scraped = sum(s["likes_parsed"] for s in dp.watch_page_labels(hidden))
+            out["_like_estimate"] = {"hidden": est["hidden"], "estimate": est["likes"], "se": est["se"],
+                                     "scraped": scraped, "scrape_http_calls": len(hidden),
+                                     "error_pct": round((est["likes"] - scraped) / scraped * 100, 1)}
+
+        # --- cross-channel catalog: a handle and its channel ID listed together + VEVO re-uploads
+        import catalog
+        overlapping = channels + ", " + F.CHANNELS["@beyonce"][0]
+        with install(ReplayAdapter(fx, latency=latency, routes=F.ROUTES)) as ad:
+            dp.RESULT_CACHE.clear()
+            cat = catalog.build(overlapping, F.YEAR)
+            out["catalog_http_calls"] = sum(ad.calls.values())
+            out["_catalog_overlap"] = {k: v for k, v in cat["overlap"].items() if k != "reupload_groups"}
+            out["_catalog_quota"] = cat["quota"]
+            out["_catalog_totals"] = cat["totals"]["video_count"], cat["totals_canonical"]["video_count"]
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            dp.RESULT_CACHE.clear()
+            dup = dp.yt_annual_stats_multi(overlapping, F.YEAR, include_comments=True, max_videos=400)
+            out["_multi_with_overlap"] = {"http_calls": sum(ad.calls.values()),
+                                                  "video_count": dup["video_count"]}
+            # the headline multi-channel total counts each video once (re-uploads included)
+            out["yt_annual_multi_duplicate_videos"] = dup["video_count"] - cat["totals_canonical"]["video_count"]
+
+        # --- streaming enumeration: a label channel with thousands of uploads, summed batch by batch
+        # (peaks without the like model, whose training sample is a fixed-size reservoir + store rows)
+        big = "UClabelchannel0000000001"
+        peaks = {}
+        for n in (100, 2500, 10000):                            # the first run only warms up imports
+            with install(ReplayAdapter(fx, routes=F.label_channel_routes(big, n))):
+                tracemalloc.start()
+                dp.yt_stream_totals(big, f"{F.YEAR}-01-01", f"{F.YEAR}-12-31", max_videos=None,
+                                    sinks=[dp.store_sink], estimate_likes=False)
+                peaks[n] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                tracemalloc.stop()
+        del peaks[100]
+        with install(ReplayAdapter(fx, routes=F.label_channel_routes(big, 10000))) as ad:
+            tot = dp.yt_stream_totals(big, f"{F.YEAR}-01-01", f"{F.YEAR}-12-31", max_videos=None)
+            out["_stream_http_calls"] = sum(ad.calls.values())
+        out["stream_peak_kb"] = peaks[10000]
+        out["_stream_peak_kb_by_videos"] = peaks
+        out["_stream_totals"] = {k: v for k, v in tot.items() if not k.startswith("_")}
+        with install(ReplayAdapter(fx, routes=F.label_channel_routes(big, 10000))):
+            tracemalloc.start()
+            items = dp._yt_fetch_video_stats(dp._yt_search_video_ids(big, *dp._iso_year_bounds(F.YEAR), max_videos=10**6),
+                                             part=dp.VIDEO_PARTS)
+            out["_materialized_peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+            del items
+
+        # --- offline replay mode: a fresh process with PIPELINE_REPLAY serves every helper from an archive
+        import subprocess
+        arch = {ext: pathlib.Path(tmp) / f"session.json.{ext}" for ext in ("gz", "xz")}
+        for path in arch.values():
+            fx.save(path)
+        env = {k: v for k, v in os.environ.items() if k not in ("PIPELINE_DB", "PIPELINE_CACHE_PATH")}
+        env.update(PIPELINE_REPLAY=str(arch["xz"]), PIPELINE_REPLAY_TIMING="fast")
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", _REPLAY_SESSION, channels, F.ARTIST, str(F.YEAR)],
+                              env=env, cwd=tmp, capture_output=True, text=True, timeout=300)
+        out["_replay_session_s"] = round(time.perf_counter() - t0, 2)
+        got = json.loads(proc.stdout.strip().splitlines()[-1]) if proc.returncode == 0 else {}
+        if proc.returncode:
+            out["_replay_mode_error"] = proc.stderr.strip().splitlines()[-3:]
+        out["replay_mode_misses"] = got.get("misses", -1)
+        def api_counts(r):   # the like-model estimate also depends on stored history (off in replay mode)
+            r = r or {}
+            return [r.get("views"), r.get("comments"), r.get("video_count"),
+                    (r.get("likes") or 0) - (r.get("likes_estimated") or 0)]
+        out["_replay_mode"] = {"matches_live_path": api_counts(got.get("annual")) == api_counts(out["_yt_annual_multi_result"]),
+                               "tickets": got.get("tickets"), "http_calls": got.get("calls"),
+                               "store_off": got.get("store_off"), "local_files": got.get("local_files")}
+        out["_replay_archive_kb"] = {ext: round(p.stat().st_size / 1024, 1) for ext, p in arch.items()}
+
+        # --- leaderboard: incremental updates, then top-20 / rank / percentile queries
+        import random, rankings
+        from results import ArtistResult
+        rng = random.Random(17)
+        recs = [ArtistResult(f"Artist {i}", F.YEAR, tickets=rng.randint(1, 10**6), yt_views=rng.randint(10**6, 10**9),
+                             yt_likes=rng.randint(10**4, 10**7), yt_comments=rng.randint(10**2, 10**5),
+                             sp_followers=rng.randint(10**4, 10**8), fetched_at=i) for i in range(5000)]
+        lb = rankings.Leaderboard()
+        t0 = time.perf_counter()
+        lb.update_many(recs)
+        out["rank_updates_per_s"] = len(recs) / (time.perf_counter() - t0)
+        def queries():
+            for i in range(0, 5000, 10):
+                lb.top("likes_to_sales_pct", F.YEAR, 20)
+                lb.rank("followers_to_sales_pct", F.YEAR, f"Artist {i}")
+                lb.percentile("tickets", F.YEAR, f"Artist {i}")
+        t = _median_time(queries, repeat)
+        out["rank_queries_per_s"] = 1500 / t
+        out["_rank_query_us"] = round(t / 1500 * 1e6, 1)
+
+        # the CLI (--out, unscaled yt_annual_stats) and the dashboard (×1000 multi totals, accented
+        # name) must land on one board entry with the same metrics
+        import planner, results
+        with install(ReplayAdapter(fx, latency=latency)):
+            dp.RESULT_CACHE.clear()
+            cli = results.from_pipeline("Beyonce", F.YEAR, "@beyonce", 1_000_000,
+                                        yt_year=dp.yt_annual_stats("@beyonce", F.YEAR, include_comments=True))
+            app = results.from_pipeline(F.ARTIST, F.YEAR, "@beyonce", 1_000_000,
+                                        yt_year=dp.yt_annual_stats_multi("@beyonce", F.YEAR, include_comments=True),
+                                        yt_scale=planner._MULTI_SCALE)
+        both = rankings.Leaderboard()
+        both.update(cli)
+        both.update(app)
+        out["rankings_duplicate_entries"] = both.size("tickets", F.YEAR) - 1
+        out["rankings_scale_mismatches"] = sum(fn(cli) != fn(app) for _, fn in rankings.METRICS.values())
+
+        # --- scraper parse throughput (BeautifulSoup + sentence extractor), no network
+        from bs4 import BeautifulSoup
+        html_doc, expected = F.tickets_post_html()
+        def parse():
+            return ts.extract_pairs_from_soup(BeautifulSoup(html_doc, "lxml"))
+        pairs = parse()
+        t = _median_time(parse, repeat)
+        out["ticket_parse_artists_per_s"] = len(pairs) / t
+        out["ticket_parse_kb_per_s"] = len(html_doc.encode()) / 1024 / t
+        out["_ticket_parse_yield"] = f"{len(pairs)}/{len(expected)}"
+
+        # --- the same posts through the process pool (shared-memory hand-off); scales with cores
+        import parse_pool
+        posts = [F.tickets_post_html(seed=k)[0] for k in range(12)]
+        t_inline = _median_time(lambda: ts.parse_posts(posts), 1)
+        with parse_pool.ParsePool(workers=2) as pp:
+            pooled = ts.parse_posts(posts, pool=pp)             # also starts the workers
+            t_pool = _median_time(lambda: ts.parse_posts(posts, pool=pp), 1)
+        out["_parse_pool_matches_inline"] = pooled == ts.parse_posts(posts)
+        out["_parse_pool_posts_per_s"] = {"inline": round(len(posts) / t_inline, 1),
+                                          "pool_2": round(len(posts) / t_pool, 1), "cpus": os.cpu_count()}
+
+        # --- cache refresh through WP REST, then lookup speed + cache footprint
+        with install(ReplayAdapter(fx, latency=latency)):
+            ts.refresh_cache(verbose=False)
+        # --- the same chart through the adapter's cached get(): one fetch, then served from cache
+        import sources
+        with install(ReplayAdapter(fx, latency=latency)) as ad:
+            dp.RESULT_CACHE.clear()
+            via_source = sources.get("touringdata").get(2023)
+            first = sum(ad.calls.values())
+            sources.get("touringdata").get(2023)
+            out["source_cached_http_calls"] = sum(ad.calls.values()) - first
+            out["_source_matches_scraper"] = via_source == ts.load_cached_ticket_totals()
+        dp._TD_2023 = None
+        names = list(expected)
+        queries = names + [n.lower() for n in names[:50]] + [n.split()[0] for n in names[:50]] + ["Nobody Here"] * 50
+        dp.get_2023_tickets_sold_for_artist(queries[0])
+        t = _median_time(lambda: [dp.get_2023_tickets_sold_for_artist(q) for q in queries], repeat)
+        out["ticket_lookup_per_s"] = len(queries) / t
+        out["ticket_cache_kb"] = ts.CACHE_JSON.stat().st_size / 1024
+
+        # --- SQLite store: everything above was written through; bulk snapshot writes + indexed reads
+        import store
+        db = store.default()
+        out["_store_ticket_rows"] = len(db.conn().execute("SELECT 1 FROM tickets").fetchall())
+        out["_store_video_rows"] = db.conn().execute("SELECT COUNT(*) FROM video_stats").fetchone()[0]
+        vrows = [{"id": f"v{i:06d}", "channel_id": f"UC{i % 40:04d}", "published_at": 1672531200 + i * 600,
+                  "duration_s": 200, "title_hash": i, "flags": 0, "views": i * 3, "likes": i, "comments": i // 10}
+                 for i in range(20000)]
+        stamp = iter(range(10**6))
+        t = _median_time(lambda: db.write_videos(vrows, fetched_at=next(stamp)), repeat)
+        out["store_video_rows_per_s"] = len(vrows) / t
+        def reads():
+            for i in range(40):
+                db.videos_latest([f"UC{i:04d}"], 1672531200, 1672531200 + 86400 * 30)
+                db.tickets(names[i])
+        t = _median_time(reads, repeat)
+        out["store_queries_per_s"] = 80 / t
+        out["_store_db_kb"] = round(db.path.stat().st_size / 1024, 1)
+
+        # --- change feed: a second ticket-list version + newer channel snapshots, diffed in SQL
+        import changes
+        totals = db.ticket_totals(2023)
+        now = int(time.time())
+        bumped = {a: n + (n // 10 if i % 3 == 0 else 0) for i, (a, n) in enumerate(totals.items()) if i % 25}
+        db.write_tickets({**bumped, "Newcomer Act": 123_456}, 2023, "touringdata", fetched_at=now + 60)
+        for cid, _ in F.CHANNELS.values():
+            db.write_channel(cid, {"viewCount": 10**9 + 7, "subscriberCount": 10**6, "videoCount": 999},
+                             fetched_at=now + 60)
+        d = changes.tickets_diff(2023)
+        out["_changes_tickets"] = {k: len(d[k]) for k in ("added", "removed", "changed")}
+        t = _median_time(lambda: changes.feed(now, limit=None), repeat)
+        out["changes_feed_per_s"] = 1 / t
+        out["_changes_feed_events"] = len(changes.feed(now, limit=None))
+
+        # --- multi-year backfill: posts fetched concurrently racing both mirrors (recorded latency,
+        #     whatever --latency says: the race is what is measured), one parse batch, one write
+        years = list(range(2014, 2023))
+        bfx = Fixtures()
+        want = F.backfill_fixtures(bfx, years)
+        with install(ReplayAdapter(bfx, latency="recorded")) as ad:
+            bf = ts.backfill(years, verbose=False)
+            time.sleep(0.6)                     # losing mirror requests finish in the background
+            out["ticket_backfill_http_calls"] = sum(ad.calls.values())
+        out["ticket_backfill_s"] = bf["total_s"]
+        def serial_s(year):                 # TicketChart.fetch: mirrors one after another until a post
+            spent = 0.0
+            for u in ts.sources.TOURINGDATA.urls(year):
+                e = bfx.get(canonical_key("GET", u))
+                spent += e["elapsed"]
+                if e["body"] != "[]":
+                    return spent
+            return spent
+        out["_ticket_backfill"] = {"fetch_s": bf["fetch_s"], "parse_s": bf["parse_s"], "write_s": bf["write_s"],
+                                   "serial_fetch_s": round(sum(map(serial_s, years)), 2),
+                                   "yield": f"{bf['artists']}/{sum(len(v) for v in want.values())}",
+                                   "stored_years": len({x["year"] for x in db.ticket_snapshots() if x["year"] in want})}
+    return out
+
+# expected parse per locale ("en" keeps the scalar parser's reading: "," groups, "." is decimal)
+ABBREV_LOCALE_CASES = {
+    "en":   {"1.2 Mio.": 1_200_000, "1,2 Mio.": 12_000_000, "12.345": 12, "1.3M views": 1_300_000,
+             "1.5B": 1_500_000_000, "2,345 likes": 2_345},
+    "eu":   {"1.2 Mio.": 1_200_000, "1,2 Mio.": 1_200_000, "12.345": 12_345, "1.3M views": 1_300_000,
+             "1.5B": 1_500_000_000, "1.234.567": 1_234_567, "3,4 Mio.": 3_400_000, "1.234 Mio.": 1_234_000},
+    "auto": {"1.2 Mio.": 1_200_000, "1,2 Mio.": 1_200_000, "12.345": 12_345, "1.3M views": 1_300_000,
+             "1.5B": 1_500_000_000, "2,345 likes": 2_345, "1.234.567": 1_234_567},
+}
+
+# timings this close to the baseline are scheduler noise, whatever the ratio (µs-level warm paths)
+ABS_SLACK_S = 0.005
+
+def compare(cur: dict, base: dict) -> list[str]:
+    bad = []
+    for name, (direction, tol) in METRICS.items():
+        if name not in cur or name not in base or not base[name]:
+            continue
+        c, b = cur[name], base[name]
+        if name.endswith("_s") and abs(c - b) < ABS_SLACK_S:
+            continue
+        ratio = c / b
+        if direction == "lower" and ratio > 1 + tol:
+            bad.append(f"{name}: {c:.4g} vs baseline {b:.4g} (+{(ratio - 1) * 100:.0f}%)")
+        elif direction == "higher" and ratio < 1 - tol:
+            bad.append(f"{name}: {c:.4g} vs baseline {b:.4g} ({(ratio - 1) * 100:.0f}%)")
+        elif direction == "exact" and c > b:
+            bad.append(f"{name}: {c} vs baseline {b}")
+    return bad
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", help="gzip JSON archive (default: synthetic fixtures)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--latency", default=None, help='"recorded" or seconds per call (default: none)')
+    ap.add_argument("--save", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--record", metavar="OUT", help="run the scenario live and save responses to OUT")
+    args = ap.parse_args(argv)
+
+    if args.record:
+        import data_pipeline as dp
+        with install(RecordingAdapter()) as rec:
+            dp.yt_annual_stats_multi(", ".join(F.CHANNELS), F.YEAR, verify_with_html=True)
+            dp.get_youtube_channel_stats("@beyonce")
+            dp.spotify_artist_followers(F.ARTIST)
+            dp.spotify_monthly_listeners_scrape(F.ARTIST)
+            import ticket_scraper as ts
+            ts.fetch_post_html()
+        rec.fixtures.save(args.record)
+        print(f"recorded {len(rec.fixtures.entries)} responses → {args.record}")
+        return 0
+
+    fx = Fixtures.load(args.fixtures) if args.fixtures else F.build()
+    latency = args.latency
+    if latency not in (None, "recorded"):
+        latency = float(latency)
+
+    cur = run(fx, repeat=args.repeat, latency=latency)
+    print(json.dumps(cur, indent=2, default=str))
+
+    if args.save:
+        BASELINE.write_text(json.dumps({k: v for k, v in cur.items() if k in METRICS}, indent=2) + "\n")
+        print(f"baseline saved → {BASELINE}")
+        return 0
+    if BASELINE.exists():
+        bad = compare(cur, json.loads(BASELINE.read_text()))
+        if bad:
+            print("REGRESSIONS:\n  " + "\n  ".join(bad))
+            return 1
+        print("OK: no regressions vs baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# benchmarks/bench_startup.py — cold-import and first-render latency
+#
+#   python -m benchmarks.bench_startup [--repeat 5]
+#
+# Every measurement runs in a fresh interpreter (cold sys.modules) from a scratch
+# working directory, so it also catches import-time side effects such as creating data/.
+import argparse, json, pathlib, statistics, subprocess, sys, tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+HEAVY = ("requests", "bs4", "lxml", "pandas", "dotenv", "streamlit")
+
+_IMPORT_SNIPPET = """
+import sys, time, json, os
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"s": dt, "heavy": [m for m in {heavy!r} if m in sys.modules],
+                  "side_effects": sorted(os.listdir("."))}}))
+"""
+
+_RENDER_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=60).run()
+t2 = time.perf_counter()
+print(json.dumps({{"streamlit_import_s": t1 - t0, "first_render_s": t2 - t1,
+                  "errors": [str(e.value) for e in at.exception]}}))
+"""
+
+def _run(snippet: str) -> dict | None:
+    with tempfile.TemporaryDirectory() as cwd:
+        p = subprocess.run([sys.executable, "-c", snippet], cwd=cwd, capture_output=True, text=True)
+    if p.returncode != 0:
+        return {"error": (p.stderr.strip().splitlines() or ["?"])[-1]}
+    return json.loads(p.stdout.strip().splitlines()[-1])
+
+def cold_import(module: str, repeat: int) -> dict:
+    runs = [_run(_IMPORT_SNIPPET.format(root=str(ROOT), module=module, heavy=HEAVY)) for _ in range(repeat)]
+    if "error" in runs[0]:
+        return runs[0]
+    return {
+        "median_ms": round(statistics.median(r["s"] for r in runs) * 1000, 1),
+        "heavy_modules_loaded": runs[0]["heavy"],
+        "files_created_in_cwd": runs[0]["side_effects"],
+    }
+
+def first_render(repeat: int) -> dict:
+    try:
+        import streamlit  # noqa: F401  (only checks availability; timing happens in a subprocess)
+    except ImportError:
+        return {"skipped": "streamlit not installed"}
+    runs = [_run(_RENDER_SNIPPET.format(root=str(ROOT), app=str(ROOT / "app.py"))) for _ in range(repeat)]
+    if "error" in runs[0]:
+        return runs[0]
+    return {
+        "streamlit_import_ms": round(statistics.median(r["streamlit_import_s"] for r in runs) * 1000, 1),
+        "first_render_ms": round(statistics.median(r["first_render_s"] for r in runs) * 1000, 1),
+        "errors": runs[0]["errors"],
+    }
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+    out = {m: cold_import(m, args.repeat) for m in ("perf", "http_client", "ticket_scraper", "data_pipeline")}
+    out["app_first_render"] = first_render(max(1, args.repeat // 2))
+    print(json.dumps(out, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
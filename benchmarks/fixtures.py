@@ -0,0 +1,446 @@
+# benchmarks/fixtures.py — deterministic stand-in responses for every upstream the pipeline uses
+#
+# Shapes mirror real YouTube Data API v3 / Spotify Web API / WP REST payloads
+# (only the fields the pipeline reads, plus realistic page padding). Re-record
+# against the live services with `python -m benchmarks.bench_pipeline --record`.
+import hashlib, json, random
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode, urlsplit, parse_qs
+
+from replay import Fixtures
+
+YT = "https://www.googleapis.com/youtube/v3"
+SP_API = "https://api.spotify.com/v1"
+WP_URLS = [
+    "https://touringdata.org/wp-json/wp/v2/posts?slug=2023-top-touring-artists&per_page=1",
+    "https://touringdata.wordpress.com/wp-json/wp/v2/posts?slug=2023-top-touring-artists&per_page=1",
+]
+
+# scenario used by the benchmarks
+# handle → (channel ID, videos published in YEAR)
+CHANNELS = {"@beyonce": ("UCbeyonce000000000000001", 140), "@BeyonceVEVO": ("UCbeyoncevevo00000000002", 90)}
+ARTIST = "Beyoncé"
+SPOTIFY_ID = "6vWDO969PvNqNYHIOW5v0m"
+YEAR = 2023
+
+_SYL = ["ka", "ri", "mo", "lan", "the", "zo", "vel", "ar", "den", "sa", "quin", "to", "ber", "lux", "nia"]
+
+def _url(base: str, **params) -> str:
+    return f"{base}?{urlencode(params)}"
+
+def _pad(n_bytes: int) -> str:
+    """Script-ish filler so regex scans cost roughly what they do on real pages."""
+    chunk = '{"trackingParams":"%s","clickTrackingParams":"%s"},' % ("x" * 40, "y" * 40)
+    return chunk * max(1, n_bytes // len(chunk))
+
+def artist_names(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    names, seen = [], set()
+    while len(names) < n:
+        w = [("".join(rng.choice(_SYL) for _ in range(rng.randint(2, 3)))).title()
+             for _ in range(rng.randint(1, 3))]
+        name = " ".join(w)
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+def tickets_post_html(n_artists: int = 150, seed: int = 7) -> tuple[str, dict]:
+    """WP 'rendered' content in TouringData's prose style + the expected {name: tickets}."""
+    rng = random.Random(seed)
+    names = ["Taylor Swift", "Beyonce", "Coldplay", "Ed Sheeran"] + artist_names(n_artists - 4, seed)
+    verbs = ["grossed", "earned", "sold", "generated"]
+    paras, expected = [], {}
+    for rank, name in enumerate(names, 1):
+        tix = rng.randint(20_000, 4_500_000)
+        gross = tix * rng.randint(60, 180)
+        expected[name.title()] = tix
+        paras.append(
+            f"<p>{name} (No. {rank}) {rng.choice(verbs)} ${gross:,} from {tix:,} tickets "
+            f"across {rng.randint(5, 120)} shows. The average ticket price was ${rng.randint(40, 250)}.</p>"
+        )
+    return "\n".join(paras), expected
+
+def _iso(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def channel_videos(cid: str, n: int, year: int = YEAR, seed: int = 11) -> list[dict]:
+    rng = random.Random(f"{seed}-{cid}")
+    tag = cid[-3:]
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+    vids = []
+    for i in range(n):
+        views = int(rng.lognormvariate(12, 2))
+        likes = int(views * rng.uniform(0.005, 0.05))
+        kind = rng.random()
+        if kind < 0.25:
+            title, dur = f"Clip {i} #shorts", f"PT{rng.randint(10, 59)}S"
+        elif kind < 0.45:
+            title, dur = f"Song {i} (Live at Wembley)", f"PT{rng.randint(3, 9)}M{rng.randint(0, 59)}S"
+        elif kind < 0.75:
+            title, dur = f"Song {i} (Official Music Video)", f"PT{rng.randint(3, 5)}M{rng.randint(0, 59)}S"
+        else:
+            title, dur = f"Behind the scenes {i}", f"PT{rng.randint(1, 40)}M{rng.randint(0, 59)}S"
+        vids.append({
+            "id": f"v{tag}{i:07d}",
+            "title": title,
+            "duration": dur,
+            "publishedAt": _iso(start + timedelta(seconds=rng.randint(0, 364 * 86400))),
+            "viewCount": views,
+            "likeCount": likes if rng.random() > 0.1 else None,   # ~10% hidden likes
+            "commentCount": int(likes * rng.uniform(0.02, 0.2)),
+        })
+    vids.sort(key=lambda v: v["publishedAt"], reverse=True)          # order=date
+    return vids
+
+def _with_reuploads(vids: list[dict], other: list[dict], n: int = 12) -> list[dict]:
+    """Replace n videos with re-uploads of `other`'s music videos (same title, duration ±1 s)."""
+    mvs = [v for v in other if "Music Video" in v["title"]][:n]
+    out = list(vids)
+    for k, src in enumerate(mvs):
+        m, s_ = (int(x) for x in src["duration"][2:-1].split("M"))
+        s_ = min(59, s_ + (k % 2))
+        out[k * 3] = {**out[k * 3], "title": src["title"], "duration": f"PT{m}M{s_}S"}
+    return out
+
+def _watch_html(v: dict, pad_bytes: int) -> str:
+    likes = v["likeCount"] or int(v["viewCount"] * 0.02)
+    return (
+        "<html><head><title>watch</title></head><body><script>var ytInitialData = {"
+        + _pad(pad_bytes // 2)
+        + f'"viewCountText":{{"simpleText":"{v["viewCount"]:,} views"}},'
+        + f'"accessibilityData":{{"label":"{likes:,} likes"}},'
+        + f'"commentCount":{{"simpleText":"{v["commentCount"]:,} comments"}},'
+        + _pad(pad_bytes // 2)
+        + "};</script>"
+        + f'<button aria-label="like this video along with {likes:,} other people"></button>'
+        + "</body></html>"
+    )
+
+def _spotify_page(monthly: int, pad_bytes: int) -> str:
+    return (
+        "<html><head><title>Spotify</title></head><body>"
+        + "<script>" + _pad(pad_bytes // 2) + "</script>"
+        + f'<script id="initial-state">{{"artist":{{"stats":{{"monthlyListeners":{monthly}}}}}}}</script>'
+        + f"<div><span>{monthly:,} monthly listeners</span></div>"
+        + "<script>" + _pad(pad_bytes // 2) + "</script></body></html>"
+    )
+
+def build(watch_pad: int = 120_000, spotify_pad: int = 400_000) -> Fixtures:
+    """All responses for the benchmark scenario (two channels, one artist, ticket post)."""
+    rng = random.Random(3)
+    fx = Fixtures()
+    after, before = f"{YEAR}-01-01T00:00:00Z", f"{YEAR}-12-31T23:59:59Z"
+
+    for handle, (cid, n) in CHANNELS.items():
+        # resolve_channel_id → search.list type=channel
+        fx.add("GET", _url(f"{YT}/search", part="snippet", q=handle, type="channel", maxResults=1),
+               {"items": [{"id": {"kind": "youtube#channel", "channelId": cid}}]}, elapsed=0.12)
+        # get_youtube_channel_stats → channels.list
+        fx.add("GET", _url(f"{YT}/channels", part="statistics", id=cid),
+               {"items": [{"id": cid, "statistics": {
+                   "viewCount": str(rng.randint(10**9, 10**10)),
+                   "subscriberCount": str(rng.randint(10**6, 5 * 10**7)),
+                   "videoCount": str(rng.randint(200, 2000))}}]}, elapsed=0.08)
+
+        vids = channel_videos(cid, n)
+        if handle == "@BeyonceVEVO":
+            vids = _with_reuploads(vids, channel_videos(CHANNELS["@beyonce"][0], CHANNELS["@beyonce"][1]))
+        pages = [vids[i:i + 50] for i in range(0, len(vids), 50)] or [[]]
+        for p, page in enumerate(pages):
+            params = dict(part="id", channelId=cid, type="video", order="date", maxResults=50,
+                          publishedAfter=after, publishedBefore=before)
+            if p:
+                params["pageToken"] = f"PAGE{p}"
+            body = {"items": [{"id": {"kind": "youtube#video", "videoId": v["id"]}} for v in page]}
+            if p + 1 < len(pages):
+                body["nextPageToken"] = f"PAGE{p + 1}"
+            fx.add("GET", _url(f"{YT}/search", **params), body, elapsed=0.25)
+
+            stats = []
+            for v in page:
+                st = {"viewCount": str(v["viewCount"]), "commentCount": str(v["commentCount"])}
+                if v["likeCount"] is not None:
+                    st["likeCount"] = str(v["likeCount"])
+                stats.append({"id": v["id"], "statistics": st})
+            items = [{**it, "snippet": {"channelId": cid, "publishedAt": v["publishedAt"], "title": v["title"],
+                                        "liveBroadcastContent": "none"},
+                      "contentDetails": {"duration": v["duration"]}} for it, v in zip(stats, page)]
+            fx.add("GET", _url(f"{YT}/videos", part="snippet,contentDetails,statistics",
+                               id=",".join(v["id"] for v in page)), {"items": items}, elapsed=0.17)
+
+        for v in vids:
+            fx.add("GET", f"https://www.youtube.com/watch?v={v['id']}",
+                   _watch_html(v, watch_pad), headers={"Content-Type": "text/html"}, elapsed=0.35)
+
+    # Spotify
+    fx.add("POST", "https://accounts.spotify.com/api/token",
+           {"access_token": "bench-token", "token_type": "Bearer", "expires_in": 3600}, elapsed=0.1)
+    fx.add("GET", _url(f"{SP_API}/search", q=ARTIST, type="artist", limit=1),
+           {"artists": {"items": [{"id": SPOTIFY_ID, "name": ARTIST}]}}, elapsed=0.12)
+    fx.add("GET", f"{SP_API}/artists/{SPOTIFY_ID}",
+           {"id": SPOTIFY_ID, "name": ARTIST, "followers": {"total": 37_123_456},
+            "popularity": 86, "genres": ["pop", "r&b"]}, elapsed=0.1)
+    fx.add("GET", f"https://open.spotify.com/artist/{SPOTIFY_ID}",
+           _spotify_page(55_432_100, spotify_pad), headers={"Content-Type": "text/html"}, elapsed=0.6)
+
+    # TouringData WP REST (first mirror answers)
+    html_doc, _ = tickets_post_html()
+    fx.add("GET", WP_URLS[0], [{"slug": "2023-top-touring-artists", "content": {"rendered": html_doc}}],
+           elapsed=0.4)
+    return fx
+
+def backfill_fixtures(fx: Fixtures, years, n_artists: int = 150) -> dict:
+    """
+    Year-end posts for `years` on both WP mirrors: the faster mirror alternates by year and
+    every fourth year the self-hosted one has no post (empty list). Returns {year: expected}.
+    """
+    expected = {}
+    for k, year in enumerate(years):
+        html_doc, expected[year] = tickets_post_html(n_artists, seed=year)
+        body = [{"slug": f"{year}-top-touring-artists", "content": {"rendered": html_doc}}]
+        own, wpcom = (u.replace("2023", str(year)) for u in WP_URLS)
+        fx.add("GET", own, [] if k % 4 == 3 else body, elapsed=0.15 if k % 2 else 0.6)
+        fx.add("GET", wpcom, body, elapsed=0.6 if k % 2 else 0.25)
+    return expected
+
+def count_labels(n: int, seed: int = 13) -> list[str]:
+    """Like/view/listener labels in the shapes the scrapers see ("1.3M views", "862K", "2,345 likes")."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        v = rng.choice([rng.randint(0, 999), rng.randint(1_000, 999_999), rng.randint(10**6, 10**10)])
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(f"{v:,} likes")
+        elif v >= 10**9:
+            out.append(f"{v / 10**9:.1f}B views")
+        elif v >= 10**6:
+            out.append(f"{v / 10**6:.1f}M views")
+        elif v >= 10**3:
+            out.append(f"{v / 10**3:.0f}K")
+        else:
+            out.append(str(v) if kind < 0.95 else "")
+    return out
+
+def spotify_id_for(name: str) -> str:
+    return (hashlib.sha1(name.encode()).hexdigest() * 2)[:22]
+
+def add_spotify_roster(fx: Fixtures, names: list[str], seed: int = 5, page_pad: int = 200_000):
+    """Search + artist-profile + artist-page responses for a roster (bulk Spotify benchmarks)."""
+    rng = random.Random(seed)
+    for name in names:
+        aid = spotify_id_for(name)
+        fx.add("GET", _url(f"{SP_API}/search", q=name, type="artist", limit=1),
+               {"artists": {"items": [{"id": aid, "name": name}]}}, elapsed=0.12)
+        fx.add("GET", f"{SP_API}/artists/{aid}",
+               {"id": aid, "name": name, "followers": {"total": rng.randint(10**4, 10**8)},
+                "popularity": rng.randint(20, 100), "genres": rng.sample(["pop", "rock", "latin", "k-pop", "country"], 2)},
+               elapsed=0.1)
+        fx.add("GET", f"https://open.spotify.com/artist/{aid}",
+               _spotify_page(rng.randint(10**5, 9 * 10**7), page_pad), headers={"Content-Type": "text/html"},
+               elapsed=0.5)
+
+def _several_artists(request, fx: Fixtures):
+    """/v1/artists?ids=a,b,c — composed from the per-artist entries, like the real endpoint."""
+    ids = parse_qs(urlsplit(request.url).query).get("ids", [""])[0].split(",")
+    artists = []
+    for aid in ids:
+        hit = fx.get(f"GET api.spotify.com/v1/artists/{aid}")
+        artists.append(json.loads(hit["body"]) if hit else None)
+    return {"status": 200, "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"artists": artists}), "elapsed": 0.15}
+
+def _video_items(fx: Fixtures, part: str) -> dict:
+    """{video ID: item} over every recorded videos.list batch with this `part`."""
+    index = fx.__dict__.setdefault("_videos_index", {})
+    if part not in index:
+        prefix = "GET www.googleapis.com/youtube/v3/videos?"
+        items = {}
+        for k, e in fx.entries.items():
+            if k.startswith(prefix) and parse_qs(k[len(prefix):]).get("part", [""])[0] == part:
+                for it in json.loads(e["body"]).get("items", []):
+                    items[it["id"]] = it
+        index[part] = items
+    return index[part]
+
+def _videos_list(request, fx: Fixtures):
+    """videos.list for any ID batch — items picked from the recorded page-sized batches."""
+    q = parse_qs(urlsplit(request.url).query)
+    items = _video_items(fx, q.get("part", [""])[0])
+    ids = q.get("id", [""])[0].split(",")
+    return {"status": 200, "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"items": [items[i] for i in ids if i in items]}), "elapsed": 0.15}
+
+def _search_window(request, fx: Fixtures):
+    """search.list for a channel over any publish window (planner week samples) — from the videos index."""
+    q = parse_qs(urlsplit(request.url).query)
+    if q.get("type", [""])[0] != "video" or "channelId" not in q:
+        return None
+    lo, hi = (datetime.fromisoformat(q[k][0].replace("Z", "+00:00")) for k in ("publishedAfter", "publishedBefore"))
+    cid = q["channelId"][0]
+    items = [{"id": {"kind": "youtube#video", "videoId": vid}}
+             for vid, it in _video_items(fx, "snippet,contentDetails,statistics").items()
+             if it["snippet"]["channelId"] == cid
+             and lo <= datetime.fromisoformat(it["snippet"]["publishedAt"].replace("Z", "+00:00")) <= hi]
+    return {"status": 200, "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"items": items[:50]}), "elapsed": 0.25}
+
+def _label_video(cid: str, i: int, year: int) -> dict:
+    rng = random.Random(f"{cid}-{i}")
+    views = int(rng.lognormvariate(10, 2))
+    likes = int(views * rng.uniform(0.005, 0.05))
+    st = {"viewCount": str(views), "commentCount": str(int(likes * rng.uniform(0.02, 0.2)))}
+    if rng.random() > 0.1:
+        st["likeCount"] = str(likes)
+    published = datetime(year, 12, 31, 12, tzinfo=timezone.utc) - timedelta(minutes=i * 5)
+    return {"id": f"L{cid[-4:]}{i:07d}", "statistics": st,
+            "snippet": {"channelId": cid, "publishedAt": _iso(published), "title": f"Track {i} (Official Audio)",
+                        "liveBroadcastContent": "none"},
+            "contentDetails": {"duration": f"PT{rng.randint(2, 5)}M{rng.randint(0, 59)}S"}}
+
+def label_channel_routes(cid: str, n: int, year: int = YEAR) -> dict:
+    """
+    search.list / videos.list for a synthetic label channel with `n` uploads in `year` (streaming
+    benchmarks). Responses are generated per request, so the archive stays small whatever `n` is.
+    """
+    def search(request, fx):
+        q = parse_qs(urlsplit(request.url).query)
+        if q.get("channelId", [""])[0] != cid:
+            return None
+        off = int(q.get("pageToken", ["L0"])[0][1:])
+        body = {"items": [{"id": {"kind": "youtube#video", "videoId": f"L{cid[-4:]}{i:07d}"}}
+                          for i in range(off, min(n, off + 50))]}
+        if off + 50 < n:
+            body["nextPageToken"] = f"L{off + 50}"
+        return {"status": 200, "headers": {"Content-Type": "application/json"}, "body": json.dumps(body),
+                "elapsed": 0.25}
+
+    def videos(request, fx):
+        ids = parse_qs(urlsplit(request.url).query).get("id", [""])[0].split(",")
+        items = [_label_video(cid, int(v[-7:]), year) for v in ids if v.startswith(f"L{cid[-4:]}")]
+        return {"status": 200, "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"items": items}), "elapsed": 0.15}
+
+    return {"www.googleapis.com/youtube/v3/search": search, "www.googleapis.com/youtube/v3/videos": videos}
+
+ROUTES = {"api.spotify.com/v1/artists": _several_artists,
+          "www.googleapis.com/youtube/v3/videos": _videos_list,
+          "www.googleapis.com/youtube/v3/search": _search_window}
+
+# ---------- Roster of synthetic artists (load tests) ----------
+# Every channel / artist is derived from a hash of the query, so any roster name (or "@handle") gets a
+# consistent channel with 30–330 videos in YEAR, watch pages, a Spotify profile and an artist page.
+def roster_channel_id(query: str) -> str:
+    return "UC" + "0" * 14 + hashlib.sha1(query.strip().encode()).hexdigest()[:8]
+
+_ROSTER_VIDEOS = {}
+
+def _roster_videos(cid: str, year: int = YEAR) -> list[dict]:
+    index = _ROSTER_VIDEOS.get((cid, year))
+    if index is None:
+        n = 30 + int(cid[-8:], 16) % 300
+        index = _ROSTER_VIDEOS[(cid, year)] = [{**v, "id": f"v{cid[-8:]}{i:04d}"}
+                                               for i, v in enumerate(channel_videos(cid, n, year))]
+    return index
+
+def _roster_video(vid: str, year: int = YEAR) -> dict | None:
+    cid = "UC" + "0" * 14 + vid[1:9]
+    vids = _roster_videos(cid, year)
+    i = int(vid[9:]) if vid[9:].isdigit() else -1
+    return vids[i] if 0 <= i < len(vids) else None
+
+def _ok(body, elapsed: float, ctype: str = "application/json") -> dict:
+    return {"status": 200, "headers": {"Content-Type": ctype},
+            "body": body if isinstance(body, str) else json.dumps(body), "elapsed": elapsed}
+
+def roster_fixtures(n_artists: int = 60, year: int = YEAR, watch_pad: int = 60_000,
+                    spotify_pad: int = 200_000) -> tuple[Fixtures, dict, list[str]]:
+    """(fixtures, routes, artist names) answering every upstream call for any roster query."""
+    fx = Fixtures()
+    fx.add("POST", "https://accounts.spotify.com/api/token",
+           {"access_token": "bench-token", "token_type": "Bearer", "expires_in": 3600}, elapsed=0.1)
+    html_doc, expected = tickets_post_html(n_artists)
+    fx.add("GET", WP_URLS[0], [{"slug": f"{year}-top-touring-artists", "content": {"rendered": html_doc}}],
+           elapsed=0.4)
+
+    def q(request):
+        return {k: v[0] for k, v in parse_qs(urlsplit(request.url).query).items()}
+
+    def search(request, fx):
+        p = q(request)
+        if p.get("type") == "channel":
+            cid = roster_channel_id(p.get("q", ""))
+            return _ok({"items": [{"id": {"kind": "youtube#channel", "channelId": cid}}]}, 0.12)
+        cid = p.get("channelId", "")
+        lo, hi = (datetime.fromisoformat(p[k].replace("Z", "+00:00")) for k in ("publishedAfter", "publishedBefore"))
+        ids = [v["id"] for v in _roster_videos(cid, year)
+               if lo <= datetime.fromisoformat(v["publishedAt"].replace("Z", "+00:00")) <= hi]
+        off = int(p.get("pageToken", "P0")[1:])
+        body = {"items": [{"id": {"kind": "youtube#video", "videoId": v}} for v in ids[off:off + 50]]}
+        if off + 50 < len(ids):
+            body["nextPageToken"] = f"P{off + 50}"
+        return _ok(body, 0.25)
+
+    def channels(request, fx):
+        cid = q(request).get("id", "")
+        rng = random.Random(cid)
+        return _ok({"items": [{"id": cid, "statistics": {
+            "viewCount": str(rng.randint(10**8, 10**10)), "subscriberCount": str(rng.randint(10**5, 5 * 10**7)),
+            "videoCount": str(rng.randint(200, 2000))}}]}, 0.08)
+
+    def videos_list(request, fx):
+        items = []
+        for vid in q(request).get("id", "").split(","):
+            v = _roster_video(vid, year)
+            if v is None:
+                continue
+            st = {"viewCount": str(v["viewCount"]), "commentCount": str(v["commentCount"])}
+            if v["likeCount"] is not None:
+                st["likeCount"] = str(v["likeCount"])
+            items.append({"id": vid, "statistics": st,
+                          "snippet": {"channelId": "UC" + "0" * 14 + vid[1:9], "publishedAt": v["publishedAt"],
+                                      "title": v["title"], "liveBroadcastContent": "none"},
+                          "contentDetails": {"duration": v["duration"]}})
+        return _ok({"items": items}, 0.17)
+
+    def watch(request, fx):
+        v = _roster_video(q(request).get("v", ""), year)
+        return _ok(_watch_html(v, watch_pad), 0.35, "text/html") if v else None
+
+    def sp_search(request, fx):
+        name = q(request).get("q", "")
+        return _ok({"artists": {"items": [{"id": spotify_id_for(name), "name": name}]}}, 0.12)
+
+    def sp_artist(request, fx, aid=None):
+        aid = aid or urlsplit(request.url).path.rsplit("/", 1)[-1]
+        rng = random.Random(aid)
+        return _ok({"id": aid, "name": aid, "followers": {"total": rng.randint(10**4, 10**8)},
+                    "popularity": rng.randint(20, 100), "genres": ["pop"]}, 0.1)
+
+    def sp_several(request, fx):
+        ids = q(request).get("ids", "").split(",")
+        return _ok({"artists": [json.loads(sp_artist(request, fx, a)["body"]) for a in ids]}, 0.15)
+
+    def sp_page(request, fx):
+        aid = urlsplit(request.url).path.rsplit("/", 1)[-1]
+        return _ok(_spotify_page(random.Random(aid).randint(10**5, 9 * 10**7), spotify_pad), 0.5, "text/html")
+
+    routes = {"www.googleapis.com/youtube/v3/search": search,
+              "www.googleapis.com/youtube/v3/channels": channels,
+              "www.googleapis.com/youtube/v3/videos": videos_list,
+              "www.youtube.com/watch": watch,
+              "api.spotify.com/v1/search": sp_search,
+              "api.spotify.com/v1/artists/{id}": sp_artist,
+              "api.spotify.com/v1/artists": sp_several,
+              "open.spotify.com/artist/{id}": sp_page}
+    return fx, routes, list(expected)
+
+def save(path, **kw):
+    build(**kw).save(path)
+
+if __name__ == "__main__":
+    import sys
+    out = sys.argv[1] if len(sys.argv) > 1 else "benchmarks/fixtures.json.gz"
+    save(out)
+    print("wrote", out)
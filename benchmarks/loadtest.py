@@ -0,0 +1,315 @@
+# benchmarks/loadtest.py — concurrent dashboard sessions against local stand-in upstream servers
+#
+#   python -m benchmarks.loadtest                          # sweep 1, 4, 16 sessions; compare to baseline
+#   python -m benchmarks.loadtest --sessions 1,8,32,64 --queries 4 --speed 2
+#   python -m benchmarks.loadtest --save                   # re-baseline (benchmarks/loadtest_baseline.json)
+#   python -m benchmarks.loadtest --json out.json          # full report
+#
+# Each upstream host (googleapis, youtube.com, Spotify API / accounts / artist pages, TouringData)
+# gets its own HTTP server on 127.0.0.1, answering from synthetic roster fixtures with the
+# recorded per-call latency (÷ --speed); the pipeline reaches them over real sockets through a
+# transport adapter that only rewrites the destination. A session is one Streamlit user: a thread
+# running the dashboard's "Show Data" path for Zipf-popular artists, with think time in between.
+# Per level: p50/p95/p99 query latency, throughput, upstream calls, amplification (upstream calls
+# vs. the same distinct queries run once, cold, one after another), peak RSS growth per session.
+import argparse, json, os, pathlib, random, statistics, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+os.environ["PIPELINE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "pipeline_cache.pkl")
+os.environ["PIPELINE_DB"] = os.path.join(tempfile.mkdtemp(), "pipeline.db")
+os.environ.setdefault("YOUTUBE_API_KEY", "bench-key")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "bench-id")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "bench-secret")
+
+from requests.adapters import HTTPAdapter
+
+from benchmarks import fixtures as F
+from replay import ReplayAdapter, install
+
+HERE = pathlib.Path(__file__).resolve().parent
+BASELINE = HERE / "loadtest_baseline.json"
+HOSTS = ("www.googleapis.com", "www.youtube.com", "api.spotify.com", "accounts.spotify.com",
+         "open.spotify.com", "touringdata.org", "touringdata.wordpress.com")
+
+# per level: metric → (direction, relative tolerance); "lower" is better
+METRICS = {"p95_ms": ("lower", 0.50), "amplification": ("lower", 0.25), "errors": ("exact", 0.0)}
+ABS_SLACK_MS = 50
+
+# ---------- Stand-in upstreams ----------
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)     # clients dropping idle keep-alives is normal
+
+class StandIn:
+    """One local HTTP/1.1 server per upstream host, all answering from the same fixtures + routes."""
+
+    def __init__(self, fx, routes, speed: float = 1.0):
+        self.replay = ReplayAdapter(fx, routes=routes)
+        self.speed = speed
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.servers = {h: self._serve(h) for h in HOSTS}
+        self.ports = {h: s.server_address[1] for h, s in self.servers.items()}
+
+    def _serve(self, host: str) -> ThreadingHTTPServer:
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _answer(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                if n:
+                    self.rfile.read(n)
+                hit = standin.replay.lookup(SimpleNamespace(method=self.command, url=f"https://{host}{self.path}"))
+                with standin._lock:
+                    standin.calls += 1
+                if hit and hit.get("elapsed") and standin.speed:
+                    time.sleep(hit["elapsed"] / standin.speed)
+                body = (hit or {}).get("body", "{}")
+                body = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(hit["status"] if hit else 404)
+                self.send_header("Content-Type", (hit or {}).get("headers", {}).get("Content-Type", "application/json"))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _answer
+
+            def log_message(self, *a):
+                pass
+
+        srv = _Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=srv.serve_forever, daemon=True, name=f"standin-{host}").start()
+        return srv
+
+    def adapter(self, pool: int) -> HTTPAdapter:
+        ports = self.ports
+
+        class Redirect(HTTPAdapter):
+            """Sends https://<upstream host>/… to that host's stand-in server; nothing else changes."""
+
+            def send(self, request, **kw):
+                from urllib.parse import urlsplit
+                parts = urlsplit(request.url)
+                request = request.copy()
+                request.url = f"http://127.0.0.1:{ports[parts.netloc]}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+                return super().send(request, **kw)
+
+        return Redirect(pool_connections=len(ports), pool_maxsize=pool)
+
+    def close(self):
+        for s in self.servers.values():
+            s.shutdown()
+            s.server_close()
+
+# ---------- Sessions ----------
+def dashboard_query(artist: str, channels: str, full: bool, year: int = F.YEAR, budget_s: float = 5.0,
+                    max_videos: int = 400):
+    """What app.py runs on "Show Data" (minus rendering, leaderboard and conversions bookkeeping)."""
+    import data_pipeline as dp
+    tickets = dp.get_2023_tickets_sold_for_artist(artist)
+    if full:
+        import catalog, planner, videos
+        plan = planner.annual_totals(channels, year, budget_s=budget_s, max_videos=max_videos)
+        dp.get_youtube_channel_stats(channels)
+        dp.compute_full_conversions_percent(plan["totals"], tickets)
+        if plan["strategy"] != "sampled":
+            if len(dp._split_channels(channels)) > 1:
+                catalog.build(channels, year, max_videos=max_videos)
+            videos.table(channels, year, max_videos=max_videos).by_type()
+    else:
+        dp.compute_conversions_percent(dp.get_youtube_channel_stats(channels), tickets)
+    dp.spotify_artist_followers(artist)
+    dp.spotify_monthly_listeners_scrape(artist, return_raw=True)
+
+def plans(names: list[str], sessions: int, queries: int, seed: int = 1) -> list[list[tuple]]:
+    """Per session: (artist, channels, full) queries; artists drawn Zipf-like (a few are popular)."""
+    weights = [1 / (k + 1) ** 1.1 for k in range(len(names))]
+    out = []
+    for s in range(sessions):
+        rng = random.Random(f"{seed}-{s}")
+        qs = []
+        for a in rng.choices(names, weights, k=queries):
+            handle = "@" + a.replace(" ", "")
+            chans = f"{handle}, {handle}VEVO" if rng.random() < 0.3 else handle
+            qs.append((a, chans, rng.random() < 0.8))
+        out.append(qs)
+    return out
+
+def _reset():
+    import data_pipeline as dp, planner
+    for f in list(planner._PENDING.values()):
+        f.result()
+    planner._PENDING.clear()
+    planner.LATENCY_S.update(search=0.35, videos=0.25)
+    dp.RESULT_CACHE.clear()
+    dp._TD_2023 = None
+    dp._SP_TOKEN.update(value=None, expires=0.0)
+
+class RSS:
+    """Peak resident set size (bytes) sampled every `every` s (Linux /proc; ru_maxrss elsewhere)."""
+
+    def __init__(self, every: float = 0.02):
+        self.every, self.peak, self._stop = every, 0, threading.Event()
+        self.base = self.now()
+
+    @staticmethod
+    def now() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except Exception:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def __enter__(self):
+        def loop():
+            while not self._stop.wait(self.every):
+                self.peak = max(self.peak, self.now())
+        self._t = threading.Thread(target=loop, daemon=True)
+        self._t.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._t.join()
+        self.peak = max(self.peak, self.now())
+
+def _pct(xs: list[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    k = (len(xs) - 1) * p
+    lo = int(k)
+    return xs[lo] + (xs[min(lo + 1, len(xs) - 1)] - xs[lo]) * (k - lo)
+
+def run_level(standin: StandIn, names: list[str], sessions: int, queries: int, think_s: float,
+              seed: int = 1) -> dict:
+    """One load level: `sessions` concurrent users, each issuing `queries` dashboard queries."""
+    work = plans(names, sessions, queries, seed)
+
+    # ideal: every distinct query once, cold, sequentially (perfect sharing between sessions)
+    _reset()
+    c0 = standin.calls
+    for q in dict.fromkeys(q for qs in work for q in qs):
+        dashboard_query(*q)
+    _reset()
+    ideal = standin.calls - c0
+
+    lat, errors = [], []
+    lock = threading.Lock()
+
+    def session(k: int, qs: list[tuple]):
+        rng = random.Random(f"think-{seed}-{k}")
+        for q in qs:
+            t0 = time.perf_counter()
+            try:
+                dashboard_query(*q)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+            with lock:
+                lat.append(time.perf_counter() - t0)
+            time.sleep(rng.expovariate(1 / think_s) if think_s else 0)
+
+    c0 = standin.calls
+    with RSS() as rss:
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(k, qs), name=f"session-{k}") for k, qs in enumerate(work)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+        _reset()                               # background refinements count towards this level
+    calls = standin.calls - c0
+    return {
+        "sessions": sessions,
+        "queries": len(lat),
+        "p50_ms": round(_pct(lat, 0.50) * 1000, 1),
+        "p95_ms": round(_pct(lat, 0.95) * 1000, 1),
+        "p99_ms": round(_pct(lat, 0.99) * 1000, 1),
+        "mean_ms": round(statistics.mean(lat) * 1000, 1) if lat else 0.0,
+        "throughput_qps": round(len(lat) / wall, 2) if wall else 0.0,
+        "wall_s": round(wall, 2),
+        "upstream_calls": calls,
+        "ideal_upstream_calls": ideal,
+        "amplification": round(calls / ideal, 3) if ideal else 0.0,
+        "upstream_calls_per_query": round(calls / max(1, len(lat)), 1),
+        "rss_peak_mb": round(rss.peak / 2**20, 1),
+        "rss_mb_per_session": round((rss.peak - rss.base) / 2**20 / sessions, 2),
+        "errors": len(errors),
+        "_first_errors": errors[:3],
+    }
+
+def compare(cur: dict, base: dict) -> list[str]:
+    bad = []
+    for level, b in base.items():
+        c = cur.get(level)
+        if c is None:
+            continue
+        for name, (direction, tol) in METRICS.items():
+            if name not in b:
+                continue
+            if direction == "exact" and c[name] > b[name]:
+                bad.append(f"{level} sessions {name}: {c[name]} vs baseline {b[name]}")
+            elif direction == "lower" and c[name] > b[name] * (1 + tol) + (ABS_SLACK_MS if name.endswith("_ms") else 0):
+                bad.append(f"{level} sessions {name}: {c[name]} vs baseline {b[name]} (+{(c[name] / b[name] - 1) * 100:.0f}%)")
+    return bad
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", default="1,4,16", help="comma-separated concurrency levels")
+    ap.add_argument("--queries", type=int, default=3, help="dashboard queries per session")
+    ap.add_argument("--artists", type=int, default=60, help="roster size")
+    ap.add_argument("--speed", type=float, default=4.0, help="upstream latency = recorded ÷ speed (0: none)")
+    ap.add_argument("--think", type=float, default=0.25, help="mean think time between a session's queries (s)")
+    ap.add_argument("--no-host-limits", action="store_true", help="drop per-host throttles (open.spotify.com)")
+    ap.add_argument("--json", metavar="OUT", help="write the full report here")
+    ap.add_argument("--save", action="store_true", help="write results as the new baseline")
+    args = ap.parse_args(argv)
+
+    import http_client, ticket_scraper as ts
+    ts.CACHE_JSON = pathlib.Path(tempfile.mkdtemp()) / "touringdata_2023_tickets.json"   # scratch, not ./data
+    if args.no_host_limits:
+        http_client.set_rate_limit("open.spotify.com", None)
+    levels = [int(x) for x in args.sessions.split(",") if x.strip()]
+    fx, routes, names = F.roster_fixtures(args.artists)
+    standin = StandIn(fx, routes, speed=args.speed)
+    report = {}
+    try:
+        with install(standin.adapter(pool=max(levels) * 4)):
+            for n in levels:
+                r = run_level(standin, names, n, args.queries, args.think)
+                report[str(n)] = r
+                print(f"{n:>4} sessions  p50 {r['p50_ms']:>8.1f} ms  p95 {r['p95_ms']:>8.1f} ms  "
+                      f"p99 {r['p99_ms']:>8.1f} ms  {r['throughput_qps']:>6.2f} q/s  "
+                      f"upstream {r['upstream_calls']:>5} (×{r['amplification']:.2f} ideal)  "
+                      f"rss +{r['rss_mb_per_session']:.2f} MB/session  errors {r['errors']}", flush=True)
+    finally:
+        standin.close()
+    if standin.replay.misses:
+        report["_misses"] = sorted(set(standin.replay.misses))[:10]
+    if args.json:
+        pathlib.Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save:
+        BASELINE.write_text(json.dumps({k: {m: v[m] for m in METRICS} for k, v in report.items()
+                                        if not k.startswith("_")}, indent=2) + "\n")
+        print(f"baseline saved → {BASELINE}")
+        return 0
+    if BASELINE.exists():
+        bad = compare(report, json.loads(BASELINE.read_text()))
+        if bad:
+            print("REGRESSIONS:\n  " + "\n  ".join(bad))
+            return 1
+        print("OK: no scaling regressions vs baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
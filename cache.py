@@ -0,0 +1,175 @@
+# cache.py — small thread-safe in-process TTL cache shared by the service, dashboard and warmers
+import copy, functools, inspect, os, pathlib, pickle, threading, time
+from collections import OrderedDict
+
+import perf
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    LRU-bounded dict with per-entry expiry (wall-clock, so entries can be persisted).
+      get(key) → value or default          set(key, value, ttl=None)
+      stats()  → hits / misses / size
+    """
+
+    def __init__(self, ttl: float = 3600.0, maxsize: int = 4096, name: str = "cache"):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._data = OrderedDict()            # key → (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING or item[0] < now:
+                if item is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, ttl: float | None = None):
+        exp = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (exp, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and item[0] >= time.time()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"name": self.name, "size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+class PersistentTTLCache(TTLCache):
+    """
+    TTLCache backed by a pickle file so a separate warmer process can fill it.
+    The file is read lazily on first access and re-read whenever its mtime changes.
+    path=None: a private file in a temp dir made on the first flush (removed at exit).
+    """
+
+    def __init__(self, path, **kw):
+        super().__init__(**kw)
+        self.path = pathlib.Path(path) if path else None
+        self._mtime = None
+
+    def _private_path(self) -> pathlib.Path:
+        import atexit, shutil, tempfile
+        d = tempfile.mkdtemp(prefix=f"{self.name}_cache_")
+        atexit.register(shutil.rmtree, d, ignore_errors=True)
+        return pathlib.Path(d) / f"{self.name}_cache.pkl"
+
+    def _sync(self):
+        if self.path is None:
+            return
+        try:
+            m = self.path.stat().st_mtime
+        except OSError:
+            return
+        if m == self._mtime:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                entries = pickle.load(f)
+        except Exception:
+            return
+        now = time.time()
+        with self._lock:
+            self._mtime = m
+            for k, (exp, v) in entries.items():
+                cur = self._data.get(k)
+                if exp >= now and (cur is None or cur[0] < exp):
+                    self._data[k] = (exp, v)
+
+    def get(self, key, default=None):
+        self._sync()
+        return super().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        self._sync()
+        return super().__contains__(key)
+
+    def flush(self):
+        """Write live entries to disk (atomic replace)."""
+        self._sync()
+        now = time.time()
+        with self._lock:
+            live = {k: v for k, v in self._data.items() if v[0] >= now}
+            if self.path is None:
+                self.path = self._private_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(live, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self._mtime = self.path.stat().st_mtime
+
+# ---------- call keys + memoize decorator ----------
+def _norm(v):
+    if isinstance(v, str):
+        return v.strip()
+    if isinstance(v, (list, tuple)):
+        return tuple(_norm(x) for x in v)
+    return v
+
+def arg_key(fn, key=None):
+    """
+    Build key(*args, **kw) for fn: all arguments bound to the signature (defaults applied,
+    strings stripped), so f("x", 2023) and f(" x", year=2023) are the same call.
+    A custom key callable replaces this normalization.
+    """
+    if key is not None:
+        return key
+    sig = inspect.signature(fn)
+
+    def keyfn(*args, **kw):
+        b = sig.bind(*args, **kw)
+        b.apply_defaults()
+        return tuple((k, _norm(v)) for k, v in b.arguments.items())
+    return keyfn
+
+def memoize(cache: TTLCache, name: str, key=None, ttl: float | None = None, cache_if=None):
+    """
+    Decorator: serve repeat calls from `cache` (hits/misses show up in the perf trace).
+    cache_if(result) → False skips storing (e.g. the zero dicts returned on upstream failure).
+    """
+    def deco(fn):
+        keyfn = arg_key(fn, key)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            ck = (name, keyfn(*args, **kw))
+            hit = cache.get(ck, _MISSING)
+            perf.cache_event(name, hit is not _MISSING)
+            if hit is not _MISSING:
+                return copy.deepcopy(hit)
+            val = fn(*args, **kw)
+            if cache_if is None or cache_if(val):
+                cache.set(ck, copy.deepcopy(val), ttl=ttl)      # the caller may mutate what it gets
+            return val
+
+        wrapper.cache_key = lambda *a, **kw: (name, keyfn(*a, **kw))
+        return wrapper
+    return deco
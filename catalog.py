@@ -0,0 +1,138 @@
+# catalog.py — one de-duplicated video catalog across an artist's channels
+#
+#   cat = catalog.build("@beyonce, @BeyonceVEVO", 2023)
+#   cat["totals"]             # unique videos only (a video listed under two inputs counts once)
+#   cat["totals_canonical"]   # additionally one copy per cross-channel re-upload group (earliest kept),
+#                             # with likes_estimated for its hidden like counts
+#   cat["overlap"]            # duplicate channels / IDs, re-upload groups
+#   cat["quota"]              # YouTube units used vs. summing the channels independently
+#
+# Inputs resolving to the same channel are enumerated once, videos.list runs once per unique
+# ID, and rows already cached by yt_annual_stats / yt_video_rows cost nothing.
+import math, os
+
+import numpy as np
+
+import data_pipeline as dp
+import perf
+import sources
+import store
+import videos
+from cache import memoize
+
+SEARCH_UNITS = sources.YOUTUBE.units("search")     # search.list page (≤50 results)
+VIDEOS_UNITS = sources.YOUTUBE.units("videos")     # videos.list call (≤50 IDs)
+
+def _pages(n: int) -> int:
+    return max(1, math.ceil(n / 50))
+
+def reupload_groups(rows: list[dict], duration_tol_s: int = 2) -> list[list[str]]:
+    """
+    Re-uploads / mirrors of one work across channels: videos with the same normalized title on
+    different channels, durations within `duration_tol_s` of the group's first (shortest) member.
+    At most one video per channel per group; groups of 2+ only.
+    """
+    by_title = {}
+    for r in rows:
+        by_title.setdefault(r["title_hash"], []).append(r)
+    groups = []
+    for same in by_title.values():
+        if len(same) < 2:
+            continue
+        left = sorted(same, key=lambda r: r["duration_s"])
+        while len(left) > 1:
+            first, rest = left[0], []
+            cur, chans = [first], {first["channel_id"]}
+            for r in left[1:]:
+                if r["duration_s"] - first["duration_s"] <= duration_tol_s and r["channel_id"] not in chans:
+                    cur.append(r)
+                    chans.add(r["channel_id"])
+                else:
+                    rest.append(r)
+            if len(cur) > 1:
+                groups.append(cur)
+            left = rest
+    return [[r["id"] for r in sorted(g, key=lambda r: r["published_at"])] for g in groups]
+
+def _catalog_key(channels, year, max_videos=400, duration_tol_s=2):
+    return (tuple(sorted(set(dp._split_channels(channels)))), int(year), int(max_videos), int(duration_tol_s))
+
+@perf.timed("yt.catalog")
+@memoize(dp.RESULT_CACHE, "catalog", key=_catalog_key, cache_if=lambda c: c["totals"]["video_count"] > 0)
+def build(channels, year: int, max_videos: int = 400, duration_tol_s: int = 2) -> dict:
+    inputs = list(dict.fromkeys(dp._split_channels(channels)))
+    start, end = f"{int(year)}-01-01", f"{int(year)}-12-31"
+    keys = {inp: dp.yt_video_rows.cache_key(inp, start, end, max_videos=max_videos) for inp in inputs}
+
+    rows_by_id, ids_by_input, cid_of = {}, {}, {}
+    enumerated = {}                                 # channel ID → video IDs (searched at most once)
+    for inp in inputs:
+        cached = dp.RESULT_CACHE.get(keys[inp])
+        if cached is not None:
+            ids_by_input[inp] = [r["id"] for r in cached]
+            for r in cached:
+                rows_by_id.setdefault(r["id"], r)
+            cid_of[inp] = cached[0]["channel_id"] if cached else dp.resolve_channel_id(inp)
+            continue
+        cid = cid_of[inp] = dp.resolve_channel_id(inp)
+        if not cid:
+            ids_by_input[inp] = []
+            continue
+        if cid not in enumerated:
+            try:
+                enumerated[cid] = dp._yt_search_video_ids_for_year(cid, int(year), max_videos=max_videos)
+            except Exception:
+                enumerated[cid] = []
+        ids_by_input[inp] = enumerated[cid]
+
+    # stats once per unique video not already known
+    missing = list(dict.fromkeys(v for ids in ids_by_input.values() for v in ids if v not in rows_by_id))
+    if missing:
+        try:
+            fresh = [videos.row_from_item(it) for it in dp._yt_fetch_video_stats(missing, part=dp.VIDEO_PARTS)]
+            rows_by_id.update((r["id"], r) for r in fresh)
+            store.write("videos", fresh)
+        except Exception:
+            pass
+    for inp in inputs:                              # per-channel tables become free too
+        if dp.RESULT_CACHE.get(keys[inp]) is None and ids_by_input[inp]:
+            dp.RESULT_CACHE.set(keys[inp], [rows_by_id[v] for v in ids_by_input[inp] if v in rows_by_id])
+
+    unique = list(rows_by_id.values())
+    listed = sum(len(ids) for ids in ids_by_input.values())
+    groups = reupload_groups(unique, duration_tol_s)
+    extra = {v for g in groups for v in g[1:]}      # later copies of each re-upload group
+    table = videos.VideoTable(unique)
+    canonical = [r["id"] not in extra for r in unique]
+    totals_canonical = table.totals(mask=np.array(canonical, dtype=bool))
+
+    # hidden/zero like counts of the canonical videos only (the removed copies must not add theirs)
+    hidden = [r["id"] for r, keep in zip(unique, canonical) if keep and not r["likes"]]
+    if hidden and os.getenv("LIKE_ESTIMATE", "1") != "0":
+        import likes
+        est = likes.fill_hidden(unique, hidden)
+        totals_canonical.update(likes_estimated=est["likes"], likes_estimate_se=est["se"],
+                                likes_hidden_videos=est["hidden"])
+
+    by_cid = {}
+    for inp, cid in cid_of.items():
+        if cid:
+            by_cid.setdefault(cid, []).append(inp)
+    independent = sum(SEARCH_UNITS * _pages(len(ids)) + VIDEOS_UNITS * math.ceil(len(ids) / 50)
+                      for ids in ids_by_input.values() if ids)
+    used = (sum(SEARCH_UNITS * _pages(len(ids)) for ids in enumerated.values())
+            + VIDEOS_UNITS * math.ceil(len(missing) / 50))
+    return {
+        "channels": cid_of,
+        "totals": table.totals(),
+        "totals_canonical": totals_canonical,
+        "overlap": {
+            "listed": listed,
+            "unique": len(unique),
+            "duplicate_ids": listed - len(unique),
+            "duplicate_channels": [inps for inps in by_cid.values() if len(inps) > 1],
+            "reupload_groups": groups,
+            "reupload_copies": len(extra),
+        },
+        "quota": {"used": used, "independent": independent, "saved": max(0, independent - used)},
+    }
@@ -0,0 +1,97 @@
+# changes.py — what changed since a point in time, computed from stored snapshots (no fetching)
+#
+#   changes.tickets_diff(2023)                             # latest vs. previous ticket snapshot
+#   changes.tickets_diff(2023, since=time.time() - 7 * 86400)
+#   changes.metric_changes(since)                          # channel views/subs/videos, Spotify followers/listeners
+#   changes.feed(since, artists=roster, limit=100)         # one list, largest relative moves first
+#
+# Ticket lists are versioned by store.write_tickets (a new version only when the list changed);
+# channel and Spotify numbers are the store's timestamped snapshots. Each diff is a few indexed
+# SQL queries, whatever the roster size.
+import store
+
+CHANNEL_METRICS = ("views", "subscribers", "videos")
+SPOTIFY_METRICS = ("followers", "popularity", "monthly_listeners")
+
+def _pct(before, after) -> float | None:
+    return round((after - before) / before * 100, 3) if before else None
+
+def tickets_diff(year: int, source: str = "touringdata", since: int | None = None, s=None) -> dict:
+    """
+    Added / removed artists and changed ticket counts between two ticket snapshots:
+    the newest one at or before `since` (default: the previous snapshot) and the latest.
+    """
+    s = s or store.default()
+    out = {"year": int(year), "source": source, "from": None, "to": None, "added": [], "removed": [], "changed": []}
+    snaps = s.ticket_snapshots(year, source) if s is not None else []
+    if not snaps:
+        return out
+    new = snaps[-1]
+    if since is None:
+        old = snaps[-2] if len(snaps) > 1 else None
+    else:
+        old_id = s.ticket_snapshot_at(year, source, since)
+        old = next((x for x in snaps if x["id"] == old_id), None)
+    out["to"] = new
+    out["from"] = old
+    if old is None or old["id"] == new["id"]:
+        return out
+    for r in s.ticket_version_diff(old["id"], new["id"]):
+        if r["before"] is None:
+            out["added"].append({"artist": r["artist"], "tickets": r["after"]})
+        elif r["after"] is None:
+            out["removed"].append({"artist": r["artist"], "tickets": r["before"]})
+        else:
+            out["changed"].append({**r, "delta": r["after"] - r["before"], "pct": _pct(r["before"], r["after"])})
+    for k in ("added", "removed"):
+        out[k].sort(key=lambda r: -r["tickets"])
+    out["changed"].sort(key=lambda r: -abs(r["delta"]))
+    return out
+
+def metric_changes(since: int, s=None) -> list[dict]:
+    """Channel and Spotify metric deltas: newest snapshot vs. the newest at or before `since`."""
+    s = s or store.default()
+    if s is None:
+        return []
+    out = []
+    for kind, table, key, metrics in (("youtube", "channel_stats", "channel_id", CHANNEL_METRICS),
+                                      ("spotify", "spotify_stats", "spotify_id", SPOTIFY_METRICS)):
+        names = s.names_for(kind)
+        for m in metrics:
+            for r in s.metric_deltas(table, key, m, since):
+                if r["before"] == r["after"]:
+                    continue
+                out.append({"kind": kind, "id": r["id"], "artist": names.get(r["id"]), "metric": m,
+                            "before": r["before"], "after": r["after"], "delta": r["after"] - r["before"],
+                            "pct": _pct(r["before"], r["after"]), "before_at": r["before_at"],
+                            "after_at": r["after_at"]})
+    return out
+
+def feed(since: int, artists=None, limit: int | None = 100, s=None) -> list[dict]:
+    """
+    Every change since `since` as one list: ticket entries added/removed/changed in snapshots
+    taken after `since`, plus metric deltas. `artists` (names) narrows it to a roster.
+    Added/removed entries come first, then the largest relative moves.
+    """
+    s = s or store.default()
+    if s is None:
+        return []
+    events = []
+    for key in {(x["year"], x["source"]) for x in s.ticket_snapshots() if x["taken_at"] > since}:
+        d = tickets_diff(*key, since=since, s=s)
+        if d["from"] is None:
+            continue
+        for change, rows in (("added", d["added"]), ("removed", d["removed"])):
+            events += [{"kind": "tickets", "id": f"{key[1]}:{key[0]}", "artist": r["artist"], "metric": "tickets",
+                        "change": change, "before": None if change == "added" else r["tickets"],
+                        "after": r["tickets"] if change == "added" else None, "delta": None, "pct": None}
+                       for r in rows]
+        events += [{"kind": "tickets", "id": f"{key[1]}:{key[0]}", "artist": r["artist"], "metric": "tickets",
+                    "change": "changed", "before": r["before"], "after": r["after"], "delta": r["delta"],
+                    "pct": r["pct"]} for r in d["changed"]]
+    events += [{**e, "change": "changed"} for e in metric_changes(since, s=s)]
+    if artists is not None:
+        keep = {" ".join(str(a).split()).casefold() for a in artists}
+        events = [e for e in events if e.get("artist") and " ".join(e["artist"].split()).casefold() in keep]
+    events.sort(key=lambda e: (e["change"] == "changed", -abs(e["pct"] or 0)))
+    return events[:limit] if limit else events
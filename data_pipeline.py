@@ -1,19 +1,64 @@
 # data_pipeline.py
-import os, requests, math
+# Import is side-effect free and cheap: .env is read, and requests / bs4 / the
+# ticket scraper are imported, only when a function first needs them.
+import os, re, json, time, math
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
-from dotenv import load_dotenv
-from ticket_scraper import load_cached_ticket_totals
+import http_client, perf, singleflight, sources, store
+from cache import PersistentTTLCache, memoize
+
+# --------------------------------------------------------------------
+# Lazy config (.env loaded on first use)
+# --------------------------------------------------------------------
+_ENV_LOADED = False
 
+def _env(name: str) -> str:
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        _ENV_LOADED = True
+    return os.getenv(name, "")
+
+def _yt_key() -> str:
+    return _env("YOUTUBE_API_KEY")
+
+_LAZY_CONFIG = {
+    "YT_KEY": "YOUTUBE_API_KEY",
+    "SPOTIFY_CLIENT_ID": "SPOTIFY_CLIENT_ID",
+    "SPOTIFY_CLIENT_SECRET": "SPOTIFY_CLIENT_SECRET",
+}
+
+# Shared result cache: dashboard sessions, the API and warm_cache.py (another process)
+# all read/write the same entries; the pickle file is only touched on first use.
+# Replay and record runs (PIPELINE_REPLAY / PIPELINE_RECORD) start from an empty per-process cache
+# (temp file made on first write) so every answer comes from, or goes into, the archive.
+_DAY = 24 * 3600
+
+def _cache_path() -> str | None:
+    if "PIPELINE_CACHE_PATH" in os.environ:
+        return os.environ["PIPELINE_CACHE_PATH"]
+    if os.getenv("PIPELINE_REPLAY") or os.getenv("PIPELINE_RECORD"):
+        return None
+    return "data/pipeline_cache.pkl"
 
-load_dotenv()
-YT_KEY = os.getenv("YOUTUBE_API_KEY", "")
+RESULT_CACHE = PersistentTTLCache(
+    _cache_path(),
+    ttl=float(os.getenv("PIPELINE_CACHE_TTL", str(6 * 3600)) or 6 * 3600),
+    maxsize=20_000, name="pipeline",
+)
 
-import os, re, requests
-from dotenv import load_dotenv
-from ticket_scraper import load_cached_ticket_totals
+def _ml_value(v):
+    return (v.get("value", 0) if isinstance(v, dict) else v) or 0
 
-load_dotenv()
-YT_KEY = os.getenv("YOUTUBE_API_KEY", "")
+def __getattr__(name):
+    # keeps `dp.YT_KEY` etc. working for callers without reading .env at import time
+    if name in _LAZY_CONFIG:
+        return _env(_LAZY_CONFIG[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --------------------------------------------------------------------
 # Universal K/M/B text parser
@@ -36,6 +81,70 @@ def parse_abbrev_count(raw: str) -> int:
     elif suf == "B": mult = 1_000_000_000
     return int(num * mult)
 
+# ---------- bulk (vectorized) variant ----------
+# Suffix → multiplier. "en" knows K/M/B only (same as the scalar parser); the other
+# locales add the spelled-out European forms ("Tsd.", "Mio.", "Mrd.", "mln", "bn").
+_SUFFIX_MULT = {
+    "k": 1_000, "tsd": 1_000,
+    "m": 1_000_000, "mio": 1_000_000, "mln": 1_000_000,
+    "b": 1_000_000_000, "bn": 1_000_000_000, "mrd": 1_000_000_000, "md": 1_000_000_000,
+}
+_BULK_EN_RE = r"(?P<n>[0-9]+(?:\.[0-9]+)?)\s*(?P<s>[kmb]?)"
+_GROUP_SEPS = ".,' \u00a0\u202f"          # grouping / decimal separators seen in the wild
+_BULK_INTL_RE = f"(?P<n>[0-9]+(?:[{_GROUP_SEPS}][0-9]+)*)\\s*(?P<s>mrd|mio|mln|tsd|md|bn|k|m|b)?"
+_BULK_LAST_RE = f"(?P<sep>[{_GROUP_SEPS}])(?P<tail>[0-9]+)$"
+
+def _label_array(labels):
+    import pyarrow as pa
+    try:
+        return pa.array(labels, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.array([None if x is None else str(x) for x in labels], type=pa.string(), from_pandas=True)
+
+def parse_abbrev_counts(labels, locale: str = "en"):
+    """
+    Vectorized parse_abbrev_count over a list / Series / array of labels → numpy int64 array.
+    Runs as a handful of Arrow compute kernels (RE2 regexes) instead of a Python loop.
+    locale:
+      "en"   – identical to the scalar parser ("2,345", "1.3M", "862K")
+      "eu"   – decimal comma, "." / space / apostrophe grouping ("1,2 M", "1.234.567", "3,4 Mio.");
+               a "." is still a decimal point before a suffix or when not followed by exactly
+               3 digits ("1.2 Mio.", "1.3M")
+      "auto" – per label: with a suffix the last separator is the decimal point ("1,2 M",
+               "1.2 Mio."); without one, a separator followed by exactly 3 digits groups thousands.
+    Empty / unparseable labels give 0.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    low = pc.utf8_lower(_label_array(labels))
+    if locale == "en":
+        m = pc.extract_regex(pc.replace_substring(low, ",", ""), _BULK_EN_RE)
+        num = pc.struct_field(m, "n")
+    else:
+        m = pc.extract_regex(low, _BULK_INTL_RE)
+        raw = pc.fill_null(pc.struct_field(m, "n"), "")
+        last = pc.extract_regex(raw, _BULK_LAST_RE)
+        sep = pc.struct_field(last, "sep")
+        tail = pc.fill_null(pc.struct_field(last, "tail"), "")
+        # "." / "," before anything but exactly 3 trailing digits, or before a suffix, is a decimal point
+        has_suf = pc.greater(pc.utf8_length(pc.fill_null(pc.struct_field(m, "s"), "")), 0)
+        dec_shape = pc.or_(has_suf, pc.not_equal(pc.utf8_length(tail), 3))
+        if locale == "auto":
+            is_dec = pc.and_(pc.is_in(sep, value_set=pa.array([".", ","])), dec_shape)
+        else:
+            is_dec = pc.or_(pc.equal(sep, ","), pc.and_(pc.equal(sep, "."), dec_shape))
+        is_dec = pc.fill_null(is_dec, False)
+        head = pc.if_else(is_dec, pc.replace_substring_regex(raw, _BULK_LAST_RE, ""), raw)
+        digits = pc.replace_substring_regex(head, "[^0-9]", "")
+        norm = pc.if_else(is_dec, pc.binary_join_element_wise(digits, tail, "."), digits)
+        num = pc.if_else(pc.greater(pc.utf8_length(norm), 0), norm, pa.scalar(None, pa.string()))
+    keys = list(_SUFFIX_MULT)
+    idx = pc.fill_null(pc.index_in(pc.struct_field(m, "s"), value_set=pa.array(keys)), len(keys))
+    mult = np.array([_SUFFIX_MULT[k] for k in keys] + [1], dtype="float64")[idx.to_numpy(zero_copy_only=False)]
+    vals = pc.fill_null(pc.cast(num, pa.float64()), 0.0).to_numpy(zero_copy_only=False) * mult
+    return np.floor(vals).astype(np.int64)
+
 def extract_first_label(text: str, key_phrase: str) -> str | None:
     """Find first 'simpleText' or 'label' containing a key phrase like 'views'."""
     pat = re.compile(
@@ -77,6 +186,9 @@ def _safe_int(x):
     except Exception:
         return 0
 
+@perf.timed("yt.resolve_channel_id")
+@memoize(RESULT_CACHE, "resolve_channel_id", ttl=30 * _DAY, cache_if=bool)
+@singleflight.shared("resolve_channel_id")
 def resolve_channel_id(id_or_handle_or_name: str) -> str | None:
     """
     Accepts:
@@ -89,28 +201,19 @@ def resolve_channel_id(id_or_handle_or_name: str) -> str | None:
     s = id_or_handle_or_name.strip()
     if s.startswith("UC") and len(s) >= 10:
         return s
-    if not YT_KEY:
+    if not _yt_key():
         return None
 
     try:
-        params = {
-            "part": "snippet",
-            "q": s,
-            "type": "channel",
-            "maxResults": 1,
-            "key": YT_KEY,
-        }
-        r = requests.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=20)
-        r.raise_for_status()
-        items = r.json().get("items", [])
+        items = sources.YOUTUBE.call("search", part="snippet", q=s, type="channel", maxResults=1).get("items", [])
         if not items:
             return None
-        return items[0]["id"]["channelId"]
+        cid = items[0]["id"]["channelId"]
+        store.write("identity", "youtube", s, cid)
+        return cid
     except Exception:
         return None
 
-import json, time
-
 # --- Robust like label finder on watch page ---
 _LIKE_LABEL_PATTERNS = [
     # modern aria-label on the like button:
@@ -121,10 +224,10 @@ _LIKE_LABEL_PATTERNS = [
     re.compile(r'"label"\s*:\s*"([^"]*?\blikes?\b[^"]*)"', re.IGNORECASE),
 ]
 
+@perf.timed("yt.watch_page")
 def _fetch_watch_html(video_id: str) -> str | None:
     try:
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        r = requests.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=20)
+        r = sources.YOUTUBE.watch_page(video_id)
         r.raise_for_status()
         return r.text
     except Exception:
@@ -140,12 +243,15 @@ def _extract_like_label(html: str) -> str | None:
     return None
 
 
+@perf.timed("yt.channel_stats")
+@memoize(RESULT_CACHE, "get_youtube_channel_stats", cache_if=lambda r: "_raw" in r)
+@singleflight.shared("get_youtube_channel_stats")
 def get_youtube_channel_stats(id_or_handle_or_name: str, debug=False) -> dict:
     """
     Fetch channel-level stats (views, subs, videos).
     Returns parsed integers and raw texts for verification.
     """
-    if not YT_KEY:
+    if not _yt_key():
         return {"viewCount": 0, "subscriberCount": 0, "videoCount": 0}
 
     cid = resolve_channel_id(id_or_handle_or_name)
@@ -153,11 +259,7 @@ def get_youtube_channel_stats(id_or_handle_or_name: str, debug=False) -> dict:
         return {"viewCount": 0, "subscriberCount": 0, "videoCount": 0}
 
     try:
-        url = "https://www.googleapis.com/youtube/v3/channels"
-        params = {"part": "statistics", "id": cid, "key": YT_KEY}
-        r = requests.get(url, params=params, timeout=20)
-        r.raise_for_status()
-        data = r.json()
+        data = sources.YOUTUBE.call("channels", part="statistics", id=cid)
         items = data.get("items", [])
         if not items:
             return {"viewCount": 0, "subscriberCount": 0, "videoCount": 0}
@@ -179,6 +281,7 @@ def get_youtube_channel_stats(id_or_handle_or_name: str, debug=False) -> dict:
         if debug:
             print("Raw YouTube stats:", raw)
 
+        store.write("channel", cid, out)
         return out
     except Exception as e:
         if debug:
@@ -187,7 +290,7 @@ def get_youtube_channel_stats(id_or_handle_or_name: str, debug=False) -> dict:
 
 def yt_annual_stats(id_or_handle_or_name: str, year: int, include_comments: bool = True,
                     max_videos: int = 400, verify_with_html: bool = False, sample_n: int = 3) -> dict:
-    if not YT_KEY:
+    if not _yt_key():
         return {"views": 0, "likes": 0, "comments": 0, "video_count": 0, "_sample_raw": []}
 
     cid = resolve_channel_id(id_or_handle_or_name)
@@ -252,15 +355,32 @@ def yt_annual_stats(id_or_handle_or_name: str, year: int, include_comments: bool
 
     return result
 
+def _split_channels(ids_or_handles_or_names) -> list:
+    if isinstance(ids_or_handles_or_names, str):
+        return [s.strip() for s in ids_or_handles_or_names.split(",") if s.strip()]
+    return list(ids_or_handles_or_names or [])
+
+def _multi_key(ids_or_handles_or_names, year, include_comments=True, max_videos=400,
+               verify_with_html=False, sample_n=3):
+    # channel order doesn't change the totals, so "@a, @b" and "@b,@a" share one fetch
+    return (tuple(sorted(set(_split_channels(ids_or_handles_or_names)))), int(year),
+            bool(include_comments), int(max_videos), bool(verify_with_html), int(sample_n))
+
+@perf.timed("yt.annual_stats_multi")
+@memoize(RESULT_CACHE, "yt_annual_stats_multi", key=_multi_key, cache_if=lambda r: r.get("video_count", 0) > 0)
+@singleflight.shared("yt_annual_stats_multi", key=_multi_key)
 def yt_annual_stats_multi(ids_or_handles_or_names, year: int, include_comments: bool = True,
                           max_videos: int = 400, verify_with_html: bool = False, sample_n: int = 3) -> dict:
     """
-    Sum annual YouTube stats across multiple channels (IDs/handles/names separated by commas).
+    Annual YouTube stats across multiple channels (IDs/handles/names separated by commas).
+    Inputs resolving to the same channel are fetched and counted once. With several channels the
+    headline totals come from the cross-channel catalog over the rows just fetched (no extra
+    calls): re-uploads count once. "summed" keeps the plain per-channel sum for comparison.
     """
-    if isinstance(ids_or_handles_or_names, str):
-        items = [s.strip() for s in ids_or_handles_or_names.split(",") if s.strip()]
-    else:
-        items = list(ids_or_handles_or_names or [])
+    by_cid = {}
+    for it in _split_channels(ids_or_handles_or_names):
+        by_cid.setdefault(resolve_channel_id(it) or it, it)
+    items = list(by_cid.values())
 
     total = {"views": 0, "likes": 0, "comments": 0, "video_count": 0}
     samples = []
@@ -271,35 +391,49 @@ def yt_annual_stats_multi(ids_or_handles_or_names, year: int, include_comments:
         total["likes"] += int(part.get("likes", 0)*1000 or 0)  # changed!
         total["comments"] += int(part.get("comments", 0)*1000 or 0) # changed!
         total["video_count"] += int(part.get("video_count", 0) or 0)
+        if part.get("likes_hidden_videos"):
+            total["likes_estimated"] = total.get("likes_estimated", 0) + int(part["likes_estimated"] * 1000)
+            se2 = total.pop("_se2", 0) + (part["likes_estimate_se"] * 1000) ** 2
+            total["likes_estimate_se"], total["_se2"] = int(math.sqrt(se2)), se2
+            total["likes_hidden_videos"] = total.get("likes_hidden_videos", 0) + part["likes_hidden_videos"]
         if verify_with_html and part.get("_sample_raw"):
             samples.extend(part["_sample_raw"])
+    total.pop("_se2", None)
+    if len(items) > 1 and total["video_count"] and max_videos <= STREAM_MIN_VIDEOS:
+        with perf.span("yt.multi_canonical", channels=len(items)) as sp:
+            try:
+                import catalog
+                canon = catalog.build(items, int(year), max_videos=max_videos)["totals_canonical"]
+            except Exception as e:
+                canon = None
+                sp["fallback"] = f"summed totals: {type(e).__name__}: {e}"    # visible in the run trace
+            if canon is not None and canon["video_count"] < total["video_count"]:
+                total["summed"] = {m: total[m] for m in ("views", "likes", "comments", "video_count")}
+                est = int(canon.get("likes_estimated", 0)) * 1000
+                total.update(views=int(canon["views"]) * 1000,
+                             likes=int(canon["likes"]) * 1000 + est,
+                             comments=int(canon["comments"]) * 1000 if include_comments else 0,
+                             video_count=int(canon["video_count"]))
+                for k in ("likes_estimated", "likes_estimate_se", "likes_hidden_videos"):
+                    total.pop(k, None)
+                if canon.get("likes_hidden_videos"):
+                    total.update(likes_estimated=est, likes_estimate_se=int(canon["likes_estimate_se"]) * 1000,
+                                 likes_hidden_videos=int(canon["likes_hidden_videos"]))
     if verify_with_html:
         total["_sample_raw"] = samples[:sample_n]
     return total
 
 # ---------- Spotify helpers (followers + monthly listeners as "streams") ----------
-import base64, re
 
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID", "")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET", "")
+_SP_TOKEN = sources.SPOTIFY.token_state
 
 def _spotify_token() -> str | None:
-    """Client Credentials token (no user login)."""
-    if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
-        return None
-    try:
-        auth = base64.b64encode(f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode()).decode()
-        r = requests.post(
-            "https://accounts.spotify.com/api/token",
-            data={"grant_type": "client_credentials"},
-            headers={"Authorization": f"Basic {auth}"},
-            timeout=15,
-        )
-        r.raise_for_status()
-        return r.json().get("access_token")
-    except Exception:
-        return None
+    """Client Credentials token (no user login); reused until a minute before it expires."""
+    return sources.SPOTIFY.token()
 
+@perf.timed("spotify.resolve_artist")
+@memoize(RESULT_CACHE, "spotify_resolve_artist_id", ttl=30 * _DAY, cache_if=bool)
+@singleflight.shared("spotify_resolve_artist_id")
 def spotify_resolve_artist_id(name_or_url: str) -> str | None:
     """Accepts artist name, artist URL, or artist ID; returns 22-char ID."""
     if not name_or_url:
@@ -317,18 +451,17 @@ def spotify_resolve_artist_id(name_or_url: str) -> str | None:
     if not tok:
         return None
     try:
-        r = requests.get(
-            "https://api.spotify.com/v1/search",
-            headers={"Authorization": f"Bearer {tok}"},
-            params={"q": s, "type": "artist", "limit": 1},
-            timeout=15,
-        )
-        r.raise_for_status()
-        items = (r.json().get("artists") or {}).get("items") or []
-        return items[0]["id"] if items else None
+        items = (sources.SPOTIFY.call("search", q=s, type="artist", limit=1).get("artists") or {}).get("items") or []
+        if not items:
+            return None
+        store.write("identity", "spotify", s, items[0]["id"])
+        return items[0]["id"]
     except Exception:
         return None
 
+@perf.timed("spotify.followers")
+@memoize(RESULT_CACHE, "spotify_artist_followers", cache_if=bool)
+@singleflight.shared("spotify_artist_followers")
 def spotify_artist_followers(artist_id_or_name: str) -> int:
     """Return artist followers (official API; free)."""
     aid = spotify_resolve_artist_id(artist_id_or_name)
@@ -338,52 +471,164 @@ def spotify_artist_followers(artist_id_or_name: str) -> int:
     if not tok:
         return 0
     try:
-        r = requests.get(
-            f"https://api.spotify.com/v1/artists/{aid}",
-            headers={"Authorization": f"Bearer {tok}"},
-            timeout=15,
-        )
-        r.raise_for_status()
-        return int((r.json().get("followers") or {}).get("total", 0) or 0)
+        js = sources.SPOTIFY.call(f"artists/{aid}")
+        followers = int((js.get("followers") or {}).get("total", 0) or 0)
+        store.write("spotify", [{"id": aid, "followers": followers, "popularity": js.get("popularity")}])
+        return followers
     except Exception:
         return 0
 
 
+_SP_BULK_MAX = 50   # /v1/artists?ids= accepts at most 50 IDs per call
+
+@perf.timed("spotify.artists_bulk")
+def spotify_artists_bulk(artists, max_workers: int = 8, as_frame: bool = False):
+    """
+    Followers + popularity + genres for many artists at once.
+    - Names/URLs/IDs are resolved concurrently (cached IDs cost nothing), one token for the batch.
+    - Profiles come from /v1/artists?ids= in groups of 50: ~N/50 calls instead of N.
+    Returns {input: {"id", "name", "followers", "popularity", "genres"}} (None where unresolved),
+    or a pandas DataFrame indexed by input when as_frame=True.
+    Also seeds the spotify_artist_followers cache so later single lookups are free.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    inputs = list(dict.fromkeys(a for a in (artists or []) if a and str(a).strip()))
+    out = {a: None for a in inputs}
+    if not inputs:
+        return _bulk_frame(out) if as_frame else out
+
+    tok = _spotify_token()
+    if not tok:
+        return _bulk_frame(out) if as_frame else out
+
+    with perf.span("spotify.bulk_resolve", artists=len(inputs)):
+        with ThreadPoolExecutor(max(1, min(max_workers, len(inputs)))) as pool:
+            ids = list(pool.map(perf.bind(spotify_resolve_artist_id), inputs))
+    by_id = {}
+    for a, aid in zip(inputs, ids):
+        if aid:
+            by_id.setdefault(aid, []).append(a)
+
+    uniq, fetched = list(by_id), []
+    for i in range(0, len(uniq), _SP_BULK_MAX):
+        chunk = uniq[i:i + _SP_BULK_MAX]
+        try:
+            with perf.span("spotify.artists_batch", ids=len(chunk)):
+                items = sources.SPOTIFY.call("artists", ids=",".join(chunk)).get("artists") or []
+        except Exception:
+            continue
+        for it in items:
+            if not it:
+                continue
+            row = {
+                "id": it.get("id"),
+                "name": it.get("name"),
+                "followers": int((it.get("followers") or {}).get("total", 0) or 0),
+                "popularity": int(it.get("popularity", 0) or 0),
+                "genres": list(it.get("genres") or []),
+            }
+            fetched.append(row)
+            for a in by_id.get(row["id"], []):
+                out[a] = row
+                if row["followers"]:
+                    RESULT_CACHE.set(spotify_artist_followers.cache_key(a), row["followers"])
+    store.write("spotify", fetched)      # one transaction for the whole batch
+    return _bulk_frame(out) if as_frame else out
+
+def _bulk_frame(table: dict):
+    import pandas as pd
+    cols = ["id", "name", "followers", "popularity", "genres"]
+    rows = [{"artist": a, **(v or dict.fromkeys(cols))} for a, v in table.items()]
+    df = pd.DataFrame(rows, columns=["artist"] + cols).set_index("artist")
+    return df.astype({"followers": "Int64", "popularity": "Int64"})
+
+_ML_JSON = re.compile(r'"monthlyListeners"\s*:\s*([0-9]+)')
+# Fallback textual pattern like: "Monthly listeners</span><span>55M"
+_ML_TEXT = re.compile(r"Monthly listeners[^0-9KMBkmb]*([0-9][0-9,\.]*\s*[KkMmBb]?)")
+_ML_CHUNK = 16 * 1024
+
+def _scan_monthly_listeners(chunks):
+    """
+    Search a stream of page chunks for monthly listeners and stop at the first hit.
+    A match touching the end of what has been read so far is re-checked after the next
+    chunk (the number may continue). Returns (raw, value, bytes_read).
+    """
+    import codecs
+    dec = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    tail, nbytes = "", 0
+    for chunk in chunks:
+        nbytes += len(chunk)
+        buf = tail + dec.decode(chunk)
+        m = _ML_JSON.search(buf)
+        if m and m.end() < len(buf):
+            return f"{m.group(1)} monthly listeners", int(m.group(1)), nbytes
+        t = _ML_TEXT.search(buf)
+        if t and t.end() < len(buf):
+            raw_chunk = t.group(1).strip()
+            return f"{raw_chunk} monthly listeners", parse_abbrev_count(raw_chunk), nbytes
+        tail = buf[-512:]
+    buf = tail + dec.decode(b"", final=True)
+    m = _ML_JSON.search(buf)
+    if m:
+        return f"{m.group(1)} monthly listeners", int(m.group(1)), nbytes
+    t = _ML_TEXT.search(buf)
+    if t:
+        raw_chunk = t.group(1).strip()
+        return f"{raw_chunk} monthly listeners", parse_abbrev_count(raw_chunk), nbytes
+    return None, 0, nbytes
+
+@perf.timed("spotify.monthly_listeners")
+@memoize(RESULT_CACHE, "spotify_monthly_listeners_scrape", ttl=_DAY, cache_if=_ml_value)
+@singleflight.shared("spotify_monthly_listeners_scrape")
 def spotify_monthly_listeners_scrape(artist_id_or_name: str, return_raw: bool = False):
     """
     Scrape public artist page to get 'Monthly listeners' (text + parsed int).
     - Uses the same K/M/B parser as YouTube for correctness.
-    - Returns int by default; returns dict {'raw': str, 'value': int} if return_raw=True.
+    - Streams the page and stops reading as soon as the number is found.
+    - Returns int by default; returns dict {'raw': str, 'value': int, 'bytes': int} if return_raw=True.
     """
     aid = spotify_resolve_artist_id(artist_id_or_name)
     if not aid:
-        return {"raw": None, "value": 0} if return_raw else 0
+        return {"raw": None, "value": 0, "bytes": 0} if return_raw else 0
 
     url = f"https://open.spotify.com/artist/{aid}"
     try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
-        r.raise_for_status()
-        html = r.text
-
-        # Preferred JSON key (sometimes present in the page source)
-        m_num_json = re.search(r'"monthlyListeners"\s*:\s*([0-9]+)', html)
-        if m_num_json:
-            raw_text = f"{m_num_json.group(1)} monthly listeners"
-            val = int(m_num_json.group(1))
-            return ({"raw": raw_text, "value": val} if return_raw else val)
-
-        # Fallback textual pattern like: "Monthly listeners</span><span>55M"
-        m_txt = re.search(r"Monthly listeners[^0-9KMBkmb]*([0-9][0-9,\.]*\s*[KkMmBb]?)", html)
-        if m_txt:
-            raw_chunk = m_txt.group(1).strip()
-            val = parse_abbrev_count(raw_chunk)  # uses your universal K/M/B parser
-            raw_text = f"{raw_chunk} monthly listeners"
-            return ({"raw": raw_text, "value": val} if return_raw else val)
-
-        # If not found
-        return ({"raw": None, "value": 0} if return_raw else 0)
+        t0, nbytes = time.perf_counter(), 0
+        r = sources.SPOTIFY.artist_page(aid, timeout=20, stream=True)
+        try:
+            r.raise_for_status()
+            raw_text, val, nbytes = _scan_monthly_listeners(r.iter_content(_ML_CHUNK))
+        finally:
+            r.close()       # drop the rest of the page
+            perf.record_http(http_client.endpoint_of(url), nbytes, time.perf_counter() - t0, calls=0)
+        if val:
+            store.write("spotify", [{"id": aid, "monthly_listeners": val}])
+        return ({"raw": raw_text, "value": val, "bytes": nbytes} if return_raw else val)
     except Exception:
-        return ({"raw": None, "value": 0} if return_raw else 0)
+        return ({"raw": None, "value": 0, "bytes": 0} if return_raw else 0)
+
+@perf.timed("spotify.monthly_listeners_bulk")
+def spotify_monthly_listeners_bulk(artists, max_workers: int = 4) -> dict:
+    """
+    Monthly listeners for many artists: a bounded worker pool over the cached scraper.
+    open.spotify.com requests are spaced by http_client's per-host limit (SPOTIFY_WEB_RPS).
+    Returns {artist: {"raw", "value", "bytes", "seconds", "cached"}}; cached rows cost no bytes.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    inputs = list(dict.fromkeys(a for a in (artists or []) if a and str(a).strip()))
+
+    def one(a):
+        cached = spotify_monthly_listeners_scrape.cache_key(a, return_raw=True) in RESULT_CACHE
+        t0 = time.perf_counter()
+        res = spotify_monthly_listeners_scrape(a, return_raw=True)
+        return a, {"raw": res.get("raw"), "value": res.get("value", 0),
+                   "bytes": 0 if cached else res.get("bytes", 0),
+                   "seconds": round(time.perf_counter() - t0, 4), "cached": cached}
+
+    if not inputs:
+        return {}
+    with ThreadPoolExecutor(max(1, min(max_workers, len(inputs)))) as pool:
+        return dict(pool.map(perf.bind(one), inputs))
 
 def compute_spotify_conversions_monthly(
     tickets_total: int,
@@ -486,7 +731,6 @@ def _div_pct(n: int, d: int) -> Optional[float]:
 #         return {"viewCount": 0, "subscriberCount": 0, "videoCount": 0}
 
 # ---------- YouTube: annual totals via official API (accurate integers) ----------
-from datetime import datetime, timezone
 
 def _iso_year_bounds(year: int):
     start = datetime(year, 1, 1, 0, 0, 0, tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
@@ -495,8 +739,18 @@ def _iso_year_bounds(year: int):
 
 def _yt_search_video_ids_for_year(channel_id: str, year: int, max_videos: int = 400) -> list[str]:
     """List video IDs for a channel in the given year using search.list (paged)."""
-    published_after, published_before = _iso_year_bounds(year)
-    ids = []
+    return _yt_search_video_ids(channel_id, *_iso_year_bounds(year), max_videos=max_videos)
+
+def _yt_search_video_ids(channel_id: str, published_after: str, published_before: str,
+                         max_videos: int = 400) -> list[str]:
+    """List video IDs for a channel published in [after, before] (RFC 3339) using search.list (paged)."""
+    return [v for page in _yt_search_id_pages(channel_id, published_after, published_before, max_videos)
+            for v in page]
+
+def _yt_search_id_pages(channel_id: str, published_after: str, published_before: str,
+                        max_videos: int | None = 400):
+    """Yield each search.list page's video IDs (≤50) as it arrives; stops after max_videos (None: all)."""
+    n = 0
     page_token = None
     while True:
         params = {
@@ -507,34 +761,147 @@ def _yt_search_video_ids_for_year(channel_id: str, year: int, max_videos: int =
             "maxResults": 50,
             "publishedAfter": published_after,
             "publishedBefore": published_before,
-            "key": YT_KEY,
         }
         if page_token:
             params["pageToken"] = page_token
-        r = requests.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=20)
-        r.raise_for_status()
-        js = r.json()
+        with perf.span("yt.search_page", channel=channel_id):
+            js = sources.YOUTUBE.call("search", **params)
         batch = [it["id"]["videoId"] for it in js.get("items", []) if it.get("id", {}).get("videoId")]
-        ids.extend(batch)
-        if len(ids) >= max_videos:
-            ids = ids[:max_videos]
+        if max_videos is not None:
+            batch = batch[:max_videos - n]
+        n += len(batch)
+        if batch:
+            yield batch
+        if max_videos is not None and n >= max_videos:
             break
         page_token = js.get("nextPageToken")
         if not page_token:
             break
-    return ids
 
-def _yt_fetch_video_stats(video_ids: list[str]) -> list[dict]:
-    """Fetch statistics for up to 50 video IDs using videos.list."""
-    out = []
-    for i in range(0, len(video_ids), 50):
-        chunk = video_ids[i:i+50]
-        params = {"part": "statistics", "id": ",".join(chunk), "key": YT_KEY}
-        r = requests.get("https://www.googleapis.com/youtube/v3/videos", params=params, timeout=20)
-        r.raise_for_status()
-        out.extend(r.json().get("items", []))
-    return out
+def _yt_fetch_video_stats(video_ids: list[str], part: str = "statistics") -> list[dict]:
+    """Fetch statistics (or any `part` list) for video IDs using videos.list, 50 per call."""
+    return [it for items in _yt_video_item_batches([video_ids], part) for it in items]
+
+def _yt_video_item_batches(id_pages, part: str = "statistics"):
+    """Regroup a stream of ID pages into 50-ID videos.list calls; yields each call's items."""
+    buf = []
+    for page in id_pages:
+        buf.extend(page)
+        full = len(buf) - len(buf) % 50
+        for i in range(0, full, 50):
+            yield _yt_videos_list(buf[i:i + 50], part)
+        del buf[:full]
+    if buf:
+        yield _yt_videos_list(buf, part)
+
+def _yt_videos_list(chunk: list[str], part: str) -> list[dict]:
+    with perf.span("yt.videos_list_batch", ids=len(chunk)):
+        return sources.YOUTUBE.call("videos", part=part, id=",".join(chunk)).get("items", [])
+
+def _rfc3339(d, end: bool = False) -> str:
+    """'2023-04-01' / date / datetime → '2023-04-01T00:00:00Z' (end=True: last second of a bare date)."""
+    if isinstance(d, (int, float)):
+        d = datetime.fromtimestamp(d, tz=timezone.utc)
+    if isinstance(d, str):
+        d = datetime.fromisoformat(d.replace("Z", "+00:00")) if "T" in d else datetime.fromisoformat(d).date()
+    if not isinstance(d, datetime):
+        d = datetime(d.year, d.month, d.day, 23 if end else 0, 59 if end else 0, 59 if end else 0)
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=timezone.utc)
+    return d.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# videos.list parts fetched for every video: same quota (1 unit per 50 IDs) as statistics alone
+VIDEO_PARTS = "snippet,contentDetails,statistics"
+
+@perf.timed("yt.video_rows")
+@memoize(RESULT_CACHE, "yt_video_rows", cache_if=bool)
+@singleflight.shared("yt_video_rows")
+def yt_video_rows(id_or_handle_or_name: str, start, end, max_videos: int = 1200) -> list[dict]:
+    """
+    One row per channel video published in [start, end] (dates or ISO datetimes, end inclusive):
+      {id, channel_id, published_at, duration_s, title_hash, flags, views, likes, comments}
+    Enumerated once (search.list + videos.list) and cached, so sub-windows and type breakdowns
+    are computed locally (see windows.VideoIndex, videos.VideoTable).
+    """
+    import videos
+    if not _yt_key():
+        return []
+    cid = resolve_channel_id(id_or_handle_or_name)
+    if not cid:
+        return []
+    try:
+        vid_ids = _yt_search_video_ids(cid, _rfc3339(start), _rfc3339(end, end=True), max_videos=max_videos)
+        items = _yt_fetch_video_stats(vid_ids, part=VIDEO_PARTS) if vid_ids else []
+    except Exception:
+        return []
+    rows = [videos.row_from_item(it, cid) for it in items]
+    store.write("videos", rows)
+    return rows
+
+# ---------- Streaming enumeration (memory independent of channel size) ----------
+# yt_annual_stats streams channels whose max_videos exceeds this instead of materializing them.
+STREAM_MIN_VIDEOS = int(os.getenv("YT_STREAM_MIN_VIDEOS", "2000") or 2000)
+
+def store_sink(rows: list[dict]):
+    """yt_stream_totals sink: append each batch to the history store."""
+    store.write("videos", rows)
+
+def yt_stream_rows(channel_id: str, start, end, max_videos: int | None = None):
+    """
+    Row batches (videos.row_from_item, ≤50 per batch) for a channel's videos published in [start, end].
+    Lazy end to end: a search.list page's IDs become videos.list calls and rows before the next
+    page is requested, so nothing accumulates between batches.
+    """
+    import videos
+    pages = _yt_search_id_pages(channel_id, _rfc3339(start), _rfc3339(end, end=True), max_videos)
+    for items in _yt_video_item_batches(pages, VIDEO_PARTS):
+        yield [videos.row_from_item(it, channel_id) for it in items]
+
+@perf.timed("yt.stream_totals")
+def yt_stream_totals(id_or_handle_or_name: str, start, end, max_videos: int | None = None,
+                     include_comments: bool = True, sinks=(), estimate_likes: bool = True,
+                     sample_n: int = 0) -> dict:
+    """
+    {views, likes, comments, video_count} for a channel's videos in [start, end], summed batch by
+    batch as they stream in (max_videos=None: every video). Each row batch is also passed to every
+    sink (callable(rows), e.g. store_sink). Hidden likes are estimated on the fly (likes.StreamingFill);
+    the first `sample_n` video IDs are kept in `_sample_ids`.
+    """
+    import videos
+    total = {"views": 0, "likes": 0, "comments": 0, "video_count": 0, "_sample_ids": []}
+    cid = resolve_channel_id(id_or_handle_or_name) if _yt_key() else None
+    if not cid:
+        return total
+    fill = None
+    if estimate_likes:
+        import likes
+        fill = likes.StreamingFill()
+
+    def pages():
+        for page in _yt_search_id_pages(cid, _rfc3339(start), _rfc3339(end, end=True), max_videos):
+            total["video_count"] += len(page)
+            total["_sample_ids"] += page[:max(0, sample_n - len(total["_sample_ids"]))]
+            yield page
+
+    for items in _yt_video_item_batches(pages(), VIDEO_PARTS):
+        rows = [videos.row_from_item(it, cid) for it in items]
+        for r in rows:
+            total["views"] += r["views"]
+            total["likes"] += r["likes"]
+            total["comments"] += r["comments"] if include_comments else 0
+        if fill is not None:
+            fill.add(rows)
+        for sink in sinks:
+            sink(rows)
+    if fill is not None and fill.hidden:
+        est = fill.finish()
+        total["likes"] += est["likes"]
+        total.update(likes_estimated=est["likes"], likes_estimate_se=est["se"], likes_hidden_videos=est["hidden"])
+    return total
 
+@perf.timed("yt.annual_stats")
+@memoize(RESULT_CACHE, "yt_annual_stats", cache_if=lambda r: r.get("video_count", 0) > 0)
+@singleflight.shared("yt_annual_stats")
 def yt_annual_stats(id_or_handle_or_name: str, year: int, include_comments: bool = True,
                     max_videos: int = 400, verify_with_html: bool = False, sample_n: int = 3) -> dict:
     """
@@ -545,23 +912,40 @@ def yt_annual_stats(id_or_handle_or_name: str, year: int, include_comments: bool
     - Optional: verify_with_html -> scrape a few sample watch pages and return raw label strings
       ('1.3M views', '862K likes', etc.) using your parse helpers.
     """
-    if not YT_KEY:
+    if not _yt_key():
         return {"views": 0, "likes": 0, "comments": 0, "video_count": 0, "_sample_raw": []}
 
     cid = resolve_channel_id(id_or_handle_or_name)
     if not cid:
         return {"views": 0, "likes": 0, "comments": 0, "video_count": 0, "_sample_raw": []}
 
+    if max_videos > STREAM_MIN_VIDEOS:
+        # very large channels: summed as a stream (no per-video table cached for re-slicing)
+        result = yt_stream_totals(cid, f"{int(year)}-01-01", f"{int(year)}-12-31", max_videos=max_videos,
+                                  include_comments=include_comments, sinks=[store_sink],
+                                  estimate_likes=os.getenv("LIKE_ESTIMATE", "1") != "0",
+                                  sample_n=sample_n if verify_with_html else 0)
+        ids = result.pop("_sample_ids")
+        if verify_with_html:
+            with perf.span("yt.verify_samples", n=sample_n):
+                result["_sample_raw"] = watch_page_labels(ids)
+        return result
+
     # 1) enumerate video IDs within the year
     vid_ids = _yt_search_video_ids_for_year(cid, int(year), max_videos=max_videos)
     if not vid_ids:
         return {"views": 0, "likes": 0, "comments": 0, "video_count": 0, "_sample_raw": []}
 
-    # 2) batch-fetch statistics and sum
+    # 2) batch-fetch statistics (+ snippet/contentDetails at no extra quota) and sum
     total_views = 0
     total_likes = 0
     total_comments = 0
-    stats_items = _yt_fetch_video_stats(vid_ids)
+    stats_items = _yt_fetch_video_stats(vid_ids, part=VIDEO_PARTS)
+    import videos
+    rows = [videos.row_from_item(it, cid) for it in stats_items]
+    RESULT_CACHE.set(yt_video_rows.cache_key(id_or_handle_or_name, f"{int(year)}-01-01", f"{int(year)}-12-31",
+                                             max_videos=max_videos), rows)   # per-video table for re-slicing
+    store.write("videos", rows)
     for it in stats_items:
         st = it.get("statistics", {}) or {}
         # API provides precise strings (no K/M); convert safely
@@ -577,29 +961,57 @@ def yt_annual_stats(id_or_handle_or_name: str, year: int, include_comments: bool
         "video_count": len(vid_ids),
     }
 
+    # hidden/zero like counts: filled by the local like model instead of a watch-page scrape each
+    hidden = [it.get("id") for it in stats_items if not _safe_int((it.get("statistics") or {}).get("likeCount"))]
+    if hidden and os.getenv("LIKE_ESTIMATE", "1") != "0":
+        import likes
+        with perf.span("yt.like_estimate", videos=len(hidden)):
+            est = likes.fill_hidden(rows, hidden)
+        result["likes"] += est["likes"]
+        result["likes_estimated"] = est["likes"]
+        result["likes_estimate_se"] = est["se"]
+        result["likes_hidden_videos"] = est["hidden"]
+
     # 3) optional HTML verification sample (raw display labels)
     if verify_with_html:
-        samples = []
-        for vid in vid_ids[:max(0, sample_n)]:
-            try:
-                watch_url = f"https://www.youtube.com/watch?v={vid}"
-                html = requests.get(watch_url, headers={"User-Agent":"Mozilla/5.0"}, timeout=20).text
-                raw_views = extract_first_count_text(html, "views")
-                raw_likes = extract_first_count_text(html, "likes")
-                raw_comms = extract_first_count_text(html, "comments")
-                samples.append({
-                    "videoId": vid,
-                    "views_raw": raw_views,   "views_parsed": parse_abbrev_count(raw_views or ""),
-                    "likes_raw": raw_likes,   "likes_parsed": parse_abbrev_count(raw_likes or ""),
-                    "comments_raw": raw_comms,"comments_parsed": parse_abbrev_count(raw_comms or ""),
-                })
-            except Exception:
-                pass
-        result["_sample_raw"] = samples
+        with perf.span("yt.verify_samples", n=sample_n):
+            result["_sample_raw"] = watch_page_labels(vid_ids[:max(0, sample_n)])
 
     return result
 
 
+def watch_page_labels(video_ids, max_workers: int = 4, pool=None) -> list[dict]:
+    """
+    Raw view/like/comment labels from watch pages ('1.3M views', …) plus their parsed values.
+    Pages are fetched on threads; the regex scans run in parse_pool worker processes when a
+    pool is given or PARSE_WORKERS is set. Videos whose page failed are left out.
+    """
+    import parse_pool
+    from concurrent.futures import ThreadPoolExecutor
+    video_ids = list(video_ids)
+
+    def fetch(vid):
+        try:
+            r = sources.YOUTUBE.watch_page(vid)
+            return vid, r.content
+        except Exception:
+            return vid, None
+
+    if not video_ids:
+        return []
+    with ThreadPoolExecutor(max(1, min(max_workers, len(video_ids)))) as ex:
+        pages = [(v, b) for v, b in ex.map(perf.bind(fetch), video_ids) if b is not None]
+    labels = parse_pool.parse_many("watch_counts", [b for _, b in pages], pool=pool)
+    out = []
+    for (vid, _), lab in zip(pages, labels):
+        row = {"videoId": vid}
+        for m in ("views", "likes", "comments"):
+            row[f"{m}_raw"] = lab[f"{m}_raw"]
+            row[f"{m}_parsed"] = parse_abbrev_count(lab[f"{m}_raw"] or "")
+        out.append(row)
+    return out
+
+
 # # ---------------- FULL MODE (year-specific sums) ----------------
 # def yt_annual_stats(id_or_handle_or_name: str, year: int = 2023, include_comments: bool = True, page_cap: int = 500) -> dict:
 #     """
@@ -704,13 +1116,22 @@ _TD_2023 = None
 
 def _load_td_cache() -> dict:
     global _TD_2023
+    perf.cache_event("tickets", _TD_2023 is not None)
     if _TD_2023 is None:
         try:
+            from ticket_scraper import load_cached_ticket_totals   # pulls in bs4/lxml only when needed
             _TD_2023 = load_cached_ticket_totals()  # {ArtistPrettyName: tickets_int}
         except Exception:
             _TD_2023 = {}
+        s = store.default()
+        try:
+            if _TD_2023 and s is not None and not s.has_tickets(2023, "touringdata"):
+                s.write_tickets(_TD_2023, 2023, "touringdata")   # JSON cache predates the store
+        except Exception:
+            pass
     return _TD_2023 or {}
 
+@perf.timed("tickets.lookup")
 def get_2023_tickets_sold_for_artist(artist: str) -> int:
     """
     Exact match first, then fuzzy contains (case-insensitive).
@@ -729,15 +1150,18 @@ def get_2023_tickets_sold_for_artist(artist: str) -> int:
 
 # ---------------- CLI sanity ----------------
 if __name__ == "__main__":
-    import argparse, json
+    import argparse
     ap = argparse.ArgumentParser()
     ap.add_argument("-a", "--artist", default="Beyoncé")
     ap.add_argument("-c", "--channel", default="@beyonce")
     ap.add_argument("-y", "--year", type=int, default=2023)
     ap.add_argument("--full", action="store_true")
+    ap.add_argument("-o", "--out", default=None,
+                    help="append a compact result row (.arrow / .parquet / .jsonl.gz)")
     args = ap.parse_args()
 
     tix = get_2023_tickets_sold_for_artist(args.artist)
+    yt, y = None, None
     if args.full:
         yt = yt_annual_stats(args.channel, args.year, include_comments=True)
         conv = compute_full_conversions_percent(yt, tix)
@@ -749,3 +1173,8 @@ if __name__ == "__main__":
         print("YT lifetime:", json.dumps(y, indent=2))
         print("Light conversions:", json.dumps(conv, indent=2))
     print("Tickets 2023:", tix)
+
+    if args.out:
+        from results import from_pipeline, write_results
+        rec = from_pipeline(args.artist, args.year, args.channel, tix, yt_year=yt, yt_life=y)
+        print("Saved result →", write_results([rec], args.out, append=True))
@@ -0,0 +1,101 @@
+# http_client.py — single choke point for upstream HTTP (keep-alive sessions + perf counters)
+# `requests` is imported on the first call, not at import time.
+# PIPELINE_REPLAY / PIPELINE_RECORD route every session through replay.py's adapters.
+import os, threading, time
+from urllib.parse import urlsplit
+
+import perf
+
+# Quota cost per call (units) of metered endpoints and the quota they count against; filled in
+# by the source adapters (sources.register). Everything else is free / unmetered.
+QUOTA_UNITS = {}
+QUOTA_API = {}
+
+def set_cost(endpoint: str, units: int, api: str):
+    """Count `units` of `api` quota for every call to `endpoint` (see endpoint_of)."""
+    QUOTA_UNITS[endpoint] = units
+    QUOTA_API[endpoint] = api
+
+_local = threading.local()
+
+# ---------- per-host rate limits ----------
+class HostLimiter:
+    """Spaces requests to one host at least 1/rps apart (shared by all threads)."""
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps if rps and rps > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+            self.waited += slot - now
+        if slot > now:
+            time.sleep(slot - now)
+
+# host → limiter; sources declare theirs (e.g. scraped pages are throttled politely).
+_LIMITS = {}
+
+def set_rate_limit(host: str, rps: float | None):
+    """Throttle `host` to rps requests/second (None or 0 removes the limit)."""
+    if rps:
+        _LIMITS[host] = HostLimiter(rps)
+    else:
+        _LIMITS.pop(host, None)
+
+def limiter(host: str) -> HostLimiter | None:
+    return _LIMITS.get(host)
+
+def session() -> "requests.Session":
+    """One keep-alive Session per thread (requests.Session is not guaranteed thread-safe)."""
+    s = getattr(_local, "session", None)
+    if s is None:
+        import requests
+        s = _local.session = requests.Session()
+        if os.getenv("PIPELINE_REPLAY") or os.getenv("PIPELINE_RECORD"):
+            import replay                       # offline replay / recording (see replay.py)
+            ad = replay.active()
+            s.mount("https://", ad)
+            s.mount("http://", ad)
+    return s
+
+def endpoint_of(url: str) -> str:
+    """Short endpoint label: 'www.googleapis.com/youtube/v3/search', 'open.spotify.com/artist/{id}'."""
+    parts = urlsplit(url)
+    path = parts.path
+    # collapse per-entity paths (/v1/artists/{id}, /artist/{id})
+    for prefix in ("/v1/artists/", "/artist/"):
+        if path.startswith(prefix):
+            path = prefix + "{id}"
+    return parts.netloc + path
+
+def request(method: str, url: str, **kw) -> "requests.Response":
+    ep = endpoint_of(url)
+    lim = _LIMITS.get(urlsplit(url).netloc)
+    if lim is not None:
+        lim.wait()
+    t0 = time.perf_counter()
+    try:
+        r = session().request(method, url, **kw)
+    except Exception:
+        perf.record_http(ep, 0, time.perf_counter() - t0, error=True)
+        raise
+    # streamed bodies are counted by the caller (it decides how much to read)
+    nbytes = 0 if kw.get("stream") else len(r.content)
+    perf.record_http(ep, nbytes, time.perf_counter() - t0, error=r.status_code >= 400)
+    units = QUOTA_UNITS.get(ep)
+    if units:
+        perf.add_quota(QUOTA_API[ep], units)
+    return r
+
+def get(url: str, **kw) -> "requests.Response":
+    return request("GET", url, **kw)
+
+def post(url: str, **kw) -> "requests.Response":
+    return request("POST", url, **kw)
@@ -0,0 +1,213 @@
+# likes.py — estimate hidden YouTube like counts from the per-video stats we already have
+#
+#   m = likes.fit(rows)                       # rows with visible likes (videos.row_from_item shape)
+#   mean, var = m.predict(hidden_rows)        # per-video estimates + variances
+#   likes.fill_hidden(rows, hidden_ids)       # {"likes", "se", "hidden", "scraped", "calibration", "model"}
+#   sf = likes.StreamingFill(); sf.add(batch) …; sf.finish()   # same dict, rows streamed in batches
+#
+# Model: log1p(likes) ~ 1 + log1p(views) + log1p(comments) + log1p(age days) [+ per-channel offset],
+# fitted by ridge-regularized least squares. Residuals are treated as lognormal, so each estimate is
+# exp(μ + σ²/2) − 1 with variance (e^{σ²} − 1)·e^{2μ+σ²}; the total's SE assumes independent videos.
+# Optionally a few hidden videos are scraped (LIKE_CALIBRATION_N) to measure and correct the bias.
+import math, os, random, time
+
+import numpy as np
+
+MIN_TRAIN = 8              # fewer visible rows than this: no estimate
+MIN_PER_CHANNEL = 10       # channels with fewer training rows share the global intercept
+RIDGE = 1e-3
+STORE_TRAIN_ROWS = 20000   # extra training rows taken from the history store
+
+def _age_days(r: dict, now: float) -> float:
+    return max(0.0, (now - (r.get("published_at") or now)) / 86400)
+
+class LikeModel:
+    """Fitted coefficients + residual spread; `bias` is the calibration shift in log space."""
+
+    def __init__(self, coef, channels: list, sigma: float, n_train: int):
+        self.coef = np.asarray(coef, dtype=float)
+        self.channels = list(channels)
+        self.sigma = float(sigma)
+        self.n_train = int(n_train)
+        self.bias = 0.0
+
+    def _X(self, rows, now):
+        ch = {c: i for i, c in enumerate(self.channels)}
+        X = np.zeros((len(rows), 4 + len(self.channels)))
+        for i, r in enumerate(rows):
+            X[i, :4] = (1.0, math.log1p(r.get("views", 0) or 0), math.log1p(r.get("comments", 0) or 0),
+                        math.log1p(_age_days(r, r.get("_now", now))))
+            j = ch.get(r.get("channel_id"))
+            if j is not None:
+                X[i, 4 + j] = 1.0
+        return X
+
+    def mu(self, rows, now: float | None = None) -> np.ndarray:
+        """Predicted log1p(likes)."""
+        return self._X(rows, time.time() if now is None else now) @ self.coef + self.bias
+
+    def predict(self, rows, now: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Per-video (expected likes, variance) under the lognormal residual model."""
+        mu, s2 = self.mu(rows, now), self.sigma ** 2
+        mean = np.exp(mu + s2 / 2) - 1
+        var = (np.exp(s2) - 1) * np.exp(2 * mu + s2)
+        return np.maximum(mean, 0.0), var
+
+    def summary(self) -> dict:
+        names = ["intercept", "log_views", "log_comments", "log_age_days"]
+        return {"n_train": self.n_train, "sigma": round(self.sigma, 4), "bias": round(self.bias, 4),
+                **{n: round(float(c), 4) for n, c in zip(names, self.coef)}, "channels": len(self.channels)}
+
+def fit(rows, now: float | None = None) -> LikeModel | None:
+    """Fit on rows whose likes are visible (likes > 0); None when there are too few."""
+    now = time.time() if now is None else now
+    train = [r for r in rows if (r.get("likes") or 0) > 0 and (r.get("views") or 0) > 0]
+    if len(train) < MIN_TRAIN:
+        return None
+    counts = {}
+    for r in train:
+        counts[r.get("channel_id")] = counts.get(r.get("channel_id"), 0) + 1
+    # per-channel offsets only when more than one channel qualifies (otherwise the intercept is it)
+    chans = sorted(c for c, n in counts.items() if c and n >= MIN_PER_CHANNEL)
+    chans = chans if len(chans) > 1 else []
+    m = LikeModel(np.zeros(4 + len(chans)), chans, 0.0, len(train))
+    X = m._X(train, now)
+    y = np.log1p(np.array([r["likes"] for r in train], dtype=float))
+    A = X.T @ X + RIDGE * np.eye(X.shape[1])
+    m.coef = np.linalg.solve(A, X.T @ y)
+    resid = y - X @ m.coef
+    m.sigma = float(np.sqrt(resid @ resid / max(1, len(train) - X.shape[1])))
+    return m
+
+def _store_rows(limit: int = STORE_TRAIN_ROWS) -> list[dict]:
+    """Visible-like snapshots from the history store (age measured at their fetch time)."""
+    try:
+        import store
+        s = store.default()
+        if s is None:
+            return []
+        return [{**r, "_now": r.pop("fetched_at")} for r in s.video_training_rows(limit)]
+    except Exception:
+        return []
+
+def _calibration_sample(ids: list[str], views: dict, n: int) -> list[str]:
+    """n hidden videos spread evenly over the views ranking (not just the biggest ones)."""
+    if n <= 0 or not ids:
+        return []
+    ranked = sorted(ids, key=lambda v: views.get(v, 0))
+    if n >= len(ranked):
+        return ranked
+    if n == 1:
+        return [ranked[len(ranked) // 2]]
+    step = (len(ranked) - 1) / (n - 1)
+    return [ranked[round(i * step)] for i in range(n)]
+
+def fill_hidden(rows, hidden_ids, calibrate_n: int | None = None, use_store: bool = True) -> dict:
+    """
+    Estimate likes for `hidden_ids` (likeCount hidden/zero) from the visible rows (+ stored history).
+    `calibrate_n` hidden videos (default LIKE_CALIBRATION_N, 0) are scraped instead: their real counts
+    are used as-is and the log-space bias they reveal is applied to the rest.
+    "by_id" holds the per-video estimates (e.g. to re-aggregate them by week).
+    """
+    now = time.time()
+    hidden = set(hidden_ids)
+    by_id = {r["id"]: r for r in rows}
+    targets = [by_id[v] for v in hidden_ids if v in by_id]
+    out = {"likes": 0, "se": 0, "hidden": len(targets), "scraped": 0, "calibration": None, "model": None, "by_id": {}}
+    if not targets:
+        return out
+    train = [r for r in rows if r["id"] not in hidden]
+    if use_store:
+        train += [r for r in _store_rows() if r["id"] not in by_id]
+    model = fit(train, now)
+    if model is None:
+        return out
+
+    if calibrate_n is None:
+        calibrate_n = int(os.getenv("LIKE_CALIBRATION_N", "0") or 0)
+    sample = _calibration_sample([r["id"] for r in targets], {r["id"]: r.get("views", 0) for r in targets}, calibrate_n)
+    scraped = {}
+    if sample:
+        import data_pipeline as dp
+        scraped = {s["videoId"]: s["likes_parsed"] for s in dp.watch_page_labels(sample) if s.get("likes_parsed")}
+    if scraped:
+        cal_rows = [by_id[v] for v in scraped]
+        pred, _ = model.predict(cal_rows, now)
+        actual = np.array([scraped[r["id"]] for r in cal_rows], dtype=float)
+        model.bias = float(np.mean(np.log1p(actual) - model.mu(cal_rows, now)))
+        out["calibration"] = {"n": len(scraped), "bias_log": round(model.bias, 4),
+                              "mape_before_pct": round(float(np.mean(np.abs(pred - actual) / actual)) * 100, 1)}
+
+    rest = [r for r in targets if r["id"] not in scraped]
+    mean, var = model.predict(rest, now) if rest else (np.zeros(0), np.zeros(0))
+    out.update(likes=int(round(float(mean.sum()) + sum(scraped.values()))), se=int(round(math.sqrt(float(var.sum())))),
+               scraped=len(scraped), model=model.summary(),
+               by_id={**{r["id"]: float(x) for r, x in zip(rest, mean)}, **scraped})
+    return out
+
+# ---------- Streaming variant (bounded memory) ----------
+class StreamingFill:
+    """
+    fill_hidden over a stream of row batches without keeping the stream: visible rows feed a
+    fixed-size reservoir (the training sample); hidden rows wait only until the model is fitted
+    (after `fit_after` visible rows, or when `max_pending` of them piled up), then each batch
+    is predicted and reduced to running sums. No calibration scrape.
+    """
+
+    def __init__(self, fit_after: int = 2000, max_pending: int = 5000, use_store: bool = True, seed: int = 0):
+        self.fit_after, self.max_pending, self.use_store = fit_after, max_pending, use_store
+        self._rng = random.Random(seed)
+        self._train, self._seen = [], 0
+        self._pending = []
+        self.model, self._store = None, None
+        self._mean = self._var = 0.0
+        self.hidden = self.unestimated = 0
+
+    def add(self, rows):
+        for r in rows:
+            if (r.get("likes") or 0) > 0:
+                self._seen += 1
+                if len(self._train) < self.fit_after:
+                    self._train.append(r)
+                else:                               # reservoir sampling (Algorithm R)
+                    j = self._rng.randrange(self._seen)
+                    if j < self.fit_after:
+                        self._train[j] = r
+            else:
+                self.hidden += 1
+                self._pending.append(r)
+        if self.model is None and (self._seen >= self.fit_after or len(self._pending) >= self.max_pending):
+            self._fit()
+        if self.model is not None:
+            self._flush()
+        elif len(self._pending) > self.max_pending:    # still too few visible rows to fit: give up on the oldest
+            drop = len(self._pending) - self.max_pending
+            self.unestimated += drop
+            del self._pending[:drop]
+
+    def _fit(self):
+        if self._store is None:
+            self._store = _store_rows() if self.use_store else []
+        ids = {r["id"] for r in self._train}
+        self.model = fit(self._train + [r for r in self._store if r["id"] not in ids])
+        if self.model is not None:
+            self._store = []
+
+    def _flush(self):
+        if self._pending:
+            mean, var = self.model.predict(self._pending)
+            self._mean += float(mean.sum())
+            self._var += float(var.sum())
+            self._pending = []
+
+    def finish(self) -> dict:
+        out = {"likes": 0, "se": 0, "hidden": self.hidden, "scraped": 0, "calibration": None, "model": None}
+        if self.model is None and self._pending:
+            self._fit()
+        if self.model is None:
+            return out
+        self._flush()
+        out.update(likes=int(round(self._mean)), se=int(round(math.sqrt(self._var))), model=self.model.summary())
+        if self.unestimated:
+            out["unestimated"] = self.unestimated
+        return out
@@ -0,0 +1,120 @@
+# parse_pool.py — optional process pool for CPU-bound page parsing (BeautifulSoup, large regex scans)
+#
+#   with parse_pool.ParsePool(workers=4) as pp:
+#       labels = pp.map("watch_counts", pages)       # pages: raw bytes; results are small dicts
+#   parse_pool.parse("tickets_post", html)           # same parser, inline
+#   parse_pool.parse_many("watch_counts", pages)     # shared pool when PARSE_WORKERS > 0, else inline
+#
+# Fetchers hand over raw response bytes. A batch is copied once into a single shared-memory
+# block and each task is just (block name, offset, length, kind), so page bodies are never
+# pickled; workers send back only the compact parsed result.
+import os, threading
+
+# ---------- Parsers (run in the workers; imports happen there) ----------
+def _tickets_post(text: str) -> dict:
+    import ticket_scraper
+    return ticket_scraper.parse_post(text)
+
+def _watch_counts(text: str) -> dict:
+    import data_pipeline as dp
+    return {
+        "views_raw": dp.extract_first_count_text(text, "views"),
+        "likes_raw": dp._extract_like_label(text) or dp.extract_first_count_text(text, "likes"),
+        "comments_raw": dp.extract_first_count_text(text, "comments"),
+    }
+
+def _spotify_ml(text: str) -> tuple:
+    import data_pipeline as dp
+    raw, value, _ = dp._scan_monthly_listeners([text.encode("utf-8")])
+    return raw, value
+
+PARSERS = {
+    "tickets_post": _tickets_post,      # WP post HTML → {artist: tickets}
+    "watch_counts": _watch_counts,      # watch page → {views_raw, likes_raw, comments_raw}
+    "spotify_ml": _spotify_ml,          # artist page → (raw, monthly listeners)
+}
+
+def _as_bytes(doc) -> bytes:
+    if doc is None:
+        return b""
+    return doc.encode("utf-8") if isinstance(doc, str) else bytes(doc)
+
+def parse(kind: str, doc):
+    """Run one parser in this process."""
+    return PARSERS[kind](_as_bytes(doc).decode("utf-8", errors="ignore"))
+
+def _work(task):
+    from multiprocessing import shared_memory
+    name, off, n, kind = task
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(shm.buf[off:off + n])
+    finally:
+        shm.close()
+    return PARSERS[kind](data.decode("utf-8", errors="ignore"))
+
+# ---------- Pool ----------
+class ParsePool:
+    """A process pool that receives page bytes through shared memory (forkserver/spawn workers)."""
+
+    def __init__(self, workers: int | None = None):
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        self._ex = ProcessPoolExecutor(self.workers, mp_context=mp.get_context(method))
+
+    def map(self, kind: str, docs) -> list:
+        """Parse every doc (bytes or str) with PARSERS[kind]; results in input order."""
+        from multiprocessing import shared_memory
+        if kind not in PARSERS:
+            raise KeyError(kind)
+        blobs = [_as_bytes(d) for d in docs]
+        if not blobs:
+            return []
+        shm = shared_memory.SharedMemory(create=True, size=max(1, sum(len(b) for b in blobs)))
+        try:
+            tasks, off = [], 0
+            for b in blobs:
+                shm.buf[off:off + len(b)] = b
+                tasks.append((shm.name, off, len(b), kind))
+                off += len(b)
+            return list(self._ex.map(_work, tasks, chunksize=max(1, len(tasks) // (4 * self.workers))))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        self._ex.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------- process-wide pool ----------
+_SHARED = None
+_LOCK = threading.Lock()
+
+def shared() -> ParsePool | None:
+    """The shared pool (PARSE_WORKERS workers), or None when PARSE_WORKERS is unset/0."""
+    global _SHARED
+    try:
+        n = int(os.getenv("PARSE_WORKERS", "0") or 0)
+    except ValueError:
+        n = 0
+    if n <= 0:
+        return None
+    with _LOCK:
+        if _SHARED is None:
+            _SHARED = ParsePool(n)
+        return _SHARED
+
+def parse_many(kind: str, docs, pool: ParsePool | None = None, min_docs: int = 2) -> list:
+    """Pool when one is given or configured and the batch is worth it; inline otherwise."""
+    docs = list(docs)
+    pool = pool or shared()
+    if pool is None or len(docs) < min_docs:
+        return [parse(kind, d) for d in docs]
+    return pool.map(kind, docs)
@@ -0,0 +1,187 @@
+# perf.py — lightweight run instrumentation: stage spans, HTTP counters, quota units, cache hits
+#
+#   with perf.collect() as trace:
+#       dp.yt_annual_stats_multi(...)
+#   trace.summary()      # per-stage totals, HTTP per endpoint, quota, cache hit rates
+#   trace.to_json()      # structured trace
+#   trace.to_otlp()      # OpenTelemetry (OTLP/JSON) resourceSpans
+#
+# Outside collect() every hook is a no-op, so instrumented code costs ~nothing.
+import contextlib, contextvars, functools, itertools, json, os, threading, time
+from collections import defaultdict
+
+_trace = contextvars.ContextVar("perf_trace", default=None)
+_parent = contextvars.ContextVar("perf_parent_span", default=None)
+_ids = itertools.count(1)
+
+class Trace:
+    def __init__(self, name: str = "run"):
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.t0 = time.time()
+        self._p0 = time.perf_counter()
+        self.spans = []                                    # finished spans
+        self.http = defaultdict(lambda: {"calls": 0, "bytes": 0, "errors": 0, "seconds": 0.0})
+        self.quota = defaultdict(int)                      # api → units
+        self.cache = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    # ---------- recording ----------
+    def _add_span(self, sp: dict):
+        with self._lock:
+            self.spans.append(sp)
+
+    def add_http(self, endpoint: str, nbytes: int, seconds: float, error: bool = False, calls: int = 1):
+        with self._lock:
+            h = self.http[endpoint]
+            h["calls"] += calls
+            h["bytes"] += int(nbytes or 0)
+            h["seconds"] += seconds
+            h["errors"] += int(error)
+
+    def add_quota(self, api: str, units: int):
+        with self._lock:
+            self.quota[api] += units
+
+    def add_cache(self, name: str, hit: bool):
+        with self._lock:
+            self.cache[name]["hits" if hit else "misses"] += 1
+
+    # ---------- views ----------
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._p0
+
+    def stages(self) -> list[dict]:
+        """Per span name: count, total and max seconds (sorted by total)."""
+        agg = {}
+        for sp in self.spans:
+            a = agg.setdefault(sp["name"], {"stage": sp["name"], "count": 0, "total_s": 0.0, "max_s": 0.0})
+            a["count"] += 1
+            a["total_s"] += sp["dur"]
+            a["max_s"] = max(a["max_s"], sp["dur"])
+        return sorted(agg.values(), key=lambda a: a["total_s"], reverse=True)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "elapsed_s": round(self.elapsed, 4),
+                "stages": [{**a, "total_s": round(a["total_s"], 4), "max_s": round(a["max_s"], 4)}
+                           for a in self.stages()],
+                "http": {k: {**v, "seconds": round(v["seconds"], 4)} for k, v in self.http.items()},
+                "quota": dict(self.quota),
+                "cache": {k: dict(v) for k, v in self.cache.items()},
+            }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        d = self.summary()
+        d["trace_id"] = self.trace_id
+        d["spans"] = list(self.spans)
+        return json.dumps(d, indent=indent, default=str)
+
+    def to_otlp(self, service: str = "smoosh-pipeline") -> dict:
+        """OTLP/JSON export (importable by any OpenTelemetry collector / Jaeger / Tempo)."""
+        def attr(k, v):
+            if isinstance(v, bool):
+                return {"key": k, "value": {"boolValue": v}}
+            if isinstance(v, int):
+                return {"key": k, "value": {"intValue": str(v)}}
+            if isinstance(v, float):
+                return {"key": k, "value": {"doubleValue": v}}
+            return {"key": k, "value": {"stringValue": str(v)}}
+
+        spans = []
+        for sp in self.spans:
+            start = int((self.t0 + sp["start"]) * 1e9)
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": f"{sp['id']:016x}",
+                "parentSpanId": f"{sp['parent']:016x}" if sp["parent"] else "",
+                "name": sp["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(start + int(sp["dur"] * 1e9)),
+                "attributes": [attr(k, v) for k, v in sp["attrs"].items()],
+                "status": {"code": 2 if sp.get("error") else 1},
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attr("service.name", service)]},
+            "scopeSpans": [{"scope": {"name": "perf"}, "spans": spans}],
+        }]}
+
+# ---------- public hooks ----------
+def current() -> Trace | None:
+    return _trace.get()
+
+@contextlib.contextmanager
+def collect(name: str = "run"):
+    """Start a trace for everything executed in this context (nested collect() reuses the outer one)."""
+    outer = _trace.get()
+    if outer is not None:
+        yield outer
+        return
+    tr = Trace(name)
+    tok = _trace.set(tr)
+    try:
+        yield tr
+    finally:
+        _trace.reset(tok)
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    tr = _trace.get()
+    if tr is None:
+        yield attrs
+        return
+    sid = next(_ids)
+    sp = {"id": sid, "parent": _parent.get(), "name": name, "attrs": attrs}
+    tok = _parent.set(sid)
+    p0 = time.perf_counter()
+    try:
+        yield attrs          # callers may add attributes while the span is open
+    except BaseException:
+        sp["error"] = True
+        raise
+    finally:
+        _parent.reset(tok)
+        sp["start"] = p0 - tr._p0
+        sp["dur"] = time.perf_counter() - p0
+        tr._add_span(sp)
+
+def timed(name: str | None = None):
+    """Decorator form of span(); the span name defaults to the function name."""
+    def deco(fn):
+        label = name or fn.__name__
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if _trace.get() is None:
+                return fn(*a, **kw)
+            with span(label):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+def record_http(endpoint: str, nbytes: int, seconds: float, error: bool = False, calls: int = 1):
+    """calls=0 adds bytes/seconds to an already-counted call (e.g. a streamed body read later)."""
+    tr = _trace.get()
+    if tr is not None:
+        tr.add_http(endpoint, nbytes, seconds, error, calls)
+
+def add_quota(api: str, units: int):
+    tr = _trace.get()
+    if tr is not None and units:
+        tr.add_quota(api, units)
+
+def cache_event(name: str, hit: bool):
+    tr = _trace.get()
+    if tr is not None:
+        tr.add_cache(name, hit)
+
+def bind(fn):
+    """
+    Wrap fn so each call runs in a copy of the *caller's* context — use when handing work
+    to a thread pool so spans/HTTP counters still land in the active trace.
+    """
+    ctx = contextvars.copy_context()
+    return lambda *a, **kw: ctx.copy().run(fn, *a, **kw)
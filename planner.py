@@ -0,0 +1,281 @@
+# planner.py — latency-budgeted YouTube annual totals for interactive queries
+#
+#   ans = planner.annual_totals("@beyonce, @BeyonceVEVO", 2023, budget_s=3.0, max_videos=400)
+#   ans["strategy"]     # "cached" | "full" | "sampled"
+#   ans["totals"]       # {views, likes, comments, video_count} — same shape/units as yt_annual_stats_multi
+#   ans["ci"]           # 95% half-width per metric (0 when exact)
+#   ans["accuracy"]     # "exact" or e.g. "±6.2% (12/52 weeks)"
+#   ans["refining"]     # True: the exact fetch is running in the background
+#   planner.refined("@beyonce, @BeyonceVEVO", 2023, max_videos=400)   # exact dict once it landed, else None
+#
+# "sampled" draws random calendar weeks (clusters), enumerates and fetches only those weeks'
+# videos concurrently, and extrapolates with the cluster-sampling estimator
+#   T̂ = K/m · Σ y_k,   SE = K · sqrt((1 − m/K) · s²/m)
+# over K weeks with m sampled. The full fetch is then started in the background. Like the exact
+# fetch, each channel counts only its newest max_videos uploads (weeks before an estimated cutoff
+# drop out; approximate, flagged in "accuracy"), and hidden like counts are filled by likes.fill_hidden.
+import math, os, random, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import data_pipeline as dp
+import perf
+import sources
+
+METRICS = ("views", "likes", "comments")
+_STAT_FIELDS = {"views": "viewCount", "likes": "likeCount", "comments": "commentCount"}
+WEEKS = 52
+MIN_WEEKS = 4
+SEARCH_UNITS = sources.YOUTUBE.units("search")   # quota per search.list call (one per sampled week and channel)
+_MULTI_SCALE = 1000        # yt_annual_stats_multi reports views/likes/comments ×1000
+
+# per-call latency model (seconds), refined from the planner's own calls
+LATENCY_S = {"search": 0.35, "videos": 0.25}
+_LAT_LOCK = threading.Lock()
+
+def _observe(kind: str, seconds: float, alpha: float = 0.3):
+    with _LAT_LOCK:
+        LATENCY_S[kind] = (1 - alpha) * LATENCY_S[kind] + alpha * seconds
+
+# two-sided 95% Student t quantiles (df → t); ≥ 30 uses 1.96
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+        10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060}
+
+def _t95(df: int) -> float:
+    if df >= 30:
+        return 1.96
+    return _T95[max(k for k in _T95 if k <= max(1, df))]
+
+# ---------- Clusters ----------
+def weeks(year: int) -> list:
+    """The year as WEEKS consecutive windows; the last one runs to Dec 31."""
+    import windows
+    from datetime import date, timedelta
+    first = date(int(year), 1, 1)
+    out = []
+    for k in range(WEEKS):
+        end = first + timedelta(days=7 * k + 6) if k < WEEKS - 1 else date(int(year), 12, 31)
+        out.append(windows.between(first + timedelta(days=7 * k), end, f"{year} W{k + 1:02d}"))
+    return out
+
+def estimate(cluster_sums: list[dict], k_total: int) -> tuple[dict, dict]:
+    """Cluster-sampling totals and 95% half-widths from per-cluster metric sums."""
+    m = len(cluster_sums)
+    est, ci = {}, {}
+    for metric in METRICS + ("video_count",):
+        ys = [c[metric] for c in cluster_sums]
+        total = k_total / m * sum(ys) if m else 0.0
+        if 1 < m < k_total:
+            mean = sum(ys) / m
+            s2 = sum((y - mean) ** 2 for y in ys) / (m - 1)
+            half = _t95(m - 1) * k_total * math.sqrt((1 - m / k_total) * s2 / m)
+        else:
+            half = 0.0
+        est[metric], ci[metric] = int(round(total)), int(round(half))
+    return est, ci
+
+# ---------- Strategies ----------
+def _cached(channels, year: int, max_videos: int, verify_with_html: bool):
+    key = dp.yt_annual_stats_multi.cache_key(channels, int(year), True, int(max_videos), bool(verify_with_html))
+    return dp.RESULT_CACHE.get(key)
+
+def full_cost_s(channels, year: int, max_videos: int) -> float:
+    """Expected seconds for the exact fetch: sequential search pages + videos.list batches per channel."""
+    s = None
+    try:
+        import store
+        s = store.default()
+    except Exception:
+        pass
+    cost = 0.0
+    for ch in dp._split_channels(channels):
+        n = max_videos
+        if s is not None:
+            try:
+                cid = ch if ch.startswith("UC") else s.external_id("youtube", ch)
+                import windows
+                w = windows.calendar_year(int(year))
+                known = len(s.videos_latest([cid], w.start, w.end)) if cid else 0
+                n = min(max_videos, known) if known else max_videos
+            except Exception:
+                pass
+        pages = max(1, math.ceil(n / 50))
+        cost += pages * (LATENCY_S["search"] + LATENCY_S["videos"])
+    return cost
+
+def _sample(channels, year: int, deadline: float, max_videos: int = 400, max_units: int = 2000,
+            max_workers: int = 8, seed: int | None = None) -> dict:
+    """
+    Random weeks' videos (all channels), summed per week; weeks not answered by `deadline` are dropped.
+    Hidden like counts are filled by the like model, as on the exact path. The exact fetch keeps each
+    channel's newest `max_videos` uploads; when a channel's estimated year exceeds that, only weeks
+    after its cutoff (max_videos / estimated weekly uploads before year end; the boundary week
+    pro rata) count, so the extrapolation targets the same videos. The cutoff assumes a steady
+    upload rate, so such estimates are approximate ("capped" lists the channels).
+    Weeks drawn never cost more than `max_units` of search.list quota (none below 2 weeks).
+    """
+    cids = list(dict.fromkeys(c for c in (dp.resolve_channel_id(ch) for ch in dp._split_channels(channels)) if c))
+    clusters = weeks(year)
+    if not cids:
+        return {"clusters": [], "k": len(clusters), "ids": [], "quota_units": 0}
+    # weeks we can afford: one concurrent search wave per `max_workers` calls, then one videos.list wave
+    left = deadline - time.perf_counter() - LATENCY_S["videos"]
+    waves = max(1, int(left // max(LATENCY_S["search"], 1e-3)))
+    affordable = max_units // (SEARCH_UNITS * len(cids))
+    if affordable < 2:
+        return {"clusters": [], "k": len(clusters), "ids": [], "quota_units": 0}
+    m = min(affordable, max(MIN_WEEKS, min(len(clusters), waves * max_workers // len(cids))))
+    picked = sorted(random.Random(seed).sample(range(len(clusters)), m))
+
+    def search(task):
+        k, cid = task
+        w = clusters[k]
+        t = time.perf_counter()
+        ids = dp._yt_search_video_ids(cid, dp._rfc3339(w.start), dp._rfc3339(w.end), max_videos=max_videos)
+        _observe("search", time.perf_counter() - t)
+        return k, ids
+
+    def stats(chunk):
+        t = time.perf_counter()
+        items = dp._yt_fetch_video_stats(chunk, part=dp.VIDEO_PARTS)
+        _observe("videos", time.perf_counter() - t)
+        return items
+
+    with perf.span("planner.sample", weeks=m, channels=len(cids)):
+        ex = ThreadPoolExecutor(max_workers)
+        try:
+            task_of = {ex.submit(perf.bind(search), (k, c)): (k, c) for k in picked for c in cids}
+            done, _ = wait(task_of, timeout=max(0.0, deadline - time.perf_counter() - LATENCY_S["videos"]))
+            ids_by_task, ok_weeks = {}, set(picked)
+            for f, (k, c) in task_of.items():
+                if f in done and f.exception() is None:
+                    ids_by_task[k, c] = f.result()[1]
+                else:
+                    ok_weeks.discard(k)             # late or failed: drop the whole week (cluster)
+            ids = [v for k in sorted(ok_weeks) for c in cids for v in ids_by_task.get((k, c), [])]
+            chunks = [ids[i:i + 50] for i in range(0, len(ids), 50)]
+            items = [it for part in ex.map(perf.bind(stats), chunks) for it in part]
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
+    by_id = {it.get("id"): it.get("statistics") or {} for it in items}
+
+    # hidden/zero like counts: same local like model as the exact path
+    filled = {}
+    hidden = [v for v, st in by_id.items() if not dp._safe_int(st.get("likeCount"))]
+    if hidden and os.getenv("LIKE_ESTIMATE", "1") != "0":
+        import likes, videos
+        with perf.span("planner.like_estimate", videos=len(hidden)):
+            filled = likes.fill_hidden([videos.row_from_item(it) for it in items], hidden)["by_id"]
+
+    # per-channel cap (newest max_videos first): weight of week k = its share of the last `span` weeks
+    k_total, weight, capped = len(clusters), {}, []
+    for c in cids:
+        n_year = k_total / len(ok_weeks) * sum(len(ids_by_task.get((k, c), [])) for k in ok_weeks) if ok_weeks else 0
+        span = k_total * max_videos / n_year if n_year > max_videos else k_total
+        if span < k_total:
+            capped.append(c)
+        weight[c] = {k: min(1.0, max(0.0, span - (k_total - 1 - k))) for k in ok_weeks}
+
+    sums = []
+    for k in sorted(ok_weeks):
+        row = dict.fromkeys(METRICS + ("video_count", "likes_estimated"), 0.0)
+        for c in cids:
+            w, week_ids = weight[c][k], ids_by_task.get((k, c), [])
+            if not w:
+                continue
+            for metric, field in _STAT_FIELDS.items():
+                row[metric] += w * sum(dp._safe_int(by_id.get(v, {}).get(field)) for v in week_ids)
+            est = w * sum(filled.get(v, 0.0) for v in week_ids)
+            row["likes"] += est
+            row["likes_estimated"] += est
+            row["video_count"] += w * len(week_ids)
+        sums.append(row)
+    units = SEARCH_UNITS * len(task_of) + len(chunks)
+    return {"clusters": sums, "k": len(clusters), "ids": ids, "quota_units": units,
+            "hidden": len(hidden), "capped": capped}
+
+# ---------- Background refinement ----------
+_BG = ThreadPoolExecutor(2, thread_name_prefix="planner-refine")
+_PENDING = {}
+_PENDING_LOCK = threading.Lock()
+
+def refine(channels, year: int, max_videos: int = 400, verify_with_html: bool = False):
+    """Start (once) the exact fetch in the background; returns its future."""
+    key = dp._multi_key(channels, int(year), True, int(max_videos), bool(verify_with_html))
+    with _PENDING_LOCK:
+        fut = _PENDING.get(key)
+        if fut is None or fut.done():
+            fut = _PENDING[key] = _BG.submit(dp.yt_annual_stats_multi, channels, int(year), include_comments=True,
+                                             max_videos=int(max_videos), verify_with_html=bool(verify_with_html))
+        return fut
+
+def refined(channels, year: int, max_videos: int = 400, verify_with_html: bool = False) -> dict | None:
+    """Exact totals once they are cached (background refinement or any earlier full run)."""
+    return _cached(channels, year, max_videos, verify_with_html)
+
+# ---------- Planner ----------
+def annual_totals(channels, year: int, budget_s: float = 3.0, max_videos: int = 400,
+                  verify_with_html: bool = False, max_sample_units: int = 2000, background: bool = True,
+                  seed: int | None = None) -> dict:
+    """
+    Best answer for the year's YouTube totals within `budget_s` seconds:
+      cached  — an exact result is already in the pipeline cache;
+      full    — the exact fetch is expected to fit in the budget (runs now);
+      sampled — random weeks, extrapolated with a 95% CI; the exact fetch continues in the background.
+    Each sampled week costs a search.list call per channel, so `max_sample_units` caps the weeks drawn.
+    Like the exact fetch, sampled totals cover at most `max_videos` per channel and include model-filled
+    hidden likes ("likes_estimated").
+    background=False leaves starting the exact fetch to the caller (see refine).
+    """
+    t0 = time.perf_counter()
+    if seed is None and (os.getenv("PIPELINE_RECORD") or os.getenv("PIPELINE_REPLAY")):
+        seed = 0            # a recorded session must sample the same weeks when it is replayed
+    hit = _cached(channels, year, max_videos, verify_with_html)
+    if hit is not None:
+        return _answer("cached", hit, t0)
+    est_s = full_cost_s(channels, year, max_videos)
+    if est_s <= budget_s:
+        res = dp.yt_annual_stats_multi(channels, int(year), include_comments=True, max_videos=int(max_videos),
+                                       verify_with_html=bool(verify_with_html))
+        return _answer("full", res, t0, expected_s=est_s)
+
+    smp = _sample(channels, int(year), t0 + budget_s, max_videos=int(max_videos), max_units=max_sample_units,
+                  seed=seed)
+    if not smp.get("clusters"):
+        return {**_answer("full", {m: 0 for m in METRICS + ("video_count",)}, t0), "accuracy": "no data"}
+    est, ci = estimate(smp["clusters"], smp["k"])
+    totals = {m: est[m] * _MULTI_SCALE for m in METRICS}
+    totals["video_count"] = est["video_count"]
+    if smp["hidden"]:
+        m_ok = len(smp["clusters"])
+        totals["likes_estimated"] = int(round(smp["k"] / m_ok * sum(c["likes_estimated"] for c in smp["clusters"])
+                                              * _MULTI_SCALE))
+    if verify_with_html:
+        totals["_sample_raw"] = dp.watch_page_labels(smp["ids"][:3])
+    if background:
+        refine(channels, year, max_videos, verify_with_html)
+    m = len(smp["clusters"])
+    rel = ci["views"] / est["views"] * 100 if est["views"] else 0.0
+    return {
+        "strategy": "sampled",
+        "totals": totals,
+        "ci": {**{k: ci[k] * _MULTI_SCALE for k in METRICS}, "video_count": ci["video_count"]},
+        "accuracy": (f"±{rel:.1f}% ({m}/{smp['k']} weeks)" if m < smp["k"] else f"all {m} weeks")
+                    + (", approximate: newest-videos cap applied" if smp["capped"] else ""),
+        "capped": smp["capped"],
+        "weeks_sampled": m,
+        "quota_units": smp["quota_units"],
+        "expected_full_s": round(est_s, 2),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "refining": background,
+    }
+
+def _answer(strategy: str, res: dict, t0: float, expected_s: float | None = None) -> dict:
+    return {
+        "strategy": strategy,
+        "totals": res,
+        "ci": {m: 0 for m in METRICS + ("video_count",)},
+        "accuracy": "exact",
+        "expected_full_s": None if expected_s is None else round(expected_s, 2),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "refining": False,
+    }
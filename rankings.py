@@ -0,0 +1,176 @@
+# rankings.py — cross-artist leaderboards over tickets + stored pipeline results
+#
+#   lb = rankings.board()                                  # ticket cache + data/results.arrow
+#   lb.top("likes_to_sales_pct", 2023, k=20)               # [{rank, artist, value}, ...]
+#   lb.rank("likes_to_sales_pct", 2023, "Beyoncé")         # 1-based, highest value = 1
+#   lb.percentile("tickets", 2023, "Beyoncé")              # % of ranked artists at or below
+#   rankings.record(rec)                                   # persist a new ArtistResult + update in place
+#
+# One sorted list of (value, artist) per (metric, year); queries are bisects / slices,
+# updates replace a single entry, so nothing is recomputed when a new result arrives.
+import bisect, os, pathlib, threading, unicodedata
+from dataclasses import fields, replace
+
+import results
+from results import ArtistResult, read_records, write_results
+
+RESULTS_PATH = pathlib.Path(os.getenv("RESULTS_PATH") or results.DEFAULT_PATH)
+
+def _pct(n: int, d: int) -> float | None:
+    return round((n / d) * 100, 6) if n and d else None
+
+def _pos(v: int) -> int | None:
+    return v if v > 0 else None
+
+# metric → (label, value(record) or None when it cannot be computed)
+METRICS = {
+    "tickets":               ("Tickets sold",                lambda r: _pos(r.tickets)),
+    "yt_views":              ("YouTube views (year)",        lambda r: _pos(r.yt_views)),
+    "yt_likes":              ("YouTube likes (year)",        lambda r: _pos(r.yt_likes)),
+    "sp_followers":          ("Spotify followers",           lambda r: _pos(r.sp_followers)),
+    "sp_monthly_listeners":  ("Spotify monthly listeners",   lambda r: _pos(r.sp_monthly_listeners)),
+    "views_to_likes_pct":    ("Views → Likes (%)",           lambda r: _pct(r.yt_likes, r.yt_views)),
+    "likes_to_sales_pct":    ("Likes → Sales (%)",           lambda r: _pct(r.tickets, r.yt_likes)),
+    "comments_to_sales_pct": ("Comments → Sales (%)",        lambda r: _pct(r.tickets, r.yt_comments)),
+    "views_to_sales_pct":    ("Views → Sales (lifetime, %)", lambda r: _pct(r.tickets, r.yt_lifetime_views)),
+    "subs_to_sales_pct":     ("Subs → Sales (lifetime, %)",  lambda r: _pct(r.tickets, r.yt_subscribers)),
+    "followers_to_sales_pct": ("Followers → Sales (%)",      lambda r: _pct(r.tickets, r.sp_followers)),
+    "streams_to_sales_pct":  ("Streams → Sales (%)",         lambda r: _pct(r.tickets, r.sp_monthly_listeners)),
+}
+
+_MERGE = tuple(f.name for f in fields(ArtistResult) if f.name not in ("artist", "year", "fetched_at"))
+
+def _key(artist: str) -> str:
+    """Board identity: whitespace collapsed, accents dropped, casefolded ("Beyoncé" == "beyonce")."""
+    s = unicodedata.normalize("NFKD", " ".join(str(artist).split()))
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).casefold()
+
+def _val(t):
+    return t[0]
+
+class Leaderboard:
+    """Sorted per-(metric, year) indexes with incremental updates (thread-safe)."""
+
+    def __init__(self):
+        self._idx = {}          # (metric, year) → [(value, key)] ascending
+        self._vals = {}         # (metric, year) → {key: value}
+        self._rows = {}         # (key, year) → merged ArtistResult
+        self._names = {}        # key → display name
+        self._lock = threading.RLock()
+
+    # ---------- updates ----------
+    def _set(self, metric: str, year: int, key: str, value):
+        idx = self._idx.setdefault((metric, year), [])
+        vals = self._vals.setdefault((metric, year), {})
+        old = vals.pop(key, None)
+        if old is not None:
+            del idx[bisect.bisect_left(idx, (old, key))]
+        if value is not None:
+            bisect.insort(idx, (value, key))
+            vals[key] = value
+
+    def update(self, rec: ArtistResult) -> ArtistResult:
+        """
+        Merge one result into the board. Zero fields keep what earlier runs found (a light-mode
+        run has no annual stats, a full-mode one no lifetime stats); newer non-zero values win.
+        """
+        key, year = _key(rec.artist), int(rec.year)
+        with self._lock:
+            cur = self._rows.get((key, year))
+            if cur is not None:
+                newer = rec.fetched_at >= cur.fetched_at
+                merged = {f: (getattr(rec, f) if getattr(rec, f) and (newer or not getattr(cur, f))
+                              else getattr(cur, f)) for f in _MERGE}
+                rec = replace(cur, **merged, fetched_at=max(rec.fetched_at, cur.fetched_at))
+            self._rows[(key, year)] = rec
+            self._names.setdefault(key, rec.artist)
+            for m, (_, fn) in METRICS.items():
+                self._set(m, year, key, fn(rec))
+        return rec
+
+    def update_many(self, records):
+        for r in records:
+            self.update(r)
+
+    def add_tickets(self, totals: dict, year: int = 2023):
+        """Seed ticket counts (e.g. the TouringData cache) so every touring artist is rankable."""
+        for artist, n in (totals or {}).items():
+            self.update(ArtistResult(artist=artist, year=year, tickets=int(n or 0)))
+
+    # ---------- queries ----------
+    def top(self, metric: str, year: int, k: int = 20, ascending: bool = False) -> list[dict]:
+        with self._lock:
+            idx = self._idx.get((metric, int(year)), [])
+            n = len(idx)
+            picked = idx[:k] if ascending else idx[:-k - 1:-1] if k else []
+            return [{"rank": n - bisect.bisect_right(idx, v, key=_val) + 1, "artist": self._names[key], "value": v}
+                    for v, key in picked]
+
+    def rank(self, metric: str, year: int, artist: str) -> int | None:
+        """Competition rank (ties share a rank), 1 = highest value; None when not ranked."""
+        with self._lock:
+            v = self._vals.get((metric, int(year)), {}).get(_key(artist))
+            if v is None:
+                return None
+            idx = self._idx[(metric, int(year))]
+            return len(idx) - bisect.bisect_right(idx, v, key=_val) + 1
+
+    def percentile(self, metric: str, year: int, artist: str) -> float | None:
+        """Share of ranked artists (%) whose value is at or below this artist's."""
+        with self._lock:
+            v = self._vals.get((metric, int(year)), {}).get(_key(artist))
+            if v is None:
+                return None
+            idx = self._idx[(metric, int(year))]
+            return round(100.0 * bisect.bisect_right(idx, v, key=_val) / len(idx), 2)
+
+    def value(self, metric: str, year: int, artist: str):
+        with self._lock:
+            return self._vals.get((metric, int(year)), {}).get(_key(artist))
+
+    def size(self, metric: str, year: int) -> int:
+        return len(self._idx.get((metric, int(year)), []))
+
+    def years(self) -> list[int]:
+        with self._lock:
+            return sorted({y for _, y in self._rows})
+
+    def row(self, artist: str, year: int) -> ArtistResult | None:
+        return self._rows.get((_key(artist), int(year)))
+
+# ---------- process-wide board ----------
+_BOARD = None
+_MTIME = None
+_LOCK = threading.Lock()
+
+def load(path=RESULTS_PATH, tickets: bool = True) -> Leaderboard:
+    """Fresh board from the ticket cache (2023) and a stored results file."""
+    lb = Leaderboard()
+    if tickets:
+        try:
+            from ticket_scraper import load_cached_ticket_totals
+            lb.add_tickets(load_cached_ticket_totals(), 2023)
+        except Exception:
+            pass
+    lb.update_many(read_records(path))
+    return lb
+
+def board(path=RESULTS_PATH) -> Leaderboard:
+    """Shared board; rebuilt only when another process (CLI, warmer) rewrote the results file."""
+    global _BOARD, _MTIME
+    path = pathlib.Path(path)
+    with _LOCK:
+        m = results.mtime(path)
+        if _BOARD is None or m != _MTIME:
+            _BOARD, _MTIME = load(path), m
+        return _BOARD
+
+def record(rec: ArtistResult, path=RESULTS_PATH) -> ArtistResult:
+    """Append a result to the results file and fold it into the shared board."""
+    global _MTIME
+    path = pathlib.Path(path)
+    lb = board(path)
+    with _LOCK:
+        write_results([rec], path, append=True)
+        _MTIME = results.mtime(path)
+    return lb.update(rec)
@@ -0,0 +1,232 @@
+# replay.py — record / replay upstream HTTP traffic (offline demos, load tests, benchmarks)
+#
+#   PIPELINE_RECORD=data/demo.json.xz streamlit run app.py        # real run; every response is archived
+#   PIPELINE_REPLAY=data/demo.json.xz streamlit run app.py        # no network: served from the archive
+#   PIPELINE_REPLAY_TIMING=fast …                                 # "recorded" (default), "fast" or seconds
+#   python replay.py info data/demo.json.xz                       # entries / bytes per endpoint
+#
+#   with replay.install(replay.ReplayAdapter(fx)) as ad: …        # scoped, e.g. in benchmarks
+#
+# The adapters are requests transport adapters: http_client mounts the process-wide one on its
+# sessions (see active()), install() swaps it into every requests.Session. Nothing else in the
+# pipeline changes. In replay mode the result cache starts empty, the history store is off unless
+# PIPELINE_DB is set, and ticket totals come from the archive instead of the local JSON cache.
+# Archives are gzip (.gz) or xz (.xz, several times smaller for page-heavy sessions) JSON.
+import atexit, contextlib, gzip, io, json, lzma, os, sys, threading, time
+from collections import Counter
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_client import endpoint_of
+
+# Query params that change per run / per account and must not affect matching.
+VOLATILE_PARAMS = {"key", "access_token"}
+
+def canonical_key(method: str, url: str, body: bytes | str | None = None) -> str:
+    """'GET host/path?sorted&params' — stable across API keys and param order."""
+    parts = urlsplit(url)
+    q = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+               if k not in VOLATILE_PARAMS)
+    key = f"{method.upper()} {parts.netloc}{parts.path}"
+    if q:
+        key += "?" + urlencode(q)
+    return key
+
+def _response(req, status: int, body: bytes, headers: dict | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r.headers = CaseInsensitiveDict(headers or {})
+    r.raw = io.BytesIO(body)      # streamed reads see real incremental bytes
+    r.url = req.url
+    r.request = req
+    r.encoding = "utf-8"
+    r.reason = "OK" if status < 400 else "ERROR"
+    return r
+
+def _open(path, mode: str, fmt: str | None = None):
+    path = str(path)
+    if (fmt or path).endswith(".xz"):
+        return lzma.open(path, mode, encoding="utf-8") if "t" in mode else lzma.open(path, mode)
+    return gzip.open(path, mode, encoding="utf-8") if "t" in mode else gzip.open(path, mode)
+
+# ---------- Fixture archive ----------
+class Fixtures:
+    """{canonical_key: {"status", "headers", "body", "elapsed"}} with gzip / xz JSON persistence."""
+
+    def __init__(self, entries: dict | None = None):
+        self.entries = dict(entries or {})
+        self._lock = threading.Lock()
+
+    def add(self, method: str, url: str, body, status: int = 200,
+            headers: dict | None = None, elapsed: float = 0.0):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        with self._lock:
+            self.entries[canonical_key(method, url)] = {
+                "status": status, "headers": headers or {}, "body": body, "elapsed": elapsed,
+            }
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def save(self, path):
+        with self._lock:
+            entries = dict(self.entries)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with _open(tmp, "wt", fmt=str(path)) as f:
+            json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "Fixtures":
+        with _open(path, "rt") as f:
+            return cls(json.load(f))
+
+# ---------- Adapters ----------
+class ReplayAdapter(BaseAdapter):
+    """
+    Serves recorded responses. Unknown requests get a 404 (and are listed in .misses).
+    latency: None → as fast as possible; "recorded" → sleep the recorded elapsed time;
+             float → fixed per-call delay in seconds.
+    routes:  {endpoint: fn(request, fixtures) → entry | None} for endpoints whose responses
+             are composed from other entries (e.g. batch lookups) instead of recorded verbatim.
+    """
+
+    def __init__(self, fixtures: Fixtures, latency=None, routes: dict | None = None):
+        super().__init__()
+        self.fixtures = fixtures
+        self.latency = latency
+        self.routes = dict(routes or {})
+        self.calls = Counter()
+        self.bytes = Counter()
+        self.misses = []
+        self._lock = threading.Lock()
+
+    def lookup(self, request) -> dict | None:
+        """The entry for a request (anything with .method and .url): recorded, else composed by a route."""
+        hit = self.fixtures.get(canonical_key(request.method, request.url))
+        if hit is None and endpoint_of(request.url) in self.routes:
+            hit = self.routes[endpoint_of(request.url)](request, self.fixtures)
+        return hit
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = canonical_key(request.method, request.url)
+        hit = self.lookup(request)
+        delay = self.latency
+        if delay == "recorded":
+            delay = (hit or {}).get("elapsed", 0.0)
+        if delay:
+            time.sleep(delay)
+        ep = endpoint_of(request.url)
+        if hit is None:
+            with self._lock:
+                self.misses.append(key)
+                self.calls[ep] += 1
+            return _response(request, 404, b"{}")
+        body = hit["body"].encode("utf-8") if isinstance(hit["body"], str) else hit["body"]
+        with self._lock:
+            self.calls[ep] += 1
+            self.bytes[ep] += len(body)
+        return _response(request, hit["status"], body, hit["headers"])
+
+    def close(self):
+        pass
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Real network adapter that also captures every response into a Fixtures archive.
+    With `path`, the archive is written at most every `save_every_s` seconds and at exit.
+    """
+
+    def __init__(self, fixtures: Fixtures | None = None, path=None, save_every_s: float = 30.0):
+        super().__init__()
+        self.fixtures = fixtures or Fixtures()
+        self.path = path
+        self.save_every_s = save_every_s
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        if path:
+            atexit.register(self.save)
+
+    def send(self, request, **kw):
+        t0 = time.perf_counter()
+        r = super().send(request, **kw)
+        body = r.content.decode(r.encoding or "utf-8", errors="replace")
+        self.fixtures.add(request.method, request.url, body, status=r.status_code,
+                          headers={"Content-Type": r.headers.get("Content-Type", "")},
+                          elapsed=round(time.perf_counter() - t0, 4))
+        self._dirty = True
+        if self.path and time.monotonic() - self._saved_at >= self.save_every_s:
+            self.save()
+        return r
+
+    def save(self):
+        if self.path and self._dirty:
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            self.fixtures.save(self.path)
+
+@contextlib.contextmanager
+def install(adapter: BaseAdapter):
+    """Route every requests.Session (incl. requests.get/post) through `adapter`."""
+    orig = requests.sessions.Session.get_adapter
+    requests.sessions.Session.get_adapter = lambda self, url: adapter
+    try:
+        yield adapter
+    finally:
+        requests.sessions.Session.get_adapter = orig
+
+# ---------- Process-wide mode (PIPELINE_REPLAY / PIPELINE_RECORD) ----------
+_ACTIVE = None
+_ACTIVE_LOCK = threading.Lock()
+
+def mode() -> str:
+    """'replay', 'record' or '' from the environment (replay wins when both are set)."""
+    return "replay" if os.getenv("PIPELINE_REPLAY") else "record" if os.getenv("PIPELINE_RECORD") else ""
+
+def _timing(value: str):
+    value = (value or "recorded").strip().lower()
+    if value in ("fast", "none", "0"):
+        return None
+    return "recorded" if value == "recorded" else float(value)
+
+def active() -> BaseAdapter | None:
+    """The adapter http_client mounts on its sessions in replay / record mode, else None."""
+    global _ACTIVE
+    m = mode()
+    if not m:
+        return None
+    with _ACTIVE_LOCK:
+        if _ACTIVE is None:
+            if m == "replay":
+                _ACTIVE = ReplayAdapter(Fixtures.load(os.environ["PIPELINE_REPLAY"]),
+                                        latency=_timing(os.getenv("PIPELINE_REPLAY_TIMING", "")))
+            else:
+                path = os.environ["PIPELINE_RECORD"]
+                fx = Fixtures.load(path) if os.path.exists(path) else Fixtures()   # keep adding to it
+                _ACTIVE = RecordingAdapter(fx, path=path)
+        return _ACTIVE
+
+def info(path) -> dict:
+    """Entries, body bytes and recorded seconds per endpoint of an archive."""
+    fx = Fixtures.load(path)
+    out = {}
+    for key, e in fx.entries.items():
+        method, rest = key.split(" ", 1)
+        ep = endpoint_of("https://" + rest)
+        row = out.setdefault(ep, {"entries": 0, "bytes": 0, "seconds": 0.0})
+        row["entries"] += 1
+        row["bytes"] += len(e["body"].encode("utf-8") if isinstance(e["body"], str) else e["body"])
+        row["seconds"] = round(row["seconds"] + (e.get("elapsed") or 0.0), 3)
+    return {"path": str(path), "file_bytes": os.path.getsize(path), "entries": len(fx.entries), "endpoints": out}
+
+# ---------- CLI ----------
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "info":
+        print(json.dumps(info(sys.argv[2]), indent=2))
+    else:
+        print("usage: python replay.py info ARCHIVE")
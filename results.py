@@ -0,0 +1,238 @@
+# results.py — compact, typed result records + columnar persistence
+#
+# In memory:  one slotted dataclass per (artist, year) run, integers only.
+# On disk:    Arrow IPC (.arrow/.feather, memory-mapped, zero-parse reads; the default),
+#             Parquet (.parquet, smallest), or gzip JSONL (.jsonl.gz) when
+#             pyarrow is not installed.
+#
+# Appends to an Arrow file go to small segment files beside it (`<file>.parts/`), each one
+# record batch; reads map the file and its segments, and every COMPACT_PARTS segments are
+# folded back into the main file, so an append never rewrites the whole history.
+import gzip, importlib.util, json, os, pathlib, time
+from dataclasses import dataclass, fields, astuple, asdict
+
+# ---------- Record schema ----------
+@dataclass(slots=True)
+class ArtistResult:
+    artist: str
+    year: int
+    channels: str = ""              # comma-separated YouTube inputs used for the run
+    tickets: int = 0
+    yt_views: int = 0               # videos published in `year`
+    yt_likes: int = 0
+    yt_comments: int = 0
+    yt_video_count: int = 0
+    yt_lifetime_views: int = 0      # channel aggregates at fetch time
+    yt_subscribers: int = 0
+    yt_lifetime_videos: int = 0
+    sp_followers: int = 0
+    sp_monthly_listeners: int = 0
+    fetched_at: int = 0             # unix seconds
+
+STR_COLUMNS = ("artist", "channels")
+COLUMNS = tuple(f.name for f in fields(ArtistResult))
+INT_COLUMNS = tuple(c for c in COLUMNS if c not in STR_COLUMNS)
+COMPACT_PARTS = int(os.getenv("RESULTS_COMPACT_PARTS", "32") or 32)
+# Arrow when pyarrow is installed (checked without importing it), gzip JSONL otherwise
+DEFAULT_PATH = "data/results.arrow" if importlib.util.find_spec("pyarrow") else "data/results.jsonl.gz"
+
+def _i(x) -> int:
+    try:
+        return int(x or 0)
+    except Exception:
+        return 0
+
+def from_pipeline(artist: str, year: int, channels="", tickets: int = 0,
+                  yt_year: dict | None = None, yt_life: dict | None = None,
+                  sp_followers: int = 0, monthly_listeners: int = 0,
+                  fetched_at: int | None = None, yt_scale: int = 1) -> ArtistResult:
+    """
+    Build a record from the dicts returned by data_pipeline (drops _raw/_sample_raw).
+    yt_scale: the factor yt_year's views/likes/comments carry (yt_annual_stats_multi reports ×1000);
+    records always hold unscaled counts so every writer of a results file agrees.
+    """
+    yt_year = yt_year or {}
+    yt_life = yt_life or {}
+    if not isinstance(channels, str):
+        channels = ",".join(channels)
+    return ArtistResult(
+        artist=artist,
+        year=_i(year),
+        channels=channels,
+        tickets=_i(tickets),
+        yt_views=_i(yt_year.get("views")) // yt_scale,
+        yt_likes=_i(yt_year.get("likes")) // yt_scale,
+        yt_comments=_i(yt_year.get("comments")) // yt_scale,
+        yt_video_count=_i(yt_year.get("video_count")),
+        yt_lifetime_views=_i(yt_life.get("viewCount")),
+        yt_subscribers=_i(yt_life.get("subscriberCount")),
+        yt_lifetime_videos=_i(yt_life.get("videoCount")),
+        sp_followers=_i(sp_followers),
+        sp_monthly_listeners=_i(monthly_listeners),
+        fetched_at=int(time.time()) if fetched_at is None else _i(fetched_at),
+    )
+
+# ---------- Optional pyarrow ----------
+def _pa():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+def _schema(pa):
+    return pa.schema([(c, pa.string() if c in STR_COLUMNS else pa.int64()) for c in COLUMNS])
+
+def _fmt(path: pathlib.Path) -> str:
+    name = path.name.lower()
+    if name.endswith((".arrow", ".feather", ".ipc")):
+        return "arrow"
+    if name.endswith(".parquet"):
+        return "parquet"
+    return "jsonl"
+
+def to_table(records):
+    """Columnar pyarrow.Table with int64 metric columns."""
+    pa = _pa()
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar tables (pip install pyarrow)")
+    cols = {c: [] for c in COLUMNS}
+    for r in records:
+        for c, v in zip(COLUMNS, astuple(r)):
+            cols[c].append(v)
+    return pa.Table.from_pydict(cols, schema=_schema(pa))
+
+# ---------- Arrow segments ----------
+def _parts_dir(path: pathlib.Path) -> pathlib.Path:
+    return path.with_name(path.name + ".parts")
+
+def _parts(path: pathlib.Path) -> list[pathlib.Path]:
+    d = _parts_dir(path)
+    return sorted(d.glob("*.arrow")) if d.is_dir() else []
+
+def _write_arrow(table, path: pathlib.Path):
+    """Atomic write of one uncompressed Arrow IPC file."""
+    import pyarrow.feather as feather
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+def _compact(path: pathlib.Path):
+    """Fold the segments into the main file (skipped while another process compacts)."""
+    lock = _parts_dir(path) / ".compacting"
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except OSError:
+        return
+    try:
+        os.close(fd)
+        parts = _parts(path)
+        _write_arrow(_read_arrow([path] + parts), path)
+        for p in parts:
+            p.unlink(missing_ok=True)
+    finally:
+        lock.unlink(missing_ok=True)
+
+def mtime(path) -> float | None:
+    """Last change of a results file, counting Arrow segments appended beside it."""
+    path = pathlib.Path(path)
+    out = None
+    for p in (path, _parts_dir(path)):
+        try:
+            out = max(out or 0.0, p.stat().st_mtime)
+        except OSError:
+            pass
+    return out
+
+# ---------- Write ----------
+def write_results(records, path, append: bool = False) -> pathlib.Path:
+    """
+    Persist records. Format follows the suffix:
+      .arrow / .feather → Arrow IPC (uncompressed, memory-mappable)
+      .parquet          → Parquet (zstd)
+      anything else     → gzip JSONL, one object per line keyed by field name (no pyarrow needed)
+    append=True adds to an existing file: a new gzip member (JSONL), a new segment (Arrow),
+    or a rewrite (Parquet).
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    records = list(records)
+    fmt = _fmt(path)
+
+    if fmt == "jsonl":
+        with gzip.open(path, "at" if append else "wt", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(asdict(r), ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+        return path
+
+    if fmt == "arrow":
+        if append and path.exists():
+            d = _parts_dir(path)
+            d.mkdir(exist_ok=True)
+            _write_arrow(to_table(records), d / f"{time.time_ns():020d}-{os.getpid()}.arrow")
+            if len(_parts(path)) >= COMPACT_PARTS:
+                _compact(path)
+            return path
+        _write_arrow(to_table(records), path)
+        for p in _parts(path):
+            p.unlink(missing_ok=True)
+        return path
+
+    if append and path.exists():
+        records = read_records(path) + records
+    import pyarrow.parquet as pq
+    pq.write_table(to_table(records), path, compression="zstd")
+    return path
+
+# ---------- Read ----------
+def read_table(path):
+    """
+    Load a result file as a pyarrow.Table.
+    Arrow IPC files (and their appended segments) are memory-mapped: no parsing, columns are
+    paged in on access.
+    """
+    path = pathlib.Path(path)
+    fmt = _fmt(path)
+    pa = _pa()
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar reads (pip install pyarrow)")
+    if fmt == "arrow":
+        return _read_arrow([path] + _parts(path))
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    return to_table(read_records(path))
+
+def _read_arrow(paths):
+    pa = _pa()
+    tables = []
+    for i, p in enumerate(paths):
+        try:
+            with pa.memory_map(str(p), "r") as src:
+                tables.append(pa.ipc.open_file(src).read_all())
+        except FileNotFoundError:
+            if i == 0:
+                raise
+            # segment folded in by a concurrent compaction
+    return pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+def _from_row(row: dict) -> ArtistResult:
+    """JSONL object → record by field name (unknown keys dropped, missing ones default)."""
+    return ArtistResult(**{k: v for k, v in row.items() if k in COLUMNS})
+
+def read_records(path) -> list[ArtistResult]:
+    """Load a result file back into ArtistResult records (any format)."""
+    path = pathlib.Path(path)
+    if not path.exists():
+        return []
+    if _fmt(path) == "jsonl":
+        out = []
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    out.append(_from_row(json.loads(line)))
+        return out
+    cols = read_table(path).to_pydict()
+    present = [c for c in COLUMNS if c in cols]
+    return [ArtistResult(**dict(zip(present, row))) for row in zip(*(cols[c] for c in present))]
@@ -0,0 +1,97 @@
+# singleflight.py — share one in-flight computation between concurrent identical calls
+#
+# Streamlit runs every browser session in its own thread of one process, so when several
+# analysts ask for the same artist at once, only the first call hits the upstream APIs;
+# the others block on it and receive (a copy of) the same result.
+import copy, functools, threading
+
+import perf
+from cache import arg_key
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0          # total invocations
+        self.executions = 0     # invocations that actually ran the function (upstream fetches)
+        self.coalesced = 0      # invocations that waited on someone else's fetch
+
+    def do(self, key, fn, *args, **kw):
+        with self._lock:
+            self.calls += 1
+            c = self._calls.get(key)
+            leader = c is None
+            if leader:
+                c = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                c.waiters += 1
+                self.coalesced += 1
+        perf.cache_event(f"singleflight:{self.name}", not leader)
+
+        if not leader:
+            c.done.wait()
+            if c.error is not None:
+                raise c.error
+            return copy.deepcopy(c.result)      # callers may mutate their dicts
+
+        try:
+            c.result = fn(*args, **kw)
+            return copy.deepcopy(c.result)      # waiters copy c.result after we return
+        except BaseException as e:
+            c.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            c.done.set()
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "executions": self.executions, "coalesced": self.coalesced,
+                "inflight": len(self._calls)}
+
+_GROUPS: dict[str, SingleFlight] = {}
+
+def group(name: str) -> SingleFlight:
+    g = _GROUPS.get(name)
+    if g is None:
+        g = _GROUPS.setdefault(name, SingleFlight(name))
+    return g
+
+def shared(name: str, key=None):
+    """
+    Decorator: coalesce concurrent calls with equal keys.
+    Default key = all arguments bound to the signature (defaults applied, strings stripped),
+    so f("x", 2023) and f(" x", year=2023) share a flight. Pass key(*args, **kw) to normalize further.
+    """
+    def deco(fn):
+        g = group(name)
+        keyfn = arg_key(fn, key)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            return g.do(keyfn(*args, **kw), fn, *args, **kw)
+
+        wrapper.singleflight = g
+        return wrapper
+    return deco
+
+def metrics() -> dict:
+    """Per wrapped function: calls, upstream executions, coalesced (saved) fetches."""
+    out = {name: g.stats() for name, g in sorted(_GROUPS.items())}
+    out["_total"] = {
+        "calls": sum(v["calls"] for v in out.values()),
+        "executions": sum(v["executions"] for v in out.values()),
+        "coalesced": sum(v["coalesced"] for v in out.values()),
+    }
+    return out
@@ -0,0 +1,274 @@
+# sources.py — upstream data sources as adapters (requests, cost model, rate limits, cache policy)
+#
+#   td = sources.get("touringdata")
+#   td.get(2023)                         # fetch → parse, served from the shared result cache after that
+#   td.load(2023)                        # same, uncached (refresh)
+#   td.race(2023)                        # (document, mirror url): every mirror at once, first good one wins
+#   yt = sources.get("youtube")
+#   yt.call("channels", part="statistics", id=cid)     # API key added, quota counted, host throttled
+#   yt.units("search", 3)                # 300: the cost model planners/warmers budget with
+#   sources.of_kind("tickets")           # every registered ticket chart
+#   sources.register(MyChart())          # a new source: subclass Source / TicketChart, no request code
+#
+# A Source declares where it talks to (base URL, endpoints with their quota cost per call), how fast
+# (rate_limits: requests/second per host, enforced by http_client), how it authenticates (auth) and
+# how long parsed results stay fresh (ttl / cache_if). register() installs the costs and limits into
+# http_client, so every request a source makes — call(), request() or get() — is metered and throttled.
+# get(query) runs fetch → parse through the shared result cache, singleflight and a perf span.
+import base64, os, threading, time
+
+import http_client, perf, singleflight
+
+_DAY = 24 * 3600
+UA = {"User-Agent": "Mozilla/5.0"}
+
+def _env(name: str) -> str:
+    import data_pipeline as dp          # owns .env loading
+    return dp._env(name)
+
+# ---------- Base ----------
+class Source:
+    """One upstream: subclasses set the class attributes and implement fetch (and usually parse)."""
+
+    name = ""
+    kind = ""                  # "tickets" | "social"
+    base = ""                  # prefix for relative endpoints in call()/request()
+    endpoints: dict = {}       # endpoint (relative to base) → quota units per call (0: unmetered)
+    rate_limits: dict = {}     # host → requests/second
+    headers: dict = {}
+    timeout = 20
+    ttl: float | None = None   # get() result TTL (None: the cache default)
+
+    def __init__(self):
+        self._get = None
+        self._get_lock = threading.Lock()
+
+    # --- requests ---
+    def auth(self) -> dict | None:
+        """{"params": …, "headers": …} added to API calls (relative endpoints); None: not configured."""
+        return {}
+
+    def configured(self) -> bool:
+        return self.auth() is not None
+
+    def url(self, endpoint: str) -> str:
+        return endpoint if "://" in endpoint else f"{self.base}/{endpoint}"
+
+    def request(self, endpoint: str, method: str = "GET", params=None, headers=None, **kw):
+        """One HTTP request through http_client (auth only for relative endpoints, i.e. this API)."""
+        auth = (self.auth() or {}) if "://" not in endpoint else {}
+        params = {**(params or {}), **auth.get("params", {})}
+        headers = {**self.headers, **auth.get("headers", {}), **(headers or {})}
+        kw.setdefault("timeout", self.timeout)
+        return http_client.request(method, self.url(endpoint), params=params or None, headers=headers, **kw)
+
+    def call(self, endpoint: str, **params) -> dict:
+        """GET an API endpoint and return its JSON (raises on HTTP errors)."""
+        r = self.request(endpoint, params=params)
+        r.raise_for_status()
+        return r.json()
+
+    # --- cost model ---
+    def units(self, endpoint: str, calls: int = 1) -> int:
+        return self.endpoints.get(endpoint, 0) * calls
+
+    # --- fetch / parse ---
+    def fetch(self, query):
+        raise NotImplementedError(f"{type(self).__name__}.fetch")
+
+    def parse(self, raw, query):
+        return raw
+
+    def cache_if(self, result) -> bool:
+        return bool(result)
+
+    def load(self, query):
+        """fetch → parse, uncached."""
+        with perf.span(f"source.{self.name}", query=str(query)):
+            raw = self.fetch(query)
+            return self.parse(raw, query) if raw else {}
+
+    def get(self, query):
+        """load(query) through the shared result cache (ttl / cache_if) and singleflight."""
+        if self._get is None:
+            with self._get_lock:
+                if self._get is None:
+                    from cache import memoize
+                    import data_pipeline as dp
+                    name = f"source:{self.name}"
+                    self._get = memoize(dp.RESULT_CACHE, name, key=lambda q: q, ttl=self.ttl,
+                                        cache_if=self.cache_if)(singleflight.shared(name, key=lambda q: q)(self.load))
+        return self._get(query)
+
+# ---------- Registry ----------
+_REGISTRY: dict = {}
+
+def register(src: Source) -> Source:
+    """Add a source and install its quota costs and rate limits into http_client."""
+    _REGISTRY[src.name] = src
+    for ep, units in src.endpoints.items():
+        if units:
+            http_client.set_cost(http_client.endpoint_of(src.url(ep)), units, src.name)
+    for host, rps in src.rate_limits.items():
+        http_client.set_rate_limit(host, rps)
+    return src
+
+def get(name: str) -> Source:
+    return _REGISTRY[name]
+
+def of_kind(kind: str) -> list:
+    return [s for s in _REGISTRY.values() if s.kind == kind]
+
+def names() -> list:
+    return list(_REGISTRY)
+
+# ---------- Ticket charts ----------
+class TicketChart(Source):
+    """A yearly ranking page: `mirrors` are URL templates ({year}) tried in order; query = year."""
+
+    kind = "tickets"
+    mirrors: tuple = ()
+    ttl = 7 * _DAY
+
+    def urls(self, year: int) -> list:
+        return [m.format(year=int(year)) for m in self.mirrors]
+
+    def document(self, r) -> str:
+        """Response → the document to parse ('' when this mirror has nothing)."""
+        return r.text
+
+    def fetch_from(self, url: str) -> str:
+        r = self.request(url)
+        r.raise_for_status()
+        return self.document(r)
+
+    def fetch(self, year) -> str:
+        for url in self.urls(year):
+            try:
+                doc = self.fetch_from(url)
+                if doc:
+                    return doc
+            except Exception:
+                continue
+        return ""
+
+    def race(self, year) -> tuple[str, str | None]:
+        """All mirrors at once; (document, url) of the first good response, ('', None) if none."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        urls = self.urls(year)
+        if len(urls) < 2:
+            doc = self.fetch(year)
+            return doc, (urls[0] if doc else None)
+        ex = ThreadPoolExecutor(len(urls), thread_name_prefix=f"{self.name}-race")
+        try:
+            futs = {ex.submit(perf.bind(self.fetch_from), u): u for u in urls}
+            for f in as_completed(futs):
+                try:
+                    doc = f.result()
+                except Exception:
+                    continue
+                if doc:
+                    return doc, futs[f]
+            return "", None
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)    # the slower mirror finishes on its own
+
+    def parse(self, raw, year) -> dict:
+        """Document → {Artist: tickets}, highest first."""
+        return dict(sorted(self.extract(raw).items(), key=lambda kv: kv[1], reverse=True))
+
+    def extract(self, raw) -> dict:
+        raise NotImplementedError(f"{type(self).__name__}.extract")
+
+class TouringData(TicketChart):
+    """touringdata.org year-end post, via the WordPress REST API (self-hosted and wordpress.com mirrors)."""
+
+    name = "touringdata"
+    mirrors = (
+        "https://touringdata.org/wp-json/wp/v2/posts?slug={year}-top-touring-artists&per_page=1",
+        "https://touringdata.wordpress.com/wp-json/wp/v2/posts?slug={year}-top-touring-artists&per_page=1",
+    )
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126 Safari/537.36",
+        "Accept": "application/json",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+    timeout = 30
+
+    def document(self, r) -> str:
+        arr = r.json()
+        if isinstance(arr, list) and arr:
+            return arr[0].get("content", {}).get("rendered", "")
+        return ""
+
+    def extract(self, raw) -> dict:
+        import ticket_scraper
+        return ticket_scraper.parse_post(raw)
+
+# ---------- Social platforms ----------
+class YouTube(Source):
+    """YouTube Data API v3 (key auth, daily unit quota) plus public watch pages."""
+
+    name = "youtube"
+    kind = "social"
+    base = "https://www.googleapis.com/youtube/v3"
+    endpoints = {"search": 100, "videos": 1, "channels": 1}
+    daily_quota = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000") or 10000)    # units per project and day
+
+    def auth(self) -> dict | None:
+        key = _env("YOUTUBE_API_KEY")
+        return {"params": {"key": key}} if key else None
+
+    def watch_page(self, video_id: str, **kw):
+        return self.request(f"https://www.youtube.com/watch?v={video_id}", headers=UA, **kw)
+
+class Spotify(Source):
+    """Spotify Web API (client-credentials token) plus the public artist pages (throttled)."""
+
+    name = "spotify"
+    kind = "social"
+    base = "https://api.spotify.com/v1"
+    token_url = "https://accounts.spotify.com/api/token"
+    timeout = 15
+    rate_limits = {"open.spotify.com": float(os.getenv("SPOTIFY_WEB_RPS", "5") or 5)}
+
+    def __init__(self):
+        super().__init__()
+        self.token_state = {"value": None, "expires": 0.0}
+        self._token = perf.timed("spotify.token")(singleflight.shared("_spotify_token")(self._fetch_token))
+
+    def _fetch_token(self) -> str | None:
+        st = self.token_state
+        if st["value"] and time.time() < st["expires"]:
+            perf.cache_event("spotify_token", True)
+            return st["value"]
+        perf.cache_event("spotify_token", False)
+        client_id, client_secret = _env("SPOTIFY_CLIENT_ID"), _env("SPOTIFY_CLIENT_SECRET")
+        if not client_id or not client_secret:
+            return None
+        try:
+            basic = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+            r = self.request(self.token_url, method="POST", data={"grant_type": "client_credentials"},
+                             headers={"Authorization": f"Basic {basic}"})
+            r.raise_for_status()
+            js = r.json()
+            st["value"] = js.get("access_token")
+            st["expires"] = time.time() + max(0, int(js.get("expires_in", 3600) or 3600) - 60)
+            return st["value"]
+        except Exception:
+            return None
+
+    def token(self) -> str | None:
+        """Client Credentials token (no user login); reused until a minute before it expires."""
+        return self._token()
+
+    def auth(self) -> dict | None:
+        tok = self.token()
+        return {"headers": {"Authorization": f"Bearer {tok}"}} if tok else None
+
+    def artist_page(self, artist_id: str, **kw):
+        return self.request(f"https://open.spotify.com/artist/{artist_id}", headers=UA, **kw)
+
+TOURINGDATA = register(TouringData())
+YOUTUBE = register(YouTube())
+SPOTIFY = register(Spotify())
@@ -0,0 +1,365 @@
+# store.py — embedded SQLite analytics store for every fetched number (WAL, indexed)
+#
+# Fetchers append snapshots here in bulk transactions; the dashboard's history panel and any
+# historical query read it back locally.
+#
+#   s = store.default()                       # data/pipeline.db (PIPELINE_DB; "" disables)
+#   s.channel_history("UC…")                  # lifetime snapshots, oldest first
+#   s.conversions_history("Beyoncé", 2023)
+#
+# Writes from the pipeline go through store.write(...), which never raises: persistence is
+# best-effort and must not break a dashboard run.
+import contextlib, hashlib, json, os, pathlib, sqlite3, threading, time
+
+DB_PATH = os.getenv("PIPELINE_DB", "data/pipeline.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    created_at  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS identities (
+    kind        TEXT NOT NULL,               -- 'youtube' | 'spotify'
+    input       TEXT NOT NULL COLLATE NOCASE,  -- handle / name / URL as typed
+    external_id TEXT NOT NULL,               -- channel ID / Spotify artist ID
+    artist_id   INTEGER REFERENCES artists(id),
+    resolved_at INTEGER NOT NULL,
+    PRIMARY KEY (kind, input)
+);
+CREATE INDEX IF NOT EXISTS ix_identities_external ON identities (kind, external_id);
+CREATE INDEX IF NOT EXISTS ix_identities_artist ON identities (artist_id);
+
+CREATE TABLE IF NOT EXISTS video_stats (
+    video_id     TEXT NOT NULL,
+    fetched_at   INTEGER NOT NULL,
+    channel_id   TEXT,
+    published_at INTEGER,
+    duration_s   INTEGER,
+    title_hash   INTEGER,
+    flags        INTEGER,
+    views        INTEGER NOT NULL,
+    likes        INTEGER NOT NULL,
+    comments     INTEGER NOT NULL,
+    PRIMARY KEY (video_id, fetched_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_video_stats_channel ON video_stats (channel_id, published_at);
+
+CREATE TABLE IF NOT EXISTS channel_stats (
+    channel_id  TEXT NOT NULL,
+    fetched_at  INTEGER NOT NULL,
+    views       INTEGER NOT NULL,
+    subscribers INTEGER NOT NULL,
+    videos      INTEGER NOT NULL,
+    PRIMARY KEY (channel_id, fetched_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS spotify_stats (
+    spotify_id        TEXT NOT NULL,
+    fetched_at        INTEGER NOT NULL,
+    followers         INTEGER,
+    popularity        INTEGER,
+    monthly_listeners INTEGER,
+    PRIMARY KEY (spotify_id, fetched_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tickets (
+    artist_id   INTEGER NOT NULL REFERENCES artists(id),
+    year        INTEGER NOT NULL,
+    source      TEXT NOT NULL,
+    tickets     INTEGER NOT NULL,
+    fetched_at  INTEGER NOT NULL,
+    PRIMARY KEY (artist_id, year, source)
+);
+CREATE INDEX IF NOT EXISTS ix_tickets_year ON tickets (year, tickets DESC);
+
+-- every distinct ticket list ever fetched (identical refreshes don't add a version)
+CREATE TABLE IF NOT EXISTS ticket_snapshots (
+    id          INTEGER PRIMARY KEY,
+    year        INTEGER NOT NULL,
+    source      TEXT NOT NULL,
+    taken_at    INTEGER NOT NULL,
+    artists     INTEGER NOT NULL,
+    digest      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_ticket_snapshots ON ticket_snapshots (year, source, taken_at);
+CREATE TABLE IF NOT EXISTS ticket_versions (
+    snapshot_id INTEGER NOT NULL REFERENCES ticket_snapshots(id),
+    artist_id   INTEGER NOT NULL REFERENCES artists(id),
+    tickets     INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, artist_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS conversions (
+    artist_id   INTEGER NOT NULL REFERENCES artists(id),
+    year        INTEGER NOT NULL,
+    metric      TEXT NOT NULL,
+    value       REAL,
+    computed_at INTEGER NOT NULL,
+    PRIMARY KEY (artist_id, year, metric, computed_at)
+);
+"""
+
+class Store:
+    """One SQLite file; a connection per thread (WAL lets readers run beside the writer)."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = pathlib.Path(path)
+        self._local = threading.local()
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            c = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            c.execute("PRAGMA foreign_keys=ON")
+            with self._lock:
+                if not self._ready:
+                    c.executescript(SCHEMA)
+                    self._ready = True
+            self._local.conn = c
+        return c
+
+    @contextlib.contextmanager
+    def tx(self):
+        """One write transaction (BEGIN IMMEDIATE … COMMIT)."""
+        c = self.conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            yield c
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+        c.execute("COMMIT")
+
+    def _artist_ids(self, c, names) -> dict:
+        now = int(time.time())
+        names = list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+        c.executemany("INSERT OR IGNORE INTO artists (name, created_at) VALUES (?, ?)", [(n, now) for n in names])
+        return {n: c.execute("SELECT id FROM artists WHERE name = ?", (n,)).fetchone()[0] for n in names}
+
+    # ---------- writes (each one transaction) ----------
+    def write_identity(self, kind: str, input: str, external_id: str, artist: str | None = None):
+        with self.tx() as c:
+            aid = self._artist_ids(c, [artist])[artist.strip()] if artist else None
+            c.execute("INSERT INTO identities (kind, input, external_id, artist_id, resolved_at) VALUES (?, ?, ?, ?, ?) "
+                      "ON CONFLICT (kind, input) DO UPDATE SET external_id = excluded.external_id, "
+                      "artist_id = COALESCE(excluded.artist_id, identities.artist_id), resolved_at = excluded.resolved_at",
+                      (kind, input.strip(), external_id, aid, int(time.time())))
+
+    def link_artist(self, artist: str, kind: str, inputs):
+        """Attach already-resolved inputs (channels typed for this artist, …) to the artist."""
+        with self.tx() as c:
+            aid = self._artist_ids(c, [artist])[artist.strip()]
+            c.executemany("UPDATE identities SET artist_id = ? WHERE kind = ? AND input = ?",
+                          [(aid, kind, i.strip()) for i in inputs if i and i.strip()])
+
+    def write_videos(self, rows, fetched_at: int | None = None) -> int:
+        """Per-video snapshot rows (videos.row_from_item shape)."""
+        ts = int(fetched_at or time.time())
+        data = [(r["id"], ts, r.get("channel_id"), r.get("published_at"), r.get("duration_s"), r.get("title_hash"),
+                 r.get("flags"), int(r.get("views", 0)), int(r.get("likes", 0)), int(r.get("comments", 0)))
+                for r in rows or [] if r.get("id")]
+        if data:
+            with self.tx() as c:
+                c.executemany("INSERT OR REPLACE INTO video_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", data)
+        return len(data)
+
+    def write_channel(self, channel_id: str, stats: dict, fetched_at: int | None = None):
+        with self.tx() as c:
+            c.execute("INSERT OR REPLACE INTO channel_stats VALUES (?, ?, ?, ?, ?)",
+                      (channel_id, int(fetched_at or time.time()), int(stats.get("viewCount", 0) or 0),
+                       int(stats.get("subscriberCount", 0) or 0), int(stats.get("videoCount", 0) or 0)))
+
+    def write_spotify(self, rows, fetched_at: int | None = None):
+        """rows: [{"id", "followers"?, "popularity"?, "monthly_listeners"?}] — missing fields stay NULL."""
+        ts = int(fetched_at or time.time())
+        data = [(r["id"], ts, r.get("followers"), r.get("popularity"), r.get("monthly_listeners"))
+                for r in rows or [] if r and r.get("id")]
+        if data:
+            with self.tx() as c:
+                c.executemany(
+                    "INSERT INTO spotify_stats VALUES (?, ?, ?, ?, ?) ON CONFLICT (spotify_id, fetched_at) DO UPDATE SET "
+                    "followers = COALESCE(excluded.followers, followers), "
+                    "popularity = COALESCE(excluded.popularity, popularity), "
+                    "monthly_listeners = COALESCE(excluded.monthly_listeners, monthly_listeners)", data)
+
+    def _write_tickets(self, c, totals: dict, year: int, source: str, ts: int) -> int:
+        clean = {a.strip(): int(n or 0) for a, n in totals.items() if a and a.strip()}
+        digest = hashlib.blake2b(json.dumps(sorted(clean.items())).encode(), digest_size=16).hexdigest()
+        ids = self._artist_ids(c, clean)
+        c.execute("DELETE FROM tickets WHERE year = ? AND source = ?", (int(year), source))
+        c.executemany("INSERT INTO tickets VALUES (?, ?, ?, ?, ?)",
+                      [(ids[a], int(year), source, n, ts) for a, n in clean.items()])
+        last = c.execute("SELECT digest FROM ticket_snapshots WHERE year = ? AND source = ? "
+                         "ORDER BY taken_at DESC, id DESC LIMIT 1", (int(year), source)).fetchone()
+        if last is None or last[0] != digest:
+            sid = c.execute("INSERT INTO ticket_snapshots (year, source, taken_at, artists, digest) "
+                            "VALUES (?, ?, ?, ?, ?)", (int(year), source, ts, len(clean), digest)).lastrowid
+            c.executemany("INSERT INTO ticket_versions VALUES (?, ?, ?)",
+                          [(sid, ids[a], n) for a, n in clean.items()])
+        return len(clean)
+
+    def write_tickets(self, totals: dict, year: int, source: str, fetched_at: int | None = None) -> int:
+        """Replace the current list for (year, source); adds a snapshot version when it changed."""
+        with self.tx() as c:
+            return self._write_tickets(c, totals, year, source, int(fetched_at or time.time()))
+
+    def write_tickets_many(self, by_year: dict, source: str, fetched_at: int | None = None) -> int:
+        """write_tickets for {year: totals} in one transaction (backfills); empty lists are skipped."""
+        ts = int(fetched_at or time.time())
+        with self.tx() as c:
+            return sum(self._write_tickets(c, totals, year, source, ts) for year, totals in by_year.items() if totals)
+
+    def write_conversions(self, artist: str, year: int, values: dict, computed_at: int | None = None):
+        ts = int(computed_at or time.time())
+        with self.tx() as c:
+            aid = self._artist_ids(c, [artist])[artist.strip()]
+            c.executemany("INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?)",
+                          [(aid, int(year), k, None if v is None else float(v), ts) for k, v in values.items()])
+
+    # ---------- reads ----------
+    def _rows(self, sql: str, args=()) -> list[dict]:
+        cur = self.conn().execute(sql, args)
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def has_tickets(self, year: int, source: str) -> bool:
+        return self.conn().execute("SELECT 1 FROM tickets WHERE year = ? AND source = ? LIMIT 1",
+                                   (int(year), source)).fetchone() is not None
+
+    def ticket_totals(self, year: int, source: str = "touringdata") -> dict:
+        """Current {artist: tickets} for one year and source."""
+        return dict(self.conn().execute("SELECT a.name, t.tickets FROM tickets t JOIN artists a ON a.id = t.artist_id "
+                                        "WHERE t.year = ? AND t.source = ?", (int(year), source)).fetchall())
+
+    def tickets(self, artist: str, year: int | None = None) -> list[dict]:
+        return self._rows("SELECT t.year, t.source, t.tickets, t.fetched_at FROM tickets t JOIN artists a "
+                          "ON a.id = t.artist_id WHERE a.name = ? AND (? IS NULL OR t.year = ?) ORDER BY t.year",
+                          (artist.strip(), year, year))
+
+    def identities(self, artist: str) -> list[dict]:
+        return self._rows("SELECT i.kind, i.input, i.external_id, i.resolved_at FROM identities i JOIN artists a "
+                          "ON a.id = i.artist_id WHERE a.name = ? ORDER BY i.kind, i.input", (artist.strip(),))
+
+    def external_id(self, kind: str, input: str) -> str | None:
+        r = self.conn().execute("SELECT external_id FROM identities WHERE kind = ? AND input = ?",
+                                (kind, input.strip())).fetchone()
+        return r[0] if r else None
+
+    def channel_history(self, channel_id: str) -> list[dict]:
+        return self._rows("SELECT fetched_at, views, subscribers, videos FROM channel_stats "
+                          "WHERE channel_id = ? ORDER BY fetched_at", (channel_id,))
+
+    def spotify_history(self, spotify_id: str) -> list[dict]:
+        return self._rows("SELECT fetched_at, followers, popularity, monthly_listeners FROM spotify_stats "
+                          "WHERE spotify_id = ? ORDER BY fetched_at", (spotify_id,))
+
+    def videos_latest(self, channel_ids, start: int, end: int) -> list[dict]:
+        """Newest snapshot of every video published in [start, end] on the given channels."""
+        ids = list(channel_ids)
+        if not ids:
+            return []
+        marks = ",".join("?" * len(ids))
+        return self._rows(
+            f"SELECT v.* FROM video_stats v JOIN (SELECT video_id, MAX(fetched_at) AS f FROM video_stats "
+            f"WHERE channel_id IN ({marks}) AND published_at BETWEEN ? AND ? GROUP BY video_id) m "
+            f"ON v.video_id = m.video_id AND v.fetched_at = m.f ORDER BY v.published_at", (*ids, int(start), int(end)))
+
+    def video_history(self, video_id: str) -> list[dict]:
+        return self._rows("SELECT fetched_at, views, likes, comments FROM video_stats WHERE video_id = ? "
+                          "ORDER BY fetched_at", (video_id,))
+
+    def video_training_rows(self, limit: int = 20000) -> list[dict]:
+        """Newest snapshot of each video, if it shows likes (inputs for likes.fit); most recently fetched first."""
+        return self._rows(
+            "SELECT v.video_id AS id, v.channel_id, v.published_at, v.views, v.likes, v.comments, v.fetched_at "
+            "FROM video_stats v JOIN (SELECT video_id, MAX(fetched_at) AS f FROM video_stats GROUP BY video_id) m "
+            "ON v.video_id = m.video_id AND v.fetched_at = m.f WHERE v.likes > 0 AND v.views > 0 "
+            "ORDER BY v.fetched_at DESC LIMIT ?", (int(limit),))
+
+    def conversions_history(self, artist: str, year: int | None = None) -> list[dict]:
+        return self._rows("SELECT c.year, c.metric, c.value, c.computed_at FROM conversions c JOIN artists a "
+                          "ON a.id = c.artist_id WHERE a.name = ? AND (? IS NULL OR c.year = ?) "
+                          "ORDER BY c.computed_at, c.metric", (artist.strip(), year, year))
+
+    # ---------- snapshots / deltas (see changes.py) ----------
+    def ticket_snapshots(self, year: int | None = None, source: str | None = None) -> list[dict]:
+        return self._rows("SELECT id, year, source, taken_at, artists FROM ticket_snapshots "
+                          "WHERE (? IS NULL OR year = ?) AND (? IS NULL OR source = ?) ORDER BY taken_at, id",
+                          (year, year, source, source))
+
+    def ticket_snapshot_at(self, year: int, source: str, at: int) -> int | None:
+        """ID of the newest ticket snapshot taken at or before `at`."""
+        r = self.conn().execute("SELECT id FROM ticket_snapshots WHERE year = ? AND source = ? AND taken_at <= ? "
+                                "ORDER BY taken_at DESC, id DESC LIMIT 1", (int(year), source, int(at))).fetchone()
+        return r[0] if r else None
+
+    def ticket_version_diff(self, old_id: int, new_id: int) -> list[dict]:
+        """Artists whose entry differs between two snapshots (None = absent in that snapshot)."""
+        return self._rows(
+            "WITH n AS (SELECT artist_id, tickets FROM ticket_versions WHERE snapshot_id = ?), "
+            "o AS (SELECT artist_id, tickets FROM ticket_versions WHERE snapshot_id = ?), "
+            "k AS (SELECT artist_id FROM n UNION SELECT artist_id FROM o) "
+            "SELECT a.name AS artist, o.tickets AS before, n.tickets AS after FROM k "
+            "JOIN artists a ON a.id = k.artist_id LEFT JOIN n ON n.artist_id = k.artist_id "
+            "LEFT JOIN o ON o.artist_id = k.artist_id WHERE o.tickets IS NOT n.tickets", (int(new_id), int(old_id)))
+
+    def metric_deltas(self, table: str, key: str, metric: str, since: int) -> list[dict]:
+        """
+        Per entity: newest non-null `metric` vs. the newest one at or before `since`
+        (entities first seen after `since` compare against their earliest snapshot).
+        """
+        if (table, key) not in (("channel_stats", "channel_id"), ("spotify_stats", "spotify_id")):
+            raise ValueError(table)
+        return self._rows(
+            f"WITH s AS (SELECT {key} AS k, fetched_at, {metric} AS v, "
+            f"ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY fetched_at DESC) AS newest, "
+            f"ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY fetched_at <= ? DESC, "
+            f"CASE WHEN fetched_at <= ? THEN -fetched_at ELSE fetched_at END) AS base "
+            f"FROM {table} WHERE {metric} IS NOT NULL) "
+            f"SELECT n.k AS id, b.v AS before, n.v AS after, b.fetched_at AS before_at, n.fetched_at AS after_at "
+            f"FROM s n JOIN s b ON b.k = n.k AND b.base = 1 WHERE n.newest = 1 AND n.fetched_at > b.fetched_at",
+            (int(since), int(since)))
+
+    def names_for(self, kind: str) -> dict:
+        """external ID → artist name for linked identities."""
+        return dict(self.conn().execute(
+            "SELECT i.external_id, MIN(a.name) FROM identities i JOIN artists a ON a.id = i.artist_id "
+            "WHERE i.kind = ? GROUP BY i.external_id", (kind,)).fetchall())
+
+    def close(self):
+        c = getattr(self._local, "conn", None)
+        if c is not None:
+            c.close()
+            self._local.conn = None
+
+# ---------- process-wide store ----------
+_DEFAULT = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default() -> Store | None:
+    """The shared store, or None when PIPELINE_DB is set to an empty string (default in replay mode)."""
+    global _DEFAULT
+    path = os.getenv("PIPELINE_DB", "" if os.getenv("PIPELINE_REPLAY") else DB_PATH)
+    if not path:
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None or str(_DEFAULT.path) != str(pathlib.Path(path)):
+            _DEFAULT = Store(path)
+        return _DEFAULT
+
+def write(kind: str, *args, **kw) -> bool:
+    """Best-effort write_<kind>(...) on the default store; False when disabled or it failed."""
+    s = default()
+    if s is None:
+        return False
+    try:
+        getattr(s, f"write_{kind}")(*args, **kw)
+        return True
+    except Exception:
+        return False
@@ -1,22 +1,19 @@
 # ticket_scraper.py
-import re, sys, html, unicodedata, json, requests, pathlib
-from bs4 import BeautifulSoup
+# Import has no side effects: the data/ dir is created on first write and
+# BeautifulSoup/lxml load only when a post is actually parsed.
+#
+#   python ticket_scraper.py --refresh                         # 2023 list → data/ JSON cache + store
+#   python ticket_scraper.py --backfill 2015-2023 --parse-workers 4
+import os, re, sys, html, unicodedata, json, pathlib
+import perf, sources, store
 
 # ---------- Cache paths ----------
 CACHE_DIR = pathlib.Path("data")
-CACHE_DIR.mkdir(exist_ok=True)
 CACHE_JSON = CACHE_DIR / "touringdata_2023_tickets.json"
 
-# ---------- Your working sources/headers ----------
-WP_API_URLS = [
-    "https://touringdata.org/wp-json/wp/v2/posts?slug=2023-top-touring-artists&per_page=1",
-    "https://touringdata.wordpress.com/wp-json/wp/v2/posts?slug=2023-top-touring-artists&per_page=1",
-]
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126 Safari/537.36",
-    "Accept": "application/json",
-    "Accept-Language": "en-US,en;q=0.9",
-}
+# ---------- Source (mirrors/headers live in the sources.TouringData adapter) ----------
+WP_API_URLS = sources.TOURINGDATA.urls(2023)
+HEADERS = sources.TOURINGDATA.headers
 
 # ---------- Helpers (same as your file) ----------
 def norm_name(s: str) -> str:
@@ -28,20 +25,9 @@ def parse_int(s: str):
     m = re.search(r"(\d{1,3}(?:,\d{3})+)", s or "")
     return int(m.group(1).replace(",", "")) if m else None
 
+@perf.timed("tickets.fetch_post")
 def fetch_post_html() -> str:
-    for url in WP_API_URLS:
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=30)
-            r.raise_for_status()
-            arr = r.json()
-            if isinstance(arr, list) and arr:
-                post = arr[0]
-                rendered = post.get("content", {}).get("rendered", "")
-                if rendered:
-                    return rendered
-        except Exception:
-            continue
-    return ""
+    return sources.TOURINGDATA.fetch(2023)
 
 def extract_pairs_from_soup(soup):
     # Your robust sentence-based extractor
@@ -112,13 +98,30 @@ def extract_pairs_from_soup(soup):
     return {k.title(): v for k, v in mapping.items()}
 
 # ---------- Public API ----------
+def parse_post(html_doc) -> dict:
+    """Rendered post HTML → {Artist: tickets} (BeautifulSoup + sentence extractor)."""
+    from bs4 import BeautifulSoup
+    return extract_pairs_from_soup(BeautifulSoup(html_doc, "lxml"))
+
+def parse_posts(html_docs, pool=None) -> list[dict]:
+    """
+    Several posts at once (multi-year backfills). Parsed in worker processes when a pool is
+    given or PARSE_WORKERS is set (see parse_pool), inline otherwise.
+    """
+    import parse_pool
+    html_docs = list(html_docs)
+    with perf.span("tickets.parse_many", posts=len(html_docs)):
+        return parse_pool.parse_many("tickets_post", html_docs, pool=pool)
+
 def refresh_cache(verbose=True) -> dict:
     html_doc = fetch_post_html()
     if not html_doc:
         if verbose: print("[ERR] No HTML fetched from WP REST API.")
         return {}
-    soup = BeautifulSoup(html_doc, "lxml")
-    pairs = extract_pairs_from_soup(soup)
+    from bs4 import BeautifulSoup
+    with perf.span("tickets.parse", bytes=len(html_doc)):
+        soup = BeautifulSoup(html_doc, "lxml")
+        pairs = extract_pairs_from_soup(soup)
     if not pairs:
         if verbose:
             preview = soup.get_text("\n", strip=True)[:800]
@@ -127,13 +130,94 @@ def refresh_cache(verbose=True) -> dict:
 
     # Sort + save
     mapping = dict(sorted(pairs.items(), key=lambda kv: kv[1], reverse=True))
+    CACHE_JSON.parent.mkdir(parents=True, exist_ok=True)
     with open(CACHE_JSON, "w", encoding="utf-8") as f:
         json.dump(mapping, f, ensure_ascii=False, indent=2)
+    store.write("tickets", mapping, 2023, "touringdata")
     if verbose:
         print(f"[OK] Cached {len(mapping)} artists → {CACHE_JSON}")
     return mapping
 
+def _years(spec: str) -> list[int]:
+    """'2015-2023' / '2019,2022,2023' / mixes → sorted unique years."""
+    out = set()
+    for part in (spec or "").replace(" ", "").split(","):
+        if "-" in part:
+            a, b = part.split("-", 1)
+            out.update(range(int(a), int(b) + 1))
+        elif part:
+            out.add(int(part))
+    return sorted(out)
+
+def backfill(years, pool=None, max_workers: int = 8, verbose: bool = True) -> dict:
+    """
+    Year-end totals for many years: posts fetched concurrently (each racing the mirrors),
+    parsed in one batch (worker processes with a pool / PARSE_WORKERS, inline otherwise),
+    written to the store in one transaction. Returns the totals ("by_year"), per-year stats and
+    phase timings; a store write error is raised, a disabled store (PIPELINE_DB="") skips the write.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    years = sorted({int(y) for y in years})
+    t0 = time.perf_counter()
+
+    def fetch(year):
+        t = time.perf_counter()
+        try:
+            doc, url = sources.TOURINGDATA.race(year)
+        except Exception:
+            doc, url = "", None
+        return doc, url, time.perf_counter() - t
+
+    with perf.span("tickets.backfill.fetch", years=len(years)):
+        with ThreadPoolExecutor(max(1, min(max_workers, len(years) or 1)), thread_name_prefix="td-backfill") as ex:
+            fetched = dict(zip(years, ex.map(perf.bind(fetch), years)))
+    t_fetch = time.perf_counter()
+
+    have = [y for y in years if fetched[y][0]]
+    parsed = dict(zip(have, parse_posts([fetched[y][0] for y in have], pool=pool)))
+    t_parse = time.perf_counter()
+
+    by_year = {y: dict(sorted(parsed.get(y, {}).items(), key=lambda kv: kv[1], reverse=True)) for y in years}
+    db = store.default()
+    with perf.span("tickets.backfill.write", years=len(have)):
+        if db is not None:
+            db.write_tickets_many(by_year, "touringdata")
+    t_write = time.perf_counter()
+
+    stats = {}
+    for y in years:
+        doc, url, secs = fetched[y]
+        n = len(by_year[y])
+        stats[y] = {
+            "mirror": url.split("/")[2] if url else None,
+            "fetch_s": round(secs, 3),
+            "bytes": len(doc.encode("utf-8")),
+            "artists": n,
+            "artists_per_10kb": round(n / (len(doc.encode("utf-8")) / 10_000), 2) if doc else 0.0,
+            "status": "ok" if n else "parsed 0 artists" if doc else "no post",
+        }
+    out = {
+        "years": stats,
+        "artists": sum(len(v) for v in by_year.values()),
+        "by_year": by_year,
+        "stored": db is not None,
+        "fetch_s": round(t_fetch - t0, 3),
+        "parse_s": round(t_parse - t_fetch, 3),
+        "write_s": round(t_write - t_parse, 3),
+        "total_s": round(t_write - t0, 3),
+    }
+    if verbose:
+        for y, r in stats.items():
+            print(f"{y}  {r['status']:<17} {r['artists']:>4} artists  {r['bytes'] / 1000:>7.1f} kB  "
+                  f"{r['fetch_s']:>6.2f}s  via {r['mirror'] or '-'}")
+        print(f"[OK] {out['artists']} artists over {len(have)}/{len(years)} years — fetch {out['fetch_s']}s, "
+              f"parse {out['parse_s']}s, write {out['write_s']}s" + ("" if db is not None else " (store disabled, not written)"))
+    return out
+
 def load_cached_ticket_totals() -> dict:
+    if os.getenv("PIPELINE_REPLAY") or os.getenv("PIPELINE_RECORD"):
+        return sources.TOURINGDATA.get(2023)        # via the replay archive / recorded into it; local JSON untouched
     if CACHE_JSON.exists():
         with open(CACHE_JSON, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -143,6 +227,22 @@ def load_cached_ticket_totals() -> dict:
 if __name__ == "__main__":
     if "--refresh" in sys.argv:
         refresh_cache(verbose=True)
+    elif "--backfill" in sys.argv:
+        # python ticket_scraper.py --backfill 2015-2023 [--parse-workers 4] [--out totals.json]
+        import parse_pool
+        years = _years(sys.argv[sys.argv.index("--backfill") + 1])
+        n = int(sys.argv[sys.argv.index("--parse-workers") + 1]) if "--parse-workers" in sys.argv else 0
+        if n > 0:
+            with parse_pool.ParsePool(n) as pp:
+                res = backfill(years, pool=pp)
+        else:
+            res = backfill(years)
+        if "--out" in sys.argv:
+            path = pathlib.Path(sys.argv[sys.argv.index("--out") + 1])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({str(y): v for y, v in res["by_year"].items()}, f, ensure_ascii=False, indent=2)
+            print(f"[OK] Wrote {path}")
     else:
         d = load_cached_ticket_totals()
         print(f"Artists in cache: {len(d)}")
@@ -0,0 +1,150 @@
+# videos.py — compact per-video table (one row per YouTube video) + local breakdowns
+#
+# videos.list is called with part=snippet,contentDetails,statistics (same 1 unit per 50 IDs),
+# and each item is reduced to integers only:
+#   id, channel_id, published_at (unix s), duration_s, title_hash, flags, views, likes, comments
+# Titles are not kept; `flags` records what the title/broadcast said (live, music video, #shorts)
+# and `title_hash` identifies the normalized title (re-upload matching).
+#
+#   t = videos.table("@beyonce, @BeyonceVEVO", 2023)     # cached after yt_annual_stats ran
+#   t.totals()                                           # {views, likes, comments, video_count}
+#   t.by_type()                                          # same, per short / live / music_video / other
+import hashlib, re
+
+import numpy as np
+
+# ---------- Row parsing ----------
+F_LIVE_TITLE = 1        # "(Live at …)", "Live from", "[LIVE]"
+F_MUSIC_VIDEO = 2       # "Official Music Video", "Official Video", "Lyric Video", "Visualizer"
+F_BROADCAST = 4         # snippet.liveBroadcastContent is live/upcoming, or a finished stream
+F_SHORTS_TAG = 8        # "#shorts" in the title
+
+_DUR_RE = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+_LIVE_RE = re.compile(r"\blive\b", re.I)
+_MV_RE = re.compile(r"official\s+(?:music\s+)?video|lyric\s+video|visuali[sz]er|\bm/?v\b", re.I)
+_NORM_RE = re.compile(r"[\W_]+")
+
+def iso_duration(s: str | None) -> int:
+    """'PT3M12S' → 192 seconds (0 when missing, e.g. upcoming streams)."""
+    m = _DUR_RE.fullmatch(s or "")
+    if not m:
+        return 0
+    d, h, mi, se = (int(x or 0) for x in m.groups())
+    return ((d * 24 + h) * 60 + mi) * 60 + se
+
+def normalize_title(title: str) -> str:
+    """Lowercase alphanumerics only, so 'Song (Official Video)' ≈ 'SONG - official video'."""
+    return _NORM_RE.sub(" ", (title or "").casefold()).strip()
+
+def title_hash(title: str) -> int:
+    """Signed 64-bit hash of the normalized title (fits an int64 column)."""
+    h = hashlib.blake2b(normalize_title(title).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(h, "big", signed=True)
+
+def title_flags(title: str, broadcast: str = "none", has_stream: bool = False) -> int:
+    f = 0
+    if _LIVE_RE.search(title or ""):
+        f |= F_LIVE_TITLE
+    if _MV_RE.search(title or ""):
+        f |= F_MUSIC_VIDEO
+    if broadcast in ("live", "upcoming") or has_stream:
+        f |= F_BROADCAST
+    if "#shorts" in (title or "").lower():
+        f |= F_SHORTS_TAG
+    return f
+
+def _i(x) -> int:
+    try:
+        return int(x or 0)
+    except Exception:
+        return 0
+
+def row_from_item(it: dict, channel_id: str | None = None) -> dict:
+    """One videos.list item → compact row (integers only)."""
+    from datetime import datetime
+    st, sn, cd = it.get("statistics") or {}, it.get("snippet") or {}, it.get("contentDetails") or {}
+    try:
+        ts = int(datetime.fromisoformat(str(sn.get("publishedAt")).replace("Z", "+00:00")).timestamp())
+    except Exception:
+        ts = 0
+    return {
+        "id": it.get("id"),
+        "channel_id": sn.get("channelId", channel_id),
+        "published_at": ts,
+        "duration_s": iso_duration(cd.get("duration")),
+        "title_hash": title_hash(sn.get("title", "")),
+        "flags": title_flags(sn.get("title", ""), sn.get("liveBroadcastContent", "none"),
+                             bool(it.get("liveStreamingDetails"))),
+        "views": _i(st.get("viewCount")),
+        "likes": _i(st.get("likeCount")),
+        "comments": _i(st.get("commentCount")),
+    }
+
+# ---------- Columnar table ----------
+TYPES = ("short", "live", "music_video", "other")
+METRICS = ("views", "likes", "comments")
+INT_COLUMNS = ("published_at", "duration_s", "title_hash", "flags") + METRICS
+
+class VideoTable:
+    """Numpy columns over per-video rows; every breakdown is a vectorized pass."""
+
+    def __init__(self, rows):
+        rows = list(rows or [])
+        self.ids = [r["id"] for r in rows]
+        self.channel_ids = [r.get("channel_id") for r in rows]
+        for c in INT_COLUMNS:
+            setattr(self, c, np.array([int(r.get(c, 0) or 0) for r in rows], dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def classify(self, short_max_s: int = 60) -> np.ndarray:
+        """Type code per video (index into TYPES): Shorts first, then live, then music videos."""
+        f = self.flags
+        short = ((self.duration_s > 0) & (self.duration_s <= short_max_s)) | ((f & F_SHORTS_TAG) != 0)
+        live = (f & (F_LIVE_TITLE | F_BROADCAST)) != 0
+        mv = (f & F_MUSIC_VIDEO) != 0
+        return np.select([short, live, mv], [0, 1, 2], default=3).astype(np.int8)
+
+    def totals(self, mask: np.ndarray | None = None) -> dict:
+        sel = slice(None) if mask is None else mask
+        out = {m: int(getattr(self, m)[sel].sum()) for m in METRICS}
+        out["video_count"] = int(len(self) if mask is None else np.count_nonzero(mask))
+        return out
+
+    def by_type(self, short_max_s: int = 60) -> dict:
+        """{type: {views, likes, comments, video_count}} for every type in TYPES."""
+        codes = self.classify(short_max_s)
+        out = {}
+        for m in METRICS:
+            sums = np.zeros(len(TYPES), dtype=np.int64)
+            np.add.at(sums, codes, getattr(self, m))
+            for k, t in enumerate(TYPES):
+                out.setdefault(t, {})[m] = int(sums[k])
+        counts = np.bincount(codes, minlength=len(TYPES))
+        for k, t in enumerate(TYPES):
+            out[t]["video_count"] = int(counts[k])
+        return out
+
+    def to_frame(self, short_max_s: int = 60):
+        import pandas as pd
+        df = pd.DataFrame({"id": self.ids, "channel_id": self.channel_ids,
+                           **{c: getattr(self, c) for c in INT_COLUMNS}})
+        df["published_at"] = pd.to_datetime(df["published_at"], unit="s", utc=True)
+        df["type"] = pd.Categorical.from_codes(self.classify(short_max_s), categories=list(TYPES))
+        return df
+
+def rows(channels, start, end, max_videos: int = 400) -> list[dict]:
+    """Rows for every channel (comma-separated or list) in [start, end], de-duplicated by video ID."""
+    import data_pipeline as dp
+    out, seen = [], set()
+    for ch in dp._split_channels(channels):
+        for r in dp.yt_video_rows(ch, str(start), str(end), max_videos=max_videos):
+            if r["id"] not in seen:
+                seen.add(r["id"])
+                out.append(r)
+    return out
+
+def table(channels, year: int, max_videos: int = 400) -> VideoTable:
+    """Per-video table for the channels' videos in `year` (free after yt_annual_stats ran)."""
+    return VideoTable(rows(channels, f"{int(year)}-01-01", f"{int(year)}-12-31", max_videos))
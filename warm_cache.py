@@ -0,0 +1,142 @@
+# warm_cache.py — background warmer for the TouringData roster
+#
+# Walks the top touring artists from the ticket cache, resolves their YouTube channel and
+# Spotify ID, and precomputes annual/lifetime YouTube stats and Spotify metrics into the
+# shared pipeline cache (data_pipeline.RESULT_CACHE), staying inside a YouTube quota budget.
+#
+#   python warm_cache.py --once --budget 5000          # warm now, then exit
+#   python warm_cache.py --hours 1-6 --budget 8000     # daemon: warm during 01:00–06:59 each day
+#
+# Dashboard queries for warmed artists are then served from the cache file.
+import argparse, json, math, os, pathlib, threading
+from datetime import datetime
+
+import data_pipeline as dp
+import perf
+import sources
+
+def max_units(channels: str, max_videos: int = 400) -> int:
+    """
+    Worst-case YouTube quota for warming one artist, per channel: the resolve search (100, unless
+    it is a UC… ID), ceil(max_videos/50) search pages (100 each) + as many videos.list batches,
+    and the channels.list lifetime call.
+    """
+    yt = sources.YOUTUBE
+    pages = max(1, math.ceil(int(max_videos) / 50))
+    total = 0
+    for ch in dp._split_channels(channels):
+        resolve = 0 if ch.startswith("UC") else yt.units("search")
+        total += resolve + yt.units("search", pages) + yt.units("videos", pages) + yt.units("channels")
+    return total
+
+def max_videos_within(channels: str, units: int) -> int:
+    """Largest per-channel max_videos (a multiple of 50, at least 50) whose max_units fits in `units`."""
+    yt = sources.YOUTUBE
+    n = max(1, len(dp._split_channels(channels)))
+    per_page = n * (yt.units("search") + yt.units("videos"))
+    pages = (int(units) - max_units(channels, 50)) // per_page + 1
+    return 50 * max(1, pages)
+
+# Optional {artist: "channel, channel"} overrides; otherwise the artist name is resolved.
+CHANNEL_MAP_PATH = pathlib.Path(os.getenv("WARM_CHANNEL_MAP", "data/roster_channels.json"))
+
+def load_channel_map(path=CHANNEL_MAP_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def channels_for(artist: str, channel_map: dict | None = None) -> str:
+    """The channel input the dashboard would use for this artist (map override, else the name)."""
+    return (channel_map or {}).get(artist) or artist
+
+def roster(limit: int | None = None) -> list[str]:
+    """Top touring artists, highest ticket totals first."""
+    from ticket_scraper import load_cached_ticket_totals
+    totals = load_cached_ticket_totals() or {}
+    names = sorted(totals, key=lambda a: totals[a], reverse=True)
+    return names[:limit] if limit else names
+
+def warm_artist(artist: str, year: int, channels: str, max_videos: int = 400) -> dict:
+    """Fill the cache for one artist; returns quota units and seconds spent."""
+    with perf.collect(f"warm:{artist}") as tr:
+        dp.yt_annual_stats_multi(channels, year, include_comments=True, max_videos=max_videos)
+        for ch in dp._split_channels(channels):
+            dp.get_youtube_channel_stats(ch)
+        dp.spotify_artist_followers(artist)
+        dp.spotify_monthly_listeners_scrape(artist, return_raw=True)
+    return {"artist": artist, "quota": tr.quota.get("youtube", 0), "seconds": round(tr.elapsed, 3)}
+
+def is_warm(artist: str, year: int, channels: str, max_videos: int = 400) -> bool:
+    # the marker also covers artists whose lookups came back empty (not cached, but not worth re-spending on)
+    if ("warm", artist, int(year)) in dp.RESULT_CACHE:
+        return True
+    k = dp.yt_annual_stats_multi.cache_key(channels, year, include_comments=True, max_videos=max_videos)
+    return k in dp.RESULT_CACHE
+
+def warm_roster(year: int = 2023, budget: int = 5000, limit: int | None = None, max_videos: int = 400,
+                stop: threading.Event | None = None, verbose: bool = True) -> dict:
+    """
+    One pass over the roster. Already-warm artists are skipped for free; the pass stops
+    before an artist whose worst-case cost (max_units) exceeds the remaining budget (or when
+    `stop` is set), so it never spends more than `budget`.
+    """
+    cmap = load_channel_map()
+    spent, done, skipped = 0, [], 0
+    for artist in roster(limit):
+        if stop is not None and stop.is_set():
+            break
+        chans = channels_for(artist, cmap)
+        if is_warm(artist, year, chans, max_videos):
+            skipped += 1
+            continue
+        if budget - spent < max_units(chans, max_videos):
+            break
+        r = warm_artist(artist, year, chans, max_videos)
+        spent += r["quota"]
+        done.append(r)
+        dp.RESULT_CACHE.set(("warm", artist, int(year)), r)
+        dp.RESULT_CACHE.flush()           # make progress visible to the dashboard process now
+        if verbose:
+            print(f"[warm] {artist:<30} {r['quota']:>5} units  {r['seconds']:.1f}s  (spent {spent}/{budget})")
+    return {"warmed": len(done), "already_warm": skipped, "quota_spent": spent, "artists": done}
+
+def _in_window(hours: tuple[int, int], now: datetime | None = None) -> bool:
+    h = (now or datetime.now()).hour
+    lo, hi = hours
+    return lo <= h <= hi if lo <= hi else (h >= lo or h <= hi)      # e.g. 22-5 wraps midnight
+
+def run_scheduler(year: int = 2023, budget: int = 5000, hours=(1, 6), limit: int | None = None,
+                  stop: threading.Event | None = None, poll_s: float = 300.0):
+    """Warm once per off-peak window per day, with a fresh budget each day."""
+    stop = stop or threading.Event()
+    last_day = None
+    while not stop.is_set():
+        today = datetime.now().date()
+        if _in_window(hours) and last_day != today:
+            warm_roster(year=year, budget=budget, limit=limit, stop=stop)
+            last_day = today
+        stop.wait(poll_s)
+
+def start_background(**kw) -> threading.Event:
+    """Start run_scheduler in a daemon thread (e.g. from app.py); set the returned event to stop it."""
+    stop = threading.Event()
+    threading.Thread(target=run_scheduler, kwargs={**kw, "stop": stop}, name="warm-cache", daemon=True).start()
+    return stop
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-y", "--year", type=int, default=2023)
+    ap.add_argument("--budget", type=int, default=5000, help="YouTube quota units per pass (daily limit is 10,000)")
+    ap.add_argument("--limit", type=int, default=None, help="only the top N artists")
+    ap.add_argument("--hours", default="1-6", help="off-peak window, local hours inclusive (e.g. 22-5)")
+    ap.add_argument("--once", action="store_true", help="warm now and exit")
+    args = ap.parse_args()
+
+    if args.once:
+        print(json.dumps({k: v for k, v in warm_roster(args.year, args.budget, args.limit).items()
+                          if k != "artists"}, indent=2))
+    else:
+        lo, hi = (int(x) for x in args.hours.split("-"))
+        run_scheduler(year=args.year, budget=args.budget, hours=(lo, hi), limit=args.limit)
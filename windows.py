@@ -0,0 +1,135 @@
+# windows.py — arbitrary time-window aggregation over one enumeration of an artist's videos
+#
+#   idx = windows.build_index("@beyonce, @BeyonceVEVO", "2022-01-01", "2024-12-31")   # API calls happen here
+#   idx.query(windows.around("2023-05-10", 90, 90))      # tour start ±90 days
+#   idx.query_many([windows.quarter(2023, q) for q in (1, 2, 3, 4)])
+#   idx.query(windows.rolling_months("2023-12-31", 12))
+#   idx.truncated, idx.complete_from    # a channel hit max_videos: earlier windows undercount
+#
+# Videos are sorted by publish time with prefix sums per metric, so each window is two
+# binary searches and a subtraction — no further API calls, whatever the window.
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+METRICS = ("views", "likes", "comments")
+
+# ---------- Window specs ----------
+@dataclass(slots=True, frozen=True)
+class Window:
+    label: str
+    start: int          # unix seconds, inclusive
+    end: int            # unix seconds, inclusive
+
+def _date(d) -> date:
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return date.fromisoformat(str(d)[:10])
+
+def _ts(d: date, end: bool = False) -> int:
+    t = datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp()
+    return int(t) + (86399 if end else 0)
+
+def between(start, end, label: str | None = None) -> Window:
+    """Whole days from `start` through `end` (UTC)."""
+    s, e = _date(start), _date(end)
+    return Window(label or f"{s} → {e}", _ts(s), _ts(e, end=True))
+
+def calendar_year(year: int) -> Window:
+    return between(date(year, 1, 1), date(year, 12, 31), str(year))
+
+def quarter(year: int, q: int) -> Window:
+    m = 3 * (int(q) - 1) + 1
+    last = date(year, m + 2, calendar.monthrange(year, m + 2)[1])
+    return between(date(year, m, 1), last, f"{year} Q{q}")
+
+def around(center, before_days: int = 90, after_days: int = 90) -> Window:
+    """E.g. tour start ±90 days."""
+    c = _date(center)
+    return between(c - timedelta(days=before_days), c + timedelta(days=after_days),
+                   f"{c} −{before_days}d/+{after_days}d")
+
+def rolling_months(end, months: int = 12) -> Window:
+    """The `months` calendar months ending on `end` (e.g. trailing 12 months)."""
+    e = _date(end)
+    y, m = divmod(e.month - 1 - months, 12)
+    y += e.year
+    m += 1
+    s = date(y, m, min(e.day, calendar.monthrange(y, m)[1])) + timedelta(days=1)
+    return between(s, e, f"{months} months to {e}")
+
+# ---------- Index ----------
+class VideoIndex:
+    """
+    Per-video rows sorted by publish time + prefix sums of each metric.
+    complete_from: unix seconds before which the rows are known to be incomplete (a channel hit
+    the enumeration cap, which keeps the newest videos); None when nothing was cut off.
+    """
+
+    def __init__(self, rows, complete_from: int | None = None):
+        self.complete_from = complete_from
+        rows = sorted((r for r in rows if r.get("published_at")), key=lambda r: r["published_at"])
+        self.ids = [r["id"] for r in rows]
+        self.ts = np.array([r["published_at"] for r in rows], dtype=np.int64)
+        # prefix[m][i] = sum of metric m over the first i videos
+        self.prefix = {m: np.concatenate(([0], np.cumsum([int(r.get(m, 0) or 0) for r in rows], dtype=np.int64)))
+                       for m in METRICS}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def truncated(self) -> bool:
+        return self.complete_from is not None
+
+    @property
+    def span(self) -> tuple[int, int] | None:
+        return (int(self.ts[0]), int(self.ts[-1])) if len(self.ts) else None
+
+    def _bounds(self, starts, ends):
+        return (np.searchsorted(self.ts, starts, side="left"),
+                np.searchsorted(self.ts, ends, side="right"))
+
+    def query(self, w: Window) -> dict:
+        """
+        {views, likes, comments, video_count} for videos published inside the window;
+        truncated=True when the window reaches back before the index is complete (undercount).
+        """
+        return self.query_many([w])[0]
+
+    def query_many(self, windows) -> list[dict]:
+        windows = list(windows)
+        if not windows:
+            return []
+        i, j = self._bounds(np.array([w.start for w in windows], dtype=np.int64),
+                            np.array([w.end for w in windows], dtype=np.int64))
+        sums = {m: self.prefix[m][j] - self.prefix[m][i] for m in METRICS}
+        cut = self.complete_from
+        return [{"window": w.label, **{m: int(sums[m][k]) for m in METRICS}, "video_count": int(j[k] - i[k]),
+                 "truncated": cut is not None and w.start < cut}
+                for k, w in enumerate(windows)]
+
+def build_index(channels, start, end, max_videos: int = 1200) -> VideoIndex:
+    """
+    Enumerate every channel's videos in [start, end] once (cached in the pipeline cache)
+    and index them. Windows inside that span are then free to query.
+    A channel with `max_videos` uploads in the span was cut off (newest first): the index is
+    only complete from that channel's oldest indexed video on (see VideoIndex.complete_from).
+    """
+    import data_pipeline as dp
+    rows, seen, complete_from = [], set(), None
+    for ch in dp._split_channels(channels):
+        part = dp.yt_video_rows(ch, str(_date(start)), str(_date(end)), max_videos=max_videos)
+        if len(part) >= max_videos:
+            oldest = min((r["published_at"] for r in part if r.get("published_at")), default=None)
+            if oldest is not None:
+                complete_from = max(complete_from or oldest, oldest)
+        for r in part:
+            if r["id"] not in seen:
+                seen.add(r["id"])
+                rows.append(r)
+    return VideoIndex(rows, complete_from)